@@ -1 +1,22 @@
-# 
\ No newline at end of file
+from django.contrib import admin
+
+from blockchain.models import RelayedTransaction, FeeRollup
+
+
+@admin.register(RelayedTransaction)
+class RelayedTransactionAdmin(admin.ModelAdmin):
+    list_display = (
+        'tx_hash', 'function', 'election_code', 'vote_count', 'status',
+        'gas_used', 'effective_gas_price', 'fee_wei', 'sent_at', 'mined_at'
+    )
+    search_fields = ('tx_hash', 'sender', 'election_code')
+    list_filter = ('status', 'function')
+    readonly_fields = [f.name for f in RelayedTransaction._meta.fields]
+
+
+@admin.register(FeeRollup)
+class FeeRollupAdmin(admin.ModelAdmin):
+    list_display = ('dimension', 'key', 'tx_count', 'vote_count', 'gas_used', 'fee_matic', 'fee_per_vote_matic')
+    list_filter = ('dimension',)
+    search_fields = ('key',)
+    readonly_fields = [f.name for f in FeeRollup._meta.fields]
@@ -0,0 +1,172 @@
+# blockchain/anchoring.py
+"""
+Merkle anchoring mode.
+
+With VOTE_ANCHOR_MODE=merkle, cast votes are stored locally with status
+"Queued" instead of sending one transaction per vote/ballot. Every interval
+`manage.py commit_merkle_roots` builds a Merkle tree over the receipts of the
+newly queued votes and anchors its root on-chain in a single transaction.
+"""
+
+import os
+import logging
+from django.db import transaction
+from django.utils import timezone
+
+from blockchain import merkle
+from blockchain.models import MerkleBatch
+
+logger = logging.getLogger(__name__)
+
+ANCHOR_MODE = os.getenv("VOTE_ANCHOR_MODE", "direct").lower()
+MERKLE_MAX_LEAVES = int(os.getenv("MERKLE_MAX_LEAVES", 50000))
+
+# Vote.status for votes waiting for the next root commit
+QUEUED = "Queued"
+
+
+def merkle_mode_enabled():
+    return ANCHOR_MODE == "merkle"
+
+
+def _store_proofs(votes, levels):
+    for vote in votes:
+        vote.merkle_proof = merkle.proof_from_levels(levels, vote.merkle_index)
+
+
+def create_batch(limit=MERKLE_MAX_LEAVES):
+    """
+    Assign queued, unbatched votes to a new MerkleBatch. Returns None if nothing
+    is queued. Each vote keeps its own inclusion proof, so verification never
+    has to rebuild the tree.
+    """
+    from votes.models import Vote
+
+    with transaction.atomic():
+        votes = list(
+            Vote.objects.select_for_update()
+            .filter(status=QUEUED, merkle_batch__isnull=True)
+            .order_by("id")[:limit]
+        )
+        if not votes:
+            return None
+
+        levels = merkle.build_levels([v.receipt for v in votes])
+        batch = MerkleBatch.objects.create(root="0x" + levels[-1][0].hex(), leaf_count=len(votes))
+        for idx, vote in enumerate(votes):
+            vote.merkle_batch = batch
+            vote.merkle_index = idx
+        _store_proofs(votes, levels)
+        Vote.objects.bulk_update(votes, ["merkle_batch", "merkle_index", "merkle_proof"], batch_size=1000)
+    return batch
+
+
+def _sent_receipt(batch):
+    """
+    Receipt of the transaction already broadcast for `batch` (or of a fee-bumped
+    replacement), None while it is still unmined.
+    """
+    from blockchain.models import RelayedTransaction
+    from blockchain.utils import get_receipts
+
+    relayed = RelayedTransaction.objects.filter(tx_hash=batch.tx_hash).first()
+    if relayed is not None and relayed.status == RelayedTransaction.Status.ABANDONED:
+        # Its nonce was given up, so the root was never anchored: send it again
+        batch.status = MerkleBatch.Status.FAILED
+        batch.save(update_fields=["status"])
+        return None
+
+    hashes = relayed.all_hashes if relayed is not None else [batch.tx_hash]
+    receipts = get_receipts(hashes)
+    return next((receipts[h] for h in hashes if receipts.get(h)), None)
+
+
+def commit_batch(batch):
+    """
+    Send the batch root on-chain and mark its votes as synced on success.
+    A batch whose transaction was broadcast but not yet confirmed stays Pending
+    with its tx_hash, and later passes only look for the receipt instead of
+    paying for a second anchor.
+    """
+    from votes.models import Vote
+    from votes.tally import update_votes
+    from blockchain.utils import anchor_data, TransactionPending
+
+    if batch.tx_hash and batch.status == MerkleBatch.Status.PENDING:
+        tx_receipt = _sent_receipt(batch)
+        if tx_receipt is None:
+            return batch
+    else:
+        try:
+            tx_receipt = anchor_data(bytes.fromhex(batch.root[2:]))
+        except TransactionPending as e:
+            logger.warning(f"Merkle root {batch.root} sent in {e.tx_hash}, not confirmed yet: {e}")
+            batch.tx_hash = e.tx_hash
+            batch.status = MerkleBatch.Status.PENDING
+            batch.save(update_fields=["tx_hash", "status"])
+            return batch
+        except Exception as e:
+            logger.exception(f"Failed to anchor Merkle root {batch.root}: {e}")
+            batch.status = MerkleBatch.Status.FAILED
+            batch.save(update_fields=["status"])
+            return batch
+
+    batch.tx_hash = tx_receipt["transactionHash"].hex()
+    batch.block_number = tx_receipt.get("blockNumber")
+    if tx_receipt.get("status") != 1:
+        batch.status = MerkleBatch.Status.FAILED
+        batch.save(update_fields=["tx_hash", "block_number", "status"])
+        return batch
+
+    with transaction.atomic():
+        batch.status = MerkleBatch.Status.SUCCESS
+        batch.committed_at = timezone.now()
+        batch.save(update_fields=["tx_hash", "block_number", "status", "committed_at"])
+        update_votes(
+            Vote.objects.filter(merkle_batch=batch),
+            tx_hash=batch.tx_hash,
+            block_number=batch.block_number,
+            status="Success",
+            is_synced=True,
+        )
+    logger.info(f"Anchored Merkle root {batch.root} over {batch.leaf_count} receipts.")
+    return batch
+
+
+def commit_pending_roots(limit=MERKLE_MAX_LEAVES):
+    """Retry failed batches, check broadcast ones for receipts, then batch and commit newly queued votes."""
+    committed = []
+    retry = MerkleBatch.objects.exclude(status=MerkleBatch.Status.SUCCESS).order_by("created_at")
+    for batch in retry:
+        committed.append(commit_batch(batch))
+
+    batch = create_batch(limit)
+    if batch:
+        committed.append(commit_batch(batch))
+    return committed
+
+
+def inclusion_proof(vote):
+    """Inclusion proof of `vote.receipt` in its batch root, or None if not batched yet."""
+    from votes.models import Vote
+
+    if not vote.merkle_batch_id:
+        return None
+
+    batch = vote.merkle_batch
+    if vote.merkle_proof is None:
+        # Batch created before proofs were stored: build them once and keep them
+        votes = list(Vote.objects.filter(merkle_batch_id=batch.pk).order_by("merkle_index"))
+        _store_proofs(votes, merkle.build_levels([v.receipt for v in votes]))
+        Vote.objects.bulk_update(votes, ["merkle_proof"], batch_size=1000)
+        vote.merkle_proof = votes[vote.merkle_index].merkle_proof
+    return {
+        "receipt": vote.receipt,
+        "leaf": "0x" + merkle.leaf_hash(vote.receipt).hex(),
+        "index": vote.merkle_index,
+        "proof": vote.merkle_proof,
+        "root": batch.root,
+        "anchored": batch.status == MerkleBatch.Status.SUCCESS,
+        "anchor_tx_hash": batch.tx_hash,
+        "anchor_block_number": batch.block_number,
+    }
@@ -0,0 +1,146 @@
+# blockchain/chainhead.py
+"""
+Shared chain head.
+
+`manage.py track_chain_head` follows the chain (newHeads subscription when
+CHAIN_HEAD_WS_URL is set, polling otherwise) and publishes the latest block
+number, hash and timestamp to the single ChainHead row. Every worker reads
+the head from there (and keeps it in memory while it is fresh) instead of
+calling eth_blockNumber itself. A published head older than
+CHAIN_HEAD_MAX_AGE seconds is stale: the first reader to notice fetches the
+head once and republishes it, so without the tracker the workers still
+share one lookup per staleness window.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime, timezone as dt_timezone
+
+from blockchain.models import ChainHead
+
+logger = logging.getLogger(__name__)
+
+CHAIN_HEAD_MAX_AGE = float(os.getenv("CHAIN_HEAD_MAX_AGE", 10))
+CHAIN_HEAD_POLL_SECONDS = float(os.getenv("CHAIN_HEAD_POLL_SECONDS", 2))
+CHAIN_HEAD_WS_URL = os.getenv("CHAIN_HEAD_WS_URL")
+
+# Primary key of the one ChainHead row
+HEAD_ROW = 1
+
+# Last head read or published by this process
+_local = {"head": None}
+
+
+def _as_dict(row):
+    return {
+        "number": row.number,
+        "hash": row.hash,
+        "timestamp": row.timestamp,
+        "observed_at": row.observed_at.timestamp(),
+    }
+
+
+def publish_head(block):
+    head = {
+        "number": block["number"],
+        "hash": block["hash"].hex() if isinstance(block["hash"], bytes) else block["hash"],
+        "timestamp": block["timestamp"],
+        "observed_at": time.time(),
+    }
+    ChainHead.objects.update_or_create(pk=HEAD_ROW, defaults={
+        **head, "observed_at": datetime.fromtimestamp(head["observed_at"], tz=dt_timezone.utc)
+    })
+    _local["head"] = head
+    return head
+
+
+def cached_head():
+    """Last published head (possibly stale), or None."""
+    row = ChainHead.objects.filter(pk=HEAD_ROW).first()
+    _local["head"] = _as_dict(row) if row else None
+    return _local["head"]
+
+
+def head_age(head):
+    return time.time() - head["observed_at"]
+
+
+def refresh_head():
+    from blockchain.utils import web3
+
+    return publish_head(web3.eth.get_block("latest"))
+
+
+def get_head(max_age=CHAIN_HEAD_MAX_AGE):
+    """Latest head as {"number", "hash", "timestamp", "observed_at"}, at most `max_age` seconds old."""
+    head = _local["head"]
+    if head is not None and head_age(head) <= max_age:
+        return head
+    head = cached_head()
+    if head is not None and head_age(head) <= max_age:
+        return head
+    return refresh_head()
+
+
+def head_number(max_age=CHAIN_HEAD_MAX_AGE):
+    return get_head(max_age)["number"]
+
+
+def confirmations(block_number, max_age=CHAIN_HEAD_MAX_AGE):
+    """Confirmations of `block_number` against the shared head (never negative)."""
+    return max(head_number(max_age) - block_number, 0)
+
+
+def is_fresh(max_age=CHAIN_HEAD_MAX_AGE):
+    head = _local["head"]
+    if head is None or head_age(head) > max_age:
+        head = cached_head()
+    return head is not None and head_age(head) <= max_age
+
+
+def health():
+    head = cached_head()
+    if head is None:
+        return {"head": None, "age_seconds": None, "fresh": False}
+    age = head_age(head)
+    return {"head": head, "age_seconds": round(age, 3), "fresh": age <= CHAIN_HEAD_MAX_AGE}
+
+
+# ---------------------- Tracker ----------------------
+def poll_head(interval=CHAIN_HEAD_POLL_SECONDS, on_head=None):
+    """Poll eth_getBlockByNumber("latest") forever, publishing every new head."""
+    last = None
+    while True:
+        try:
+            head = refresh_head()
+            if head["number"] != last:
+                last = head["number"]
+                if on_head:
+                    on_head(head)
+        except Exception as e:
+            logger.warning(f"Chain head poll failed: {e}")
+        time.sleep(interval)
+
+
+async def _subscribe_heads(ws_url, on_head):
+    from web3 import AsyncWeb3, WebSocketProvider
+
+    async with AsyncWeb3(WebSocketProvider(ws_url)) as w3:
+        await w3.eth.subscribe("newHeads")
+        logger.info(f"Subscribed to newHeads on {ws_url}")
+        async for message in w3.socket.process_subscriptions():
+            head = publish_head(message["result"])
+            if on_head:
+                on_head(head)
+
+
+def follow_head(ws_url=CHAIN_HEAD_WS_URL, interval=CHAIN_HEAD_POLL_SECONDS, on_head=None):
+    """Publish heads forever: newHeads subscription when `ws_url` is set, polling otherwise or on failure."""
+    if ws_url:
+        try:
+            asyncio.run(_subscribe_heads(ws_url, on_head))
+        except Exception as e:
+            logger.warning(f"newHeads subscription failed ({e}); falling back to polling.")
+    poll_head(interval, on_head)
@@ -0,0 +1,173 @@
+# blockchain/finality.py
+"""
+Reorg-aware finality tracking.
+
+`manage.py track_finality` keeps the hashes of the most recent blocks in
+BlockRecord. Each time the head moves it checks that the last tracked block
+is still canonical; if not, it walks back to the fork point and:
+  - re-fetches receipts (one batch request) only for votes mined in the
+    orphaned blocks and rewrites their block data in one bulk update,
+  - drops indexed VoteCast logs from the orphaned blocks and rewinds the
+    indexer watermark so they are re-indexed from the canonical chain.
+Votes buried FINALITY_DEPTH blocks deep are promoted from "Success" to
+"Final"; caches and indexes may trust Final rows without re-checking the chain.
+"""
+
+import os
+import logging
+from datetime import datetime, timezone as dt_timezone
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from blockchain.models import BlockRecord, ChainVoteLog, IndexerState
+
+logger = logging.getLogger(__name__)
+
+FINALITY_DEPTH = int(os.getenv("FINALITY_DEPTH", 64))
+FINALITY_BLOCK_WINDOW = int(os.getenv("FINALITY_BLOCK_WINDOW", 256))
+
+# Vote.status values
+SUCCESS = "Success"
+FINAL = "Final"
+
+
+def _record(block):
+    return BlockRecord(
+        number=block["number"],
+        hash=block["hash"].hex(),
+        parent_hash=block["parentHash"].hex(),
+        timestamp=block["timestamp"],
+    )
+
+
+def _matches(block, record):
+    return block is not None and block["hash"].hex() == record.hash
+
+
+def _find_fork_point(tip):
+    """
+    Walk stored blocks down from `tip` and return (first orphaned block number,
+    canonical blocks fetched on the way).
+    """
+    from blockchain.utils import get_blocks
+
+    stored = list(BlockRecord.objects.filter(number__lte=tip.number).order_by("-number"))
+    canonical = get_blocks([r.number for r in stored])
+
+    first_orphaned = tip.number
+    for record in stored:
+        if _matches(canonical.get(record.number), record):
+            break
+        first_orphaned = record.number
+    else:
+        logger.error(
+            f"Reorg deeper than the tracked window ({len(stored)} blocks); "
+            f"treating everything from block {first_orphaned} as orphaned."
+        )
+    return first_orphaned, canonical
+
+
+def refresh_votes(votes):
+    """Re-fetch receipts for the given votes' transactions and rewrite their block data in bulk."""
+    from votes.models import Vote
+    from blockchain.utils import get_blocks, get_receipts
+
+    if not votes:
+        return 0
+
+    receipts = get_receipts({v.tx_hash for v in votes})
+    block_numbers = {r["blockNumber"] for r in receipts.values() if r is not None}
+    blocks = get_blocks(block_numbers)
+
+    for vote in votes:
+        receipt = receipts.get(vote.tx_hash)
+        if receipt is None:
+            # Dropped back into the mempool by the reorg
+            vote.block_number = None
+            vote.block_timestamp = None
+            vote.block_confirmations = None
+            vote.status = "Pending"
+            continue
+
+        block = blocks.get(receipt["blockNumber"])
+        vote.block_number = receipt["blockNumber"]
+        vote.block_timestamp = (
+            datetime.fromtimestamp(block["timestamp"], tz=dt_timezone.utc) if block else None
+        )
+        vote.status = SUCCESS if receipt.get("status") == 1 else "Failed"
+
+    Vote.objects.bulk_update(
+        votes, ["block_number", "block_timestamp", "block_confirmations", "status"]
+    )
+    return len(votes)
+
+
+def handle_reorg(first_orphaned):
+    """Invalidate chain-derived data from `first_orphaned` onwards. Returns the number of votes refreshed."""
+    from votes.models import Vote
+    from blockchain.indexer import VOTE_INDEXER
+
+    logger.warning(f"Chain reorganisation detected from block {first_orphaned}.")
+    with transaction.atomic():
+        BlockRecord.objects.filter(number__gte=first_orphaned).delete()
+        ChainVoteLog.objects.filter(block_number__gte=first_orphaned).delete()
+        IndexerState.objects.filter(
+            name=VOTE_INDEXER, last_block__gte=first_orphaned
+        ).update(last_block=first_orphaned - 1)
+
+    affected = list(
+        Vote.objects.filter(block_number__gte=first_orphaned, tx_hash__isnull=False)
+    )
+    return refresh_votes(affected)
+
+
+def update_confirmations(head):
+    """Refresh confirmation counts of non-final votes and promote deep enough ones to Final."""
+    from votes.models import Vote
+
+    # The shared head may lag a vote mined since; count such votes as unconfirmed, never negative
+    Vote.objects.filter(status=SUCCESS, block_number__isnull=False).update(
+        block_confirmations=Greatest(Value(head) - F("block_number"), Value(0))
+    )
+    return Vote.objects.filter(
+        status=SUCCESS, block_number__lte=head - FINALITY_DEPTH
+    ).update(status=FINAL)
+
+
+def track_head():
+    """One finality tick: record new blocks, handle reorgs, update confirmations."""
+    from blockchain.utils import get_blocks
+    from blockchain.chainhead import head_number
+
+    head = head_number()
+    tip = BlockRecord.objects.order_by("-number").first()
+
+    numbers = set(range(max(head - FINALITY_BLOCK_WINDOW + 1, 0), head + 1))
+    if tip is not None:
+        numbers = {n for n in numbers if n > tip.number} | {tip.number}
+    blocks = get_blocks(sorted(numbers))
+
+    first_orphaned, refreshed = None, 0
+    if tip is not None and not _matches(blocks.get(tip.number), tip):
+        first_orphaned, canonical = _find_fork_point(tip)
+        refreshed = handle_reorg(first_orphaned)
+        blocks.update({n: b for n, b in canonical.items() if n >= first_orphaned})
+
+    records = [_record(b) for b in blocks.values() if b is not None]
+    with transaction.atomic():
+        BlockRecord.objects.filter(number__in=[r.number for r in records]).delete()
+        BlockRecord.objects.bulk_create(records)
+        BlockRecord.objects.filter(number__lte=head - FINALITY_BLOCK_WINDOW).delete()
+
+    finalized = update_confirmations(head)
+    return {
+        "head": head,
+        "reorg_from": first_orphaned,
+        "votes_refreshed": refreshed,
+        "votes_finalized": finalized,
+    }
+
+
+def is_final(vote):
+    return vote.status == FINAL
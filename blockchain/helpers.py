@@ -1,16 +1,28 @@
+import os
 import logging
+from django.core.cache import cache
+from django.utils import timezone
 from .utils import (
     contract,
     build_and_send_tx,
     to_bytes32,
     from_bytes32,
+    _election_exists_onchain,
+    _position_exists_onchain,
+    _candidate_exists_onchain,
 )
+from . import readmodel
+from .votedstate import voted_state
 from elections.models.elections import Election
 from elections.models.positions import Position
 from elections.models.candidates import Candidate
 
 logger = logging.getLogger(__name__)
 
+# Seconds to keep decoded getBallotResults() output for running / ended elections
+BALLOT_RESULTS_TTL = int(os.getenv("BALLOT_RESULTS_TTL", 15))
+ENDED_BALLOT_RESULTS_TTL = int(os.getenv("ENDED_BALLOT_RESULTS_TTL", 24 * 60 * 60))
+
 # ----------------------
 # Blockchain Add Helpers
 # ----------------------
@@ -27,7 +39,7 @@ def add_election(election_code, mark_synced=False):
         code_bytes = to_bytes32(election_code)
 
         # Check if already on-chain
-        if contract().functions.electionExists(code_bytes).call():
+        if election_exists_onchain(election_code):
             logger.info(f"Election {election_code} already exists on-chain.")
             if mark_synced:
                 Election.objects.filter(code=election_code).update(is_synced=True)
@@ -36,6 +48,8 @@ def add_election(election_code, mark_synced=False):
         # Add to blockchain
         receipt = build_and_send_tx(contract().functions.addElection, code_bytes)
         logger.info(f"Election {election_code} deployed to blockchain.")
+        if receipt.get("status") == 1:
+            readmodel.record_election(election_code)
 
         if mark_synced:
             Election.objects.filter(code=election_code).update(is_synced=True)
@@ -50,7 +64,7 @@ def add_election(election_code, mark_synced=False):
 def add_position(position_code, title, election_code, mark_synced=True):
     """Add a position to an existing election on-chain."""
     election_bytes = to_bytes32(election_code)
-    if not contract().functions.electionExists(election_bytes).call():
+    if not election_exists_onchain(election_code):
         raise ValueError(f"Election {election_code} does not exist on-chain.")
 
     position_bytes = to_bytes32(position_code)
@@ -67,6 +81,8 @@ def add_position(position_code, title, election_code, mark_synced=True):
         election_bytes
     )
     logger.info(f"Position {position_code} added to election {election_code}.")
+    if receipt.get("status") == 1:
+        readmodel.record_position(position_code, election_code)
 
     if mark_synced:
         Position.objects.filter(code=position_code).update(is_synced=True)
@@ -91,6 +107,8 @@ def add_candidate(position_code, candidate_code, name, mark_synced=True):
         name
     )
     logger.info(f"Candidate {candidate_code} added to position {position_code}.")
+    if receipt.get("status") == 1:
+        readmodel.record_candidate(position_code, candidate_code)
 
     if mark_synced:
         Candidate.objects.filter(code=candidate_code).update(is_synced=True)
@@ -101,16 +119,22 @@ def add_candidate(position_code, candidate_code, name, mark_synced=True):
 # Blockchain Queries
 # ----------------------
 
+def election_exists_onchain(election_code):
+    return _election_exists_onchain(election_code)
+
+
 def position_exists_onchain(position_code):
-    return contract().functions.positionExists(to_bytes32(position_code)).call()
+    return _position_exists_onchain(position_code)
 
 
 def candidate_exists_onchain(position_code, candidate_code):
-    """Check if a candidate exists for a position by scanning results."""
-    if not position_exists_onchain(position_code):
-        return False
-    candidate_codes, _ = get_results(position_code)
-    return candidate_code in candidate_codes
+    """Check if a candidate exists for a position (read model first, then candidateExists)."""
+    return _candidate_exists_onchain(position_code, candidate_code)
+
+
+def receipt_used_onchain(receipt_hash):
+    """Check whether a receipt hash was already used (voted state, indexed VoteCast logs, then hasVoted)."""
+    return voted_state.receipt_used(receipt_hash)
 
 
 def get_results(position_code):
@@ -119,10 +143,19 @@ def get_results(position_code):
     return decoded_codes, raw_votes
 
 
-def get_ballot_results(election_code):
+def _ballot_results_ttl(election_code):
+    """Short TTL while an election can still receive votes, long once it has ended."""
+    end_date = Election.objects.filter(code=election_code).values_list("end_date", flat=True).first()
+    if end_date and end_date < timezone.now():
+        return ENDED_BALLOT_RESULTS_TTL
+    return BALLOT_RESULTS_TTL
+
+
+def get_ballot_results(election_code, use_cache=True):
     """
     Fetch results for the entire election ballot (all positions + candidates) from blockchain.
-    Wraps the Solidity getBallotResults(electionCode) call.
+    Wraps the Solidity getBallotResults(electionCode) call: one RPC for the whole election.
+    Decoded results are cached per election (see BALLOT_RESULTS_TTL / ENDED_BALLOT_RESULTS_TTL).
     Returns:
         {
           "position_code": str,
@@ -130,35 +163,57 @@ def get_ballot_results(election_code):
           "votes": int
         }[]
     """
+    cache_key = f"ballot_results:{election_code}"
+    if use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
         raw_positions, raw_candidates, raw_votes = contract().functions.getBallotResults(
             to_bytes32(election_code)
         ).call()
 
-        decoded_positions = [from_bytes32(p) for p in raw_positions]
-        decoded_candidates = [from_bytes32(c) for c in raw_candidates]
-
+        # candidates and votes are nested per position: bytes32[][] / uint256[][]
         results = []
-        for pos_code, cand_code, votes in zip(decoded_positions, decoded_candidates, raw_votes):
-            results.append({
-                "position_code": pos_code,
-                "candidate_code": cand_code,
-                "votes": votes
-            })
-
-        return results
+        for raw_pos, pos_candidates, pos_votes in zip(raw_positions, raw_candidates, raw_votes):
+            pos_code = from_bytes32(raw_pos)
+            for raw_cand, votes in zip(pos_candidates, pos_votes):
+                results.append({
+                    "position_code": pos_code,
+                    "candidate_code": from_bytes32(raw_cand),
+                    "votes": votes
+                })
 
     except Exception as e:
         logger.exception(f"Failed to fetch ballot results for election {election_code}: {e}")
         return []
 
+    cache.set(cache_key, results, _ballot_results_ttl(election_code))
+    return results
+
+
+def group_ballot_results(results):
+    """Group flat get_ballot_results() rows by position code, preserving chain order."""
+    grouped = {}
+    for row in results:
+        grouped.setdefault(row["position_code"], []).append({
+            "candidate_code": row["candidate_code"],
+            "votes": row["votes"],
+        })
+    return grouped
+
 
 # ----------------------
 # Voting
 # ----------------------
 
+from contextlib import ExitStack
 from web3.exceptions import ContractLogicError
-from .utils import extract_revert_reason
+from .utils import extract_revert_reason, TransactionPending, submit_tx, wait_for_receipt
+from .relayers import relayer_pool
+from .planner import plan_chunks
+from .simulation import split_passing, VOTE_DRY_RUN
 
 def cast_vote(position_code, candidate_code, receipt_hash):
     """Cast a single vote with validation and clean revert-reason reporting."""
@@ -180,6 +235,8 @@ def cast_vote(position_code, candidate_code, receipt_hash):
     except ContractLogicError as e:
         reason = extract_revert_reason(e)
         raise Exception(f"Vote failed: {reason}")
+    except TransactionPending:
+        raise
     except Exception as e:
         raise Exception(f"Unexpected error while casting vote: {str(e)}")
 
@@ -208,10 +265,79 @@ def cast_vote_batch(position_codes, candidate_codes, receipt_hashes):
     except ContractLogicError as e:
         reason = extract_revert_reason(e)
         raise Exception(f"Batch vote failed: {reason}")
+    except TransactionPending:
+        raise
     except Exception as e:
         raise Exception(f"Unexpected error while casting batch vote: {str(e)}")
 
 
+def cast_vote_batch_chunked(position_codes, candidate_codes, receipt_hashes, dry_run=VOTE_DRY_RUN):
+    """
+    Cast a ballot as one or more voteBatch transactions sized by the gas planner.
+    All chunks are broadcast first (each on the least-loaded relayer lane) and
+    their receipts awaited afterwards, so chunks are mined in parallel.
+    Returns one dict per chunk:
+        {"indices": [int], "tx_hash": str|None, "receipt": obj|None,
+         "status": "Success"|"Failed"|"Pending", "error": str|None}
+    A chunk with tx_hash None was never broadcast (e.g. it reverted at estimation).
+    With `dry_run` every vote is simulated first; votes that would revert come
+    back as unsent "Failed" chunks carrying the decoded revert reason.
+    """
+    if not (len(position_codes) == len(candidate_codes) == len(receipt_hashes)):
+        raise ValueError("Mismatched array lengths for batch voting.")
+
+    pos_bytes = [to_bytes32(p) for p in position_codes]
+    cand_bytes = [to_bytes32(c) for c in candidate_codes]
+    receipt_bytes = [to_bytes32(r) for r in receipt_hashes]
+
+    results, submitted = [], []
+    sendable = list(range(len(receipt_hashes)))
+    if dry_run:
+        try:
+            sendable, failing = split_passing(position_codes, candidate_codes, receipt_hashes)
+        except Exception as e:
+            logger.warning(f"Vote dry run unavailable ({e}); sending without it.")
+        else:
+            for i, reason in failing.items():
+                results.append({"indices": [i], "tx_hash": None, "receipt": None,
+                                "status": "Failed", "error": f"Batch vote failed: {reason}"})
+
+    fn = contract().functions.voteBatch
+    with ExitStack() as leases:
+        for planned in plan_chunks(len(sendable)):
+            indices = [sendable[i] for i in planned]
+            chunk = {"indices": indices, "tx_hash": None, "receipt": None, "status": None, "error": None}
+            try:
+                signer = leases.enter_context(relayer_pool().lease())
+                tx, tx_hash = submit_tx(
+                    signer, fn,
+                    [pos_bytes[i] for i in indices],
+                    [cand_bytes[i] for i in indices],
+                    [receipt_bytes[i] for i in indices],
+                )
+                chunk["tx_hash"] = tx_hash.hex()
+                submitted.append((chunk, tx, tx_hash))
+            except Exception as e:
+                logger.warning(f"voteBatch chunk {indices} not sent: {e}")
+                chunk.update(status="Failed", error=str(e))
+            results.append(chunk)
+
+        for chunk, tx, tx_hash in submitted:
+            try:
+                receipt = wait_for_receipt(tx, tx_hash, "voteBatch")
+            except Exception as e:
+                # Broadcast but not confirmed (TransactionPending or RPC error): the watchdog resolves it
+                chunk.update(status="Pending", error=str(e))
+                continue
+            chunk["receipt"] = receipt
+            if receipt.get("status") == 1:
+                chunk["status"] = "Success"
+            else:
+                chunk.update(status="Failed", error="Transaction reverted on-chain.")
+
+    return results
+
+
 # ----------------------
 # Sync Flow
 # ----------------------
@@ -219,7 +345,7 @@ def cast_vote_batch(position_codes, candidate_codes, receipt_hashes):
 def sync_election(election_code):
     """Ensure election exists on-chain, then sync positions & candidates."""
     # Deploy election if missing
-    if not contract().functions.electionExists(to_bytes32(election_code)).call():
+    if not election_exists_onchain(election_code):
         add_election(election_code, mark_synced=True)
 
     # Sync positions
@@ -0,0 +1,126 @@
+# blockchain/indexer.py
+"""
+Local index of on-chain VoteCast logs.
+
+`manage.py index_chain_votes` follows the chain with eth_getLogs and stores
+every VoteCast event in ChainVoteLog, keyed by receipt hash, so receipt
+verification can be answered from the database without touching the RPC
+provider.
+"""
+
+import os
+import logging
+
+from blockchain.models import ChainVoteLog, IndexerState
+from blockchain import readmodel
+from blockchain.votedstate import voted_state
+
+logger = logging.getLogger(__name__)
+
+VOTE_INDEXER = "vote_cast"
+VOTE_INDEX_START_BLOCK = int(os.getenv("VOTE_INDEX_START_BLOCK", 0))
+VOTE_INDEX_CHUNK_SIZE = int(os.getenv("VOTE_INDEX_CHUNK_SIZE", 2000))
+
+# Max receipts per `receipt_hash__in` query (keeps SQL parameter counts sane)
+LOOKUP_CHUNK_SIZE = 5000
+
+
+def normalize_receipt(receipt):
+    """Receipt as stored on-chain: lowercase hex, no 0x, right-padded to bytes32."""
+    if isinstance(receipt, bytes):
+        return receipt.hex()
+    s = receipt.strip().lower()
+    if s.startswith("0x"):
+        s = s[2:]
+    return s.ljust(64, "0")
+
+
+def decode_vote_log(log):
+    from blockchain.utils import from_bytes32
+
+    args = log["args"]
+    return ChainVoteLog(
+        receipt_hash=normalize_receipt(bytes(args["receiptHash"])),
+        election_code=from_bytes32(args["electionCode"]),
+        position_code=from_bytes32(args["positionCode"]),
+        candidate_code=from_bytes32(args["candidateCode"]),
+        tx_hash=log["transactionHash"].hex(),
+        block_number=log["blockNumber"],
+        block_hash=log["blockHash"].hex(),
+        log_index=log["logIndex"],
+        chain_timestamp=args["timestamp"],
+    )
+
+
+def index_range(from_block, to_block):
+    """Fetch and store VoteCast logs for [from_block, to_block]. Returns the number of logs seen."""
+    from blockchain.utils import contract
+
+    logs = contract().events.VoteCast.get_logs(from_block=from_block, to_block=to_block)
+    rows = [decode_vote_log(log) for log in logs]
+    if rows:
+        ChainVoteLog.objects.bulk_create(rows, ignore_conflicts=True)
+        readmodel.record_from_vote_logs(rows)
+        voted_state.mark_receipts_used(r.receipt_hash for r in rows)
+    return len(rows)
+
+
+def sync_vote_index(confirmations=0, chunk_size=VOTE_INDEX_CHUNK_SIZE):
+    """Index VoteCast logs from the last watermark up to head - confirmations."""
+    from blockchain.chainhead import head_number
+
+    state, _ = IndexerState.objects.get_or_create(
+        name=VOTE_INDEXER, defaults={"last_block": max(VOTE_INDEX_START_BLOCK - 1, 0)}
+    )
+    head = head_number()
+    target = head - confirmations
+    start = max(state.last_block + 1, VOTE_INDEX_START_BLOCK)
+
+    indexed = 0
+    while start <= target:
+        end = min(start + chunk_size - 1, target)
+        indexed += index_range(start, end)
+        state.last_block = end
+        state.head_block = head
+        state.save(update_fields=["last_block", "head_block", "updated_at"])
+        start = end + 1
+
+    if state.head_block != head:
+        state.head_block = head
+        state.save(update_fields=["head_block", "updated_at"])
+    return indexed
+
+
+def indexed_head():
+    """Chain head recorded by the indexer on its last run (0 if it never ran)."""
+    return (
+        IndexerState.objects.filter(name=VOTE_INDEXER)
+        .values_list("head_block", flat=True)
+        .first()
+    ) or 0
+
+
+def lookup_receipts(receipts):
+    """Map normalized receipt hash -> ChainVoteLog for every receipt found in the index."""
+    keys = list({normalize_receipt(r) for r in receipts})
+    found = {}
+    for i in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+        for log in ChainVoteLog.objects.filter(receipt_hash__in=keys[i:i + LOOKUP_CHUNK_SIZE]):
+            found[log.receipt_hash] = log
+    return found
+
+
+def onchain_record(log, head):
+    """Serializable on-chain proof for a receipt, or None when it is not indexed."""
+    if log is None:
+        return None
+    return {
+        "election_code": log.election_code,
+        "position_code": log.position_code,
+        "candidate_code": log.candidate_code,
+        "tx_hash": log.tx_hash,
+        "block_number": log.block_number,
+        "block_hash": log.block_hash,
+        "log_index": log.log_index,
+        "confirmations": max(head - log.block_number, 0) if head else None,
+    }
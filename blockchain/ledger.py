@@ -0,0 +1,164 @@
+# blockchain/ledger.py
+"""
+Network fee ledger.
+
+Every relayed transaction (RelayedTransaction) records the gas used, the
+effective gas price and the fee from its receipt exactly once, and the
+FeeRollup totals for its election, its day and its contract function are
+incremented in the same DB transaction. Cost reports read the rollups
+instead of summing fees over the vote table.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import F, Sum, Count
+from django.utils import timezone
+
+from blockchain.models import RelayedTransaction, FeeRollup
+
+logger = logging.getLogger(__name__)
+
+WEI_PER_MATIC = Decimal(10 ** 18)
+
+
+def vote_count_for(fn_name, args):
+    if fn_name == "vote":
+        return 1
+    if fn_name == "voteBatch":
+        return len(args[0])
+    return 0
+
+
+def election_code_for(fn_name, args):
+    """Election a contract call belongs to, derived from its arguments ('' when unknown)."""
+    from blockchain.utils import from_bytes32
+    from elections.models.positions import Position
+
+    try:
+        if fn_name == "addElection":
+            return from_bytes32(args[0])
+        if fn_name == "addPosition":
+            return from_bytes32(args[2])
+        if fn_name in ("addCandidate", "vote"):
+            position_code = from_bytes32(args[0])
+        elif fn_name == "voteBatch" and args[0]:
+            position_code = from_bytes32(args[0][0])
+        else:
+            return ""
+        return Position.objects.filter(code=position_code).values_list(
+            "election__code", flat=True
+        ).first() or ""
+    except Exception as e:
+        logger.debug(f"Could not resolve election for {fn_name}: {e}")
+        return ""
+
+
+def fee_shares_matic(receipt, vote_count):
+    """
+    Per-vote shares of the transaction fee, in MATIC. The fee is split in whole
+    wei with the remainder going to the first shares, so they add up to it exactly.
+    """
+    gas_price = receipt.get("effectiveGasPrice") or receipt.get("gasPrice")
+    if not receipt.get("gasUsed") or not gas_price or not vote_count:
+        return None
+    share, remainder = divmod(receipt["gasUsed"] * gas_price, vote_count)
+    return [Decimal(share + (i < remainder)) / WEI_PER_MATIC for i in range(vote_count)]
+
+
+def store_fee_shares(vote_ids, shares):
+    """Write each vote's fee share: one UPDATE per distinct share, so at most two."""
+    from votes.models import Vote
+
+    by_share = defaultdict(list)
+    for vote_id, share in zip(vote_ids, shares or ()):
+        by_share[share].append(vote_id)
+    for share, ids in by_share.items():
+        Vote.objects.filter(pk__in=ids).update(network_fee_matic=share)
+
+
+def _bump_rollups(relayed, day):
+    for dimension, key in (
+        (FeeRollup.Dimension.ELECTION, relayed.election_code or "unassigned"),
+        (FeeRollup.Dimension.DAY, day.isoformat()),
+        (FeeRollup.Dimension.FUNCTION, relayed.function or "unknown"),
+    ):
+        FeeRollup.objects.get_or_create(dimension=dimension, key=key)
+        FeeRollup.objects.filter(dimension=dimension, key=key).update(
+            tx_count=F("tx_count") + 1,
+            vote_count=F("vote_count") + relayed.vote_count,
+            gas_used=F("gas_used") + relayed.gas_used,
+            fee_wei=F("fee_wei") + relayed.fee_wei,
+        )
+
+
+def record_receipt(tx_hash, receipt):
+    """
+    Fill the ledger row for `tx_hash` from its receipt and add it to the rollups.
+    Idempotent: a row that already has its fee recorded is left alone.
+    """
+    gas_used = receipt.get("gasUsed")
+    gas_price = receipt.get("effectiveGasPrice") or receipt.get("gasPrice")
+    if gas_used is None or gas_price is None:
+        return False
+
+    with transaction.atomic():
+        updated = RelayedTransaction.objects.filter(tx_hash=tx_hash, gas_used__isnull=True).update(
+            block_number=receipt.get("blockNumber"),
+            gas_used=gas_used,
+            effective_gas_price=gas_price,
+            fee_wei=gas_used * gas_price,
+        )
+        if not updated:
+            return False
+        relayed = RelayedTransaction.objects.get(tx_hash=tx_hash)
+        _bump_rollups(relayed, (relayed.mined_at or timezone.now()).date())
+    return True
+
+
+def rebuild_rollups():
+    """Recompute every FeeRollup from the ledger rows. Returns the number of rollups written."""
+    from django.db.models.functions import TruncDate
+
+    mined = RelayedTransaction.objects.filter(gas_used__isnull=False)
+    totals = dict(tx_count=Count("id"), vote_count=Sum("vote_count"), gas_used=Sum("gas_used"), fee_wei=Sum("fee_wei"))
+    rows = []
+    for dimension, field, rows_qs in (
+        (FeeRollup.Dimension.ELECTION, "election_code", mined.values("election_code")),
+        (FeeRollup.Dimension.DAY, "day", mined.annotate(day=TruncDate("mined_at")).values("day")),
+        (FeeRollup.Dimension.FUNCTION, "function", mined.values("function")),
+    ):
+        for row in rows_qs.annotate(**totals).order_by():
+            key = row[field]
+            if dimension == FeeRollup.Dimension.ELECTION:
+                key = key or "unassigned"
+            elif dimension == FeeRollup.Dimension.DAY:
+                key = key.isoformat() if key else "unknown"
+            else:
+                key = key or "unknown"
+            rows.append(FeeRollup(dimension=dimension, key=key, **{k: row[k] or 0 for k in totals}))
+
+    with transaction.atomic():
+        FeeRollup.objects.all().delete()
+        FeeRollup.objects.bulk_create(rows)
+    return len(rows)
+
+
+def fee_report(dimension=None):
+    """Rollup rows as dicts, optionally for a single dimension."""
+    rollups = FeeRollup.objects.all()
+    if dimension:
+        rollups = rollups.filter(dimension=dimension)
+    return [
+        {
+            "dimension": r.dimension,
+            "key": r.key,
+            "tx_count": r.tx_count,
+            "vote_count": r.vote_count,
+            "gas_used": r.gas_used,
+            "fee_matic": str(r.fee_matic),
+            "fee_per_vote_matic": str(r.fee_per_vote_matic) if r.vote_count else None,
+        }
+        for r in rollups
+    ]
@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+
+from blockchain.anchoring import commit_pending_roots, MERKLE_MAX_LEAVES
+from blockchain.models import MerkleBatch
+
+
+class Command(BaseCommand):
+    help = "Commit a Merkle root over newly queued vote receipts (VOTE_ANCHOR_MODE=merkle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval", type=int, default=0,
+            help="Seconds between commits; 0 runs once and exits"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=MERKLE_MAX_LEAVES,
+            help="Maximum receipts per Merkle root"
+        )
+
+    def handle(self, *args, **options):
+        interval = options["interval"]
+        while True:
+            for batch in commit_pending_roots(limit=options["limit"]):
+                if batch.status == MerkleBatch.Status.SUCCESS:
+                    self.stdout.write(self.style.SUCCESS(
+                        f"Anchored {batch.root} ({batch.leaf_count} receipts) in tx {batch.tx_hash}"
+                    ))
+                else:
+                    self.stderr.write(self.style.ERROR(
+                        f"Failed to anchor {batch.root} ({batch.leaf_count} receipts); will retry"
+                    ))
+            if not interval:
+                return
+            time.sleep(interval)
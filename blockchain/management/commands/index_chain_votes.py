@@ -0,0 +1,33 @@
+import time
+from django.core.management.base import BaseCommand
+
+from blockchain.indexer import sync_vote_index, VOTE_INDEX_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Index on-chain VoteCast logs into the local receipt index"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--confirmations", type=int, default=0,
+            help="Only index blocks at least this many blocks below the head"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=VOTE_INDEX_CHUNK_SIZE,
+            help="Blocks per eth_getLogs request"
+        )
+        parser.add_argument(
+            "--follow", type=int, default=0,
+            help="Keep following the chain, polling every N seconds; 0 runs once"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            indexed = sync_vote_index(
+                confirmations=options["confirmations"],
+                chunk_size=options["chunk_size"],
+            )
+            self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} VoteCast logs"))
+            if not options["follow"]:
+                return
+            time.sleep(options["follow"])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blockchain.ledger import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-election, per-day and per-function fee rollups from the transaction ledger"
+
+    def handle(self, *args, **options):
+        written = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} fee rollups"))
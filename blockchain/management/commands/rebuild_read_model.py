@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blockchain.readmodel import rebuild_from_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the local contract read model from indexed VoteCast logs"
+
+    def handle(self, *args, **options):
+        replayed = rebuild_from_index()
+        self.stdout.write(self.style.SUCCESS(f"Replayed {replayed} VoteCast logs into the read model"))
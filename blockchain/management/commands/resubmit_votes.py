@@ -0,0 +1,36 @@
+import time
+from django.core.management.base import BaseCommand
+
+from blockchain.resubmit import resubmit_votes, RESUBMIT_BATCH_LIMIT, RESUBMIT_MIN_AGE_SECONDS
+
+
+class Command(BaseCommand):
+    help = "Resubmit Pending / Failed / orphaned Reserved votes as voteBatch transactions, with backoff"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--limit", type=int, default=RESUBMIT_BATCH_LIMIT,
+            help="Max votes picked up per pass"
+        )
+        parser.add_argument(
+            "--min-age", type=int, default=RESUBMIT_MIN_AGE_SECONDS,
+            help="Only retry votes created at least this many seconds ago"
+        )
+        parser.add_argument(
+            "--follow", type=int, default=0,
+            help="Keep running, one pass every N seconds; 0 runs once"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            counts = resubmit_votes(limit=options["limit"], min_age=options["min_age"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Already on-chain {counts['already_on_chain']}, sent {counts['sent']} "
+                f"(mined {counts['mined']}, pending {counts['pending']}), deferred {counts['deferred']}"
+            ))
+            if not options["follow"]:
+                return
+            # A full pass means more votes are waiting: go again without sleeping
+            picked = counts["already_on_chain"] + counts["sent"] + counts["deferred"]
+            if picked < options["limit"]:
+                time.sleep(options["follow"])
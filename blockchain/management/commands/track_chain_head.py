@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blockchain.chainhead import follow_head, CHAIN_HEAD_WS_URL, CHAIN_HEAD_POLL_SECONDS
+
+
+class Command(BaseCommand):
+    help = "Publish the chain head to the shared cache (newHeads subscription, or polling)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ws-url", default=CHAIN_HEAD_WS_URL,
+            help="WebSocket RPC URL for a newHeads subscription; polls over HTTP when omitted"
+        )
+        parser.add_argument(
+            "--interval", type=float, default=CHAIN_HEAD_POLL_SECONDS,
+            help="Polling interval in seconds"
+        )
+
+    def handle(self, *args, **options):
+        follow_head(
+            ws_url=options["ws_url"],
+            interval=options["interval"],
+            on_head=lambda head: self.stdout.write(self.style.SUCCESS(f"Head {head['number']} {head['hash']}")),
+        )
@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+
+from blockchain.finality import track_head
+
+
+class Command(BaseCommand):
+    help = "Track recent block hashes, repair vote block data after reorgs and promote votes to Final"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--follow", type=int, default=0,
+            help="Keep tracking the head, polling every N seconds; 0 runs once"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = track_head()
+            if result["reorg_from"] is not None:
+                self.stdout.write(self.style.WARNING(
+                    f"Reorg from block {result['reorg_from']}: "
+                    f"{result['votes_refreshed']} votes refreshed"
+                ))
+            self.stdout.write(self.style.SUCCESS(
+                f"Head {result['head']}: {result['votes_finalized']} votes finalized"
+            ))
+            if not options["follow"]:
+                return
+            time.sleep(options["follow"])
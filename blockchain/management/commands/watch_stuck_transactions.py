@@ -0,0 +1,29 @@
+import time
+from django.core.management.base import BaseCommand
+
+from blockchain.watchdog import check_stuck_transactions, STUCK_TX_SECONDS
+
+
+class Command(BaseCommand):
+    help = "Fee-bump relayed transactions stuck in the mempool and link replacements to votes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age", type=int, default=STUCK_TX_SECONDS,
+            help="Seconds a transaction may stay pending before it is bumped"
+        )
+        parser.add_argument(
+            "--follow", type=int, default=0,
+            help="Keep watching, polling every N seconds; 0 runs once"
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            result = check_stuck_transactions(max_age=options["max_age"])
+            self.stdout.write(self.style.SUCCESS(
+                f"Mined {result['mined']}, bumped {result['bumped']}, failed {result['failed']}, "
+                f"abandoned {result['abandoned']}"
+            ))
+            if not options["follow"]:
+                return
+            time.sleep(options["follow"])
@@ -0,0 +1,105 @@
+# blockchain/merkle.py
+"""
+Merkle tree over vote receipt hashes.
+
+Pure functions with no Django/Web3 connection so proofs can be checked
+offline, e.g.:
+
+    python blockchain/merkle.py proof.json
+
+where proof.json is the "merkle_proof" object returned by votes/verify/.
+
+Hashing:
+  leaf = keccak256(0x00 || receipt_bytes)
+  node = keccak256(0x01 || min(a, b) || max(a, b))
+Pairs are sorted, so a proof is just the list of sibling hashes; an odd
+node at the end of a level is promoted unchanged.
+"""
+
+import sys
+import json
+from eth_utils import keccak
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def _receipt_bytes(receipt):
+    if isinstance(receipt, bytes):
+        return receipt
+    s = receipt[2:] if receipt.startswith("0x") else receipt
+    try:
+        return bytes.fromhex(s)
+    except ValueError:
+        return s.encode("utf-8")
+
+
+def _to_hex(value):
+    return "0x" + value.hex()
+
+
+def _from_hex(value):
+    return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+
+
+def leaf_hash(receipt):
+    return keccak(LEAF_PREFIX + _receipt_bytes(receipt))
+
+
+def node_hash(a, b):
+    return keccak(NODE_PREFIX + min(a, b) + max(a, b))
+
+
+def build_levels(receipts):
+    """Return every level of the tree, leaves first and the root level last."""
+    if not receipts:
+        raise ValueError("Cannot build a Merkle tree without leaves.")
+    level = [leaf_hash(r) for r in receipts]
+    levels = [level]
+    while len(level) > 1:
+        nxt = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        levels.append(nxt)
+        level = nxt
+    return levels
+
+
+def merkle_root(receipts):
+    return _to_hex(build_levels(receipts)[-1][0])
+
+
+def proof_from_levels(levels, index):
+    """Sibling hashes (hex) from leaf `index` up to the root."""
+    if not 0 <= index < len(levels[0]):
+        raise IndexError(f"Leaf index {index} out of range.")
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(_to_hex(level[sibling]))
+        index //= 2
+    return proof
+
+
+def merkle_proof(receipts, index):
+    return proof_from_levels(build_levels(receipts), index)
+
+
+def verify_proof(receipt, proof, root):
+    """Check that `receipt` is included under `root` using the sibling list `proof`."""
+    computed = leaf_hash(receipt)
+    for sibling in proof:
+        computed = node_hash(computed, _from_hex(sibling))
+    return computed == _from_hex(root)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("usage: python blockchain/merkle.py <proof.json>")
+        sys.exit(2)
+    with open(sys.argv[1]) as f:
+        data = json.load(f)
+    ok = verify_proof(data["receipt"], data["proof"], data["root"])
+    print("✅ Receipt included in root" if ok else "❌ Proof does not match root")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,189 @@
+# blockchain/metrics.py
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from web3.middleware import Web3Middleware
+
+logger = logging.getLogger(__name__)
+slow_call_logger = logging.getLogger("blockchain.slow_calls")
+
+# Calls slower than this (milliseconds) are written to the slow-call log
+SLOW_CALL_MS = float(os.getenv("RPC_SLOW_CALL_MS", 2000))
+
+# Upper bounds (milliseconds) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# Metric kinds
+RPC = "rpc"            # one JSON-RPC method (eth_call, eth_sendRawTransaction, ...)
+CONTRACT = "contract"  # one contract function, resolved from the call data selector
+TX = "tx"              # a full build_and_send_tx round trip, per contract function
+TX_PHASE = "tx_phase"  # nonce / estimate / build / sign / send / receipt breakdown
+
+
+class _Series:
+    """Count, error count and latency histogram for one (kind, name) pair."""
+
+    __slots__ = ("count", "errors", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, duration_ms, error):
+        self.count += 1
+        if error:
+            self.errors += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        for idx, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                self.buckets[idx] += 1
+                return
+        self.buckets[-1] += 1
+
+    def snapshot(self):
+        cumulative, running = {}, 0
+        for bound, hits in zip(LATENCY_BUCKETS_MS, self.buckets):
+            running += hits
+            cumulative[str(bound)] = running
+        cumulative["+Inf"] = running + self.buckets[-1]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 3),
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets_ms": cumulative,
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-local registry of blockchain call metrics.
+    Every worker keeps its own registry; the metrics endpoint reports the
+    worker that served the request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, kind, name, duration_ms, error=False, **context):
+        with self._lock:
+            series = self._series.get((kind, name))
+            if series is None:
+                series = self._series[(kind, name)] = _Series()
+            series.observe(duration_ms, error)
+
+        if duration_ms >= SLOW_CALL_MS:
+            slow_call_logger.warning(json.dumps({
+                "event": "slow_blockchain_call",
+                "kind": kind,
+                "name": name,
+                "duration_ms": round(duration_ms, 3),
+                "threshold_ms": SLOW_CALL_MS,
+                "error": bool(error),
+                **{k: str(v) for k, v in context.items()},
+            }))
+
+    @contextmanager
+    def timer(self, kind, name, **context):
+        """Time the enclosed block; exceptions are counted as errors and re-raised."""
+        start = time.perf_counter()
+        try:
+            yield context
+        except Exception:
+            self.observe(kind, name, (time.perf_counter() - start) * 1000, error=True, **context)
+            raise
+        self.observe(kind, name, (time.perf_counter() - start) * 1000, **context)
+
+    def snapshot(self):
+        with self._lock:
+            items = [(key, series.snapshot()) for key, series in self._series.items()]
+        data = {}
+        for (kind, name), values in sorted(items):
+            data.setdefault(kind, {})[name] = values
+        return data
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+registry = MetricsRegistry()
+timer = registry.timer
+
+
+# ---------------------- Contract selector lookup ----------------------
+_selectors = {}
+
+
+def register_abi(abi):
+    """Map 4-byte selectors to contract function names so eth_call/estimateGas can be labelled."""
+    from eth_utils import function_abi_to_4byte_selector
+
+    for entry in abi or []:
+        if entry.get("type") == "function":
+            _selectors["0x" + function_abi_to_4byte_selector(entry).hex()] = entry["name"]
+
+
+def _contract_function(method, params):
+    if method not in ("eth_call", "eth_estimateGas") or not params:
+        return None
+    tx = params[0] if isinstance(params[0], dict) else {}
+    data = tx.get("data") or tx.get("input")
+    if isinstance(data, (bytes, bytearray)):
+        data = "0x" + bytes(data).hex()
+    if not isinstance(data, str) or len(data) < 10:
+        return None
+    return _selectors.get(data[:10].lower())
+
+
+# ---------------------- Web3 Middleware ----------------------
+class RPCMetricsMiddleware(Web3Middleware):
+    """Records latency and errors per JSON-RPC method and per contract function."""
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            fn_name = _contract_function(method, params)
+            start = time.perf_counter()
+            try:
+                response = make_request(method, params)
+            except Exception:
+                self._record(method, fn_name, start, error=True)
+                raise
+            self._record(method, fn_name, start, error=isinstance(response, dict) and "error" in response)
+            return response
+
+        return middleware
+
+    def wrap_make_batch_request(self, make_batch_request):
+        def middleware(requests_info):
+            start = time.perf_counter()
+            try:
+                response = make_batch_request(requests_info)
+            except Exception:
+                registry.observe(RPC, "batch", (time.perf_counter() - start) * 1000, error=True)
+                raise
+            registry.observe(
+                RPC, "batch", (time.perf_counter() - start) * 1000,
+                error=not isinstance(response, list), size=len(requests_info),
+            )
+            return response
+
+        return middleware
+
+    @staticmethod
+    def _record(method, fn_name, start, error):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        registry.observe(RPC, method, elapsed_ms, error=error)
+        if fn_name:
+            registry.observe(CONTRACT, fn_name, elapsed_ms, error=error, rpc_method=method)
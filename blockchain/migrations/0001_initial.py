@@ -0,0 +1,32 @@
+# Generated by Django 5.2.1 on 2026-10-19 07:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MerkleBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('root', models.CharField(max_length=66, unique=True)),
+                ('leaf_count', models.PositiveIntegerField()),
+                ('tx_hash', models.CharField(blank=True, max_length=66, null=True)),
+                ('block_number', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Success', 'Success'), ('Failed', 'Failed')], default='Pending', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('committed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Merkle Batch',
+                'verbose_name_plural': 'Merkle Batches',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
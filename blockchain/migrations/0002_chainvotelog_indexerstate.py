@@ -0,0 +1,49 @@
+# Generated by Django 5.2.1 on 2026-10-19 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndexerState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_block', models.PositiveBigIntegerField(default=0)),
+                ('head_block', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Indexer State',
+                'verbose_name_plural': 'Indexer States',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChainVoteLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('receipt_hash', models.CharField(max_length=64, unique=True)),
+                ('election_code', models.CharField(db_index=True, max_length=32)),
+                ('position_code', models.CharField(max_length=32)),
+                ('candidate_code', models.CharField(max_length=32)),
+                ('tx_hash', models.CharField(db_index=True, max_length=66)),
+                ('block_number', models.PositiveBigIntegerField(db_index=True)),
+                ('block_hash', models.CharField(max_length=66)),
+                ('log_index', models.PositiveIntegerField()),
+                ('chain_timestamp', models.PositiveBigIntegerField(help_text='VoteCast timestamp (unix seconds)')),
+                ('indexed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Chain Vote Log',
+                'verbose_name_plural': 'Chain Vote Logs',
+                'ordering': ['block_number', 'log_index'],
+                'unique_together': {('tx_hash', 'log_index')},
+            },
+        ),
+    ]
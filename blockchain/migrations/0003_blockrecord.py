@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-19 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0002_chainvotelog_indexerstate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlockRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveBigIntegerField(unique=True)),
+                ('hash', models.CharField(max_length=66)),
+                ('parent_hash', models.CharField(max_length=66)),
+                ('timestamp', models.PositiveBigIntegerField()),
+                ('seen_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Block Record',
+                'verbose_name_plural': 'Block Records',
+                'ordering': ['-number'],
+            },
+        ),
+    ]
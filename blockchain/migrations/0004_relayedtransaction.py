@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-19 07:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0003_blockrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelayedTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tx_hash', models.CharField(help_text='Latest broadcast hash', max_length=66, unique=True)),
+                ('previous_hashes', models.JSONField(blank=True, default=list, help_text='Hashes replaced by fee bumps')),
+                ('sender', models.CharField(max_length=42)),
+                ('nonce', models.PositiveBigIntegerField()),
+                ('to_address', models.CharField(blank=True, max_length=42, null=True)),
+                ('data', models.TextField(blank=True, default='')),
+                ('value', models.DecimalField(decimal_places=0, default=0, max_digits=40)),
+                ('gas', models.PositiveBigIntegerField()),
+                ('gas_price', models.PositiveBigIntegerField(help_text='Wei')),
+                ('chain_id', models.PositiveIntegerField()),
+                ('function', models.CharField(blank=True, max_length=64)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Mined', 'Mined'), ('Abandoned', 'Abandoned')], db_index=True, default='Pending', max_length=20)),
+                ('bump_count', models.PositiveIntegerField(default=0)),
+                ('sent_at', models.DateTimeField()),
+                ('mined_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Relayed Transaction',
+                'verbose_name_plural': 'Relayed Transactions',
+                'ordering': ['-sent_at'],
+                'indexes': [models.Index(fields=['sender', 'nonce'], name='blockchain__sender_140887_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-19 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0004_relayedtransaction'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainElection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=32, unique=True)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Chain Election',
+                'verbose_name_plural': 'Chain Elections',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChainPosition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=32, unique=True)),
+                ('election_code', models.CharField(blank=True, db_index=True, max_length=32)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Chain Position',
+                'verbose_name_plural': 'Chain Positions',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChainCandidate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position_code', models.CharField(max_length=32)),
+                ('candidate_code', models.CharField(max_length=32)),
+                ('recorded_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Chain Candidate',
+                'verbose_name_plural': 'Chain Candidates',
+                'unique_together': {('position_code', 'candidate_code')},
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.1 on 2026-10-19 07:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0005_chain_read_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='relayedtransaction',
+            name='block_number',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='relayedtransaction',
+            name='effective_gas_price',
+            field=models.PositiveBigIntegerField(blank=True, help_text='Wei', null=True),
+        ),
+        migrations.AddField(
+            model_name='relayedtransaction',
+            name='election_code',
+            field=models.CharField(blank=True, db_index=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='relayedtransaction',
+            name='fee_wei',
+            field=models.DecimalField(blank=True, decimal_places=0, max_digits=40, null=True),
+        ),
+        migrations.AddField(
+            model_name='relayedtransaction',
+            name='gas_used',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='relayedtransaction',
+            name='vote_count',
+            field=models.PositiveIntegerField(default=0, help_text='Votes carried by this transaction'),
+        ),
+        migrations.CreateModel(
+            name='FeeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('election', 'Election'), ('day', 'Day'), ('function', 'Function')], max_length=20)),
+                ('key', models.CharField(max_length=64)),
+                ('tx_count', models.PositiveIntegerField(default=0)),
+                ('vote_count', models.PositiveIntegerField(default=0)),
+                ('gas_used', models.PositiveBigIntegerField(default=0)),
+                ('fee_wei', models.DecimalField(decimal_places=0, default=0, max_digits=40)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Fee Rollup',
+                'verbose_name_plural': 'Fee Rollups',
+                'ordering': ['dimension', 'key'],
+                'unique_together': {('dimension', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0006_fee_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelayerLane',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=42, unique=True)),
+                ('next_nonce', models.PositiveBigIntegerField(blank=True, help_text='Empty: re-read the pending transaction count on the next send', null=True)),
+                ('in_flight', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Relayer Lane',
+                'verbose_name_plural': 'Relayer Lanes',
+            },
+        ),
+    ]
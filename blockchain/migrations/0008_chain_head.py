@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0007_relayer_lane'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChainHead',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveBigIntegerField()),
+                ('hash', models.CharField(max_length=66)),
+                ('timestamp', models.PositiveBigIntegerField()),
+                ('observed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Chain Head',
+                'verbose_name_plural': 'Chain Head',
+            },
+        ),
+    ]
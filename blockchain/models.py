@@ -1,3 +1,240 @@
+from decimal import Decimal
 from django.db import models
 
-# Create your models here.
+
+class MerkleBatch(models.Model):
+    """A Merkle root committed on-chain over the receipts of votes cast in one interval."""
+
+    class Status(models.TextChoices):
+        PENDING = "Pending", "Pending"
+        SUCCESS = "Success", "Success"
+        FAILED = "Failed", "Failed"
+
+    root = models.CharField(max_length=66, unique=True)
+    leaf_count = models.PositiveIntegerField()
+    tx_hash = models.CharField(max_length=66, blank=True, null=True)
+    block_number = models.PositiveBigIntegerField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    committed_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Merkle Batch"
+        verbose_name_plural = "Merkle Batches"
+
+    def __str__(self):
+        return f"MerkleBatch {self.root} ({self.leaf_count} receipts)"
+
+
+class ChainVoteLog(models.Model):
+    """Local copy of a VoteCast event, keyed by receipt hash (lowercase hex, no 0x)."""
+    receipt_hash = models.CharField(max_length=64, unique=True)
+    election_code = models.CharField(max_length=32, db_index=True)
+    position_code = models.CharField(max_length=32)
+    candidate_code = models.CharField(max_length=32)
+    tx_hash = models.CharField(max_length=66, db_index=True)
+    block_number = models.PositiveBigIntegerField(db_index=True)
+    block_hash = models.CharField(max_length=66)
+    log_index = models.PositiveIntegerField()
+    chain_timestamp = models.PositiveBigIntegerField(help_text="VoteCast timestamp (unix seconds)")
+    indexed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('tx_hash', 'log_index')
+        ordering = ['block_number', 'log_index']
+        verbose_name = "Chain Vote Log"
+        verbose_name_plural = "Chain Vote Logs"
+
+    def __str__(self):
+        return f"VoteCast {self.receipt_hash} @ {self.block_number}:{self.log_index}"
+
+
+class IndexerState(models.Model):
+    """Watermark of a chain follower: last block processed and the chain head seen at that time."""
+    name = models.CharField(max_length=50, unique=True)
+    last_block = models.PositiveBigIntegerField(default=0)
+    head_block = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Indexer State"
+        verbose_name_plural = "Indexer States"
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_block}"
+
+
+class RelayerLane(models.Model):
+    """Nonce lane of one relayer key, shared by every worker through a row lock."""
+    address = models.CharField(max_length=42, unique=True)
+    next_nonce = models.PositiveBigIntegerField(
+        blank=True, null=True, help_text="Empty: re-read the pending transaction count on the next send"
+    )
+    in_flight = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Relayer Lane"
+        verbose_name_plural = "Relayer Lanes"
+
+    def __str__(self):
+        return f"{self.address} (next nonce {self.next_nonce})"
+
+
+class ChainHead(models.Model):
+    """Latest block seen by the chain head tracker (a single row, shared by every worker)."""
+    number = models.PositiveBigIntegerField()
+    hash = models.CharField(max_length=66)
+    timestamp = models.PositiveBigIntegerField()
+    observed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Chain Head"
+        verbose_name_plural = "Chain Head"
+
+    def __str__(self):
+        return f"Block {self.number} ({self.hash})"
+
+
+class BlockRecord(models.Model):
+    """Recent canonical block hashes, used to detect chain reorganisations."""
+    number = models.PositiveBigIntegerField(unique=True)
+    hash = models.CharField(max_length=66)
+    parent_hash = models.CharField(max_length=66)
+    timestamp = models.PositiveBigIntegerField()
+    seen_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-number']
+        verbose_name = "Block Record"
+        verbose_name_plural = "Block Records"
+
+    def __str__(self):
+        return f"Block {self.number} ({self.hash})"
+
+
+class RelayedTransaction(models.Model):
+    """
+    One transaction sent by a relayer, tracked until mined so stuck ones can be
+    fee-bumped. Once mined it doubles as the network fee ledger row.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "Pending", "Pending"
+        MINED = "Mined", "Mined"
+        ABANDONED = "Abandoned", "Abandoned"
+
+    tx_hash = models.CharField(max_length=66, unique=True, help_text="Latest broadcast hash")
+    previous_hashes = models.JSONField(default=list, blank=True, help_text="Hashes replaced by fee bumps")
+    sender = models.CharField(max_length=42)
+    nonce = models.PositiveBigIntegerField()
+    to_address = models.CharField(max_length=42, blank=True, null=True)
+    data = models.TextField(blank=True, default="")
+    value = models.DecimalField(max_digits=40, decimal_places=0, default=0)
+    gas = models.PositiveBigIntegerField()
+    gas_price = models.PositiveBigIntegerField(help_text="Wei")
+    chain_id = models.PositiveIntegerField()
+    function = models.CharField(max_length=64, blank=True)
+    election_code = models.CharField(max_length=32, blank=True, db_index=True)
+    vote_count = models.PositiveIntegerField(default=0, help_text="Votes carried by this transaction")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING, db_index=True)
+    bump_count = models.PositiveIntegerField(default=0)
+    sent_at = models.DateTimeField()
+    mined_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # Fee ledger, filled from the receipt
+    block_number = models.PositiveBigIntegerField(blank=True, null=True)
+    gas_used = models.PositiveBigIntegerField(blank=True, null=True)
+    effective_gas_price = models.PositiveBigIntegerField(blank=True, null=True, help_text="Wei")
+    fee_wei = models.DecimalField(max_digits=40, decimal_places=0, blank=True, null=True)
+
+    class Meta:
+        ordering = ['-sent_at']
+        indexes = [models.Index(fields=['sender', 'nonce'])]
+        verbose_name = "Relayed Transaction"
+        verbose_name_plural = "Relayed Transactions"
+
+    def __str__(self):
+        return f"{self.function} {self.tx_hash} (nonce {self.nonce})"
+
+    @property
+    def all_hashes(self):
+        return [self.tx_hash, *self.previous_hashes]
+
+
+class ChainElection(models.Model):
+    """Election known to exist in the contract (read model, filled from receipts, logs and calls)."""
+    code = models.CharField(max_length=32, unique=True)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Chain Election"
+        verbose_name_plural = "Chain Elections"
+
+    def __str__(self):
+        return self.code
+
+
+class ChainPosition(models.Model):
+    """Position known to exist in the contract."""
+    code = models.CharField(max_length=32, unique=True)
+    election_code = models.CharField(max_length=32, blank=True, db_index=True)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Chain Position"
+        verbose_name_plural = "Chain Positions"
+
+    def __str__(self):
+        return self.code
+
+
+class ChainCandidate(models.Model):
+    """Candidate known to exist under a position in the contract."""
+    position_code = models.CharField(max_length=32)
+    candidate_code = models.CharField(max_length=32)
+    recorded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('position_code', 'candidate_code')
+        verbose_name = "Chain Candidate"
+        verbose_name_plural = "Chain Candidates"
+
+    def __str__(self):
+        return f"{self.candidate_code} ({self.position_code})"
+
+
+class FeeRollup(models.Model):
+    """Running network fee totals per election, per day and per contract function."""
+
+    class Dimension(models.TextChoices):
+        ELECTION = "election", "Election"
+        DAY = "day", "Day"
+        FUNCTION = "function", "Function"
+
+    dimension = models.CharField(max_length=20, choices=Dimension.choices)
+    key = models.CharField(max_length=64)
+    tx_count = models.PositiveIntegerField(default=0)
+    vote_count = models.PositiveIntegerField(default=0)
+    gas_used = models.PositiveBigIntegerField(default=0)
+    fee_wei = models.DecimalField(max_digits=40, decimal_places=0, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['dimension', 'key']
+        unique_together = ('dimension', 'key')
+        verbose_name = "Fee Rollup"
+        verbose_name_plural = "Fee Rollups"
+
+    def __str__(self):
+        return f"{self.dimension}:{self.key} ({self.tx_count} txs)"
+
+    @property
+    def fee_matic(self):
+        return self.fee_wei / Decimal(10 ** 18)
+
+    @property
+    def fee_per_vote_matic(self):
+        return self.fee_matic / self.vote_count if self.vote_count else None
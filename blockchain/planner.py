@@ -0,0 +1,33 @@
+# blockchain/planner.py
+"""
+Gas-aware splitting of voteBatch calls.
+
+A ballot is split into chunks whose modelled gas
+(VOTE_BATCH_BASE_GAS + n * VOTE_BATCH_PER_VOTE_GAS) stays under
+VOTE_BATCH_GAS_CAP, so large ballots neither hit the block gas limit nor
+revert as a whole because of one bad entry.
+"""
+
+import os
+
+VOTE_BATCH_BASE_GAS = int(os.getenv("VOTE_BATCH_BASE_GAS", 45000))
+VOTE_BATCH_PER_VOTE_GAS = int(os.getenv("VOTE_BATCH_PER_VOTE_GAS", 70000))
+VOTE_BATCH_GAS_CAP = int(os.getenv("VOTE_BATCH_GAS_CAP", 2000000))
+
+
+def estimated_gas(n_votes):
+    return VOTE_BATCH_BASE_GAS + n_votes * VOTE_BATCH_PER_VOTE_GAS
+
+
+def max_votes_per_tx(gas_cap=VOTE_BATCH_GAS_CAP):
+    return max(1, (gas_cap - VOTE_BATCH_BASE_GAS) // VOTE_BATCH_PER_VOTE_GAS)
+
+
+def plan_chunks(n_votes, gas_cap=VOTE_BATCH_GAS_CAP):
+    """Split indices 0..n_votes-1 into evenly sized chunks that each fit under `gas_cap`."""
+    if n_votes <= 0:
+        return []
+    per_tx = max_votes_per_tx(gas_cap)
+    n_chunks = -(-n_votes // per_tx)
+    size = -(-n_votes // n_chunks)
+    return [list(range(i, min(i + size, n_votes))) for i in range(0, n_votes, size)]
@@ -0,0 +1,78 @@
+# blockchain/readmodel.py
+"""
+Local read model of contract state.
+
+Elections, positions and candidates only ever get added to the contract, so
+once one is seen to exist (our own add* receipts, VoteCast logs from the
+indexer, or a positive eth_call) that fact is stored and later existence
+checks are answered from the database. Receipt usage is answered from the
+indexed VoteCast logs. Callers fall back to eth_call only on a miss.
+"""
+
+from blockchain.models import ChainElection, ChainPosition, ChainCandidate, ChainVoteLog
+
+
+# ---------------------- Writes ----------------------
+def record_election(code):
+    ChainElection.objects.get_or_create(code=code)
+
+
+def record_position(code, election_code=""):
+    position, created = ChainPosition.objects.get_or_create(
+        code=code, defaults={"election_code": election_code}
+    )
+    if not created and election_code and not position.election_code:
+        ChainPosition.objects.filter(pk=position.pk).update(election_code=election_code)
+
+
+def record_candidate(position_code, candidate_code):
+    ChainCandidate.objects.get_or_create(position_code=position_code, candidate_code=candidate_code)
+
+
+def record_from_vote_logs(logs):
+    """Every VoteCast log proves its election, position and candidate exist."""
+    if not logs:
+        return
+    ChainElection.objects.bulk_create(
+        [ChainElection(code=c) for c in {log.election_code for log in logs}],
+        ignore_conflicts=True,
+    )
+    ChainPosition.objects.bulk_create(
+        [ChainPosition(code=p, election_code=e) for p, e in {(log.position_code, log.election_code) for log in logs}],
+        ignore_conflicts=True,
+    )
+    ChainCandidate.objects.bulk_create(
+        [ChainCandidate(position_code=p, candidate_code=c) for p, c in {(log.position_code, log.candidate_code) for log in logs}],
+        ignore_conflicts=True,
+    )
+
+
+def rebuild_from_index(chunk_size=5000):
+    """Replay every indexed VoteCast log into the read model. Returns the number of logs replayed."""
+    replayed, last_id = 0, 0
+    while True:
+        logs = list(ChainVoteLog.objects.filter(id__gt=last_id).order_by("id")[:chunk_size])
+        if not logs:
+            return replayed
+        record_from_vote_logs(logs)
+        replayed += len(logs)
+        last_id = logs[-1].id
+
+
+# ---------------------- Reads ----------------------
+def election_known(code):
+    return ChainElection.objects.filter(code=code).exists()
+
+
+def position_known(code):
+    return ChainPosition.objects.filter(code=code).exists()
+
+
+def candidate_known(position_code, candidate_code):
+    return ChainCandidate.objects.filter(position_code=position_code, candidate_code=candidate_code).exists()
+
+
+def receipt_known(receipt):
+    from blockchain.indexer import normalize_receipt
+
+    return ChainVoteLog.objects.filter(receipt_hash=normalize_receipt(receipt)).exists()
@@ -0,0 +1,162 @@
+# blockchain/relayers.py
+"""
+Relayer pool: several signer keys, each with its own nonce lane.
+
+Keys come from RELAYER_KEYS (comma-separated private keys); when unset the
+single PK / WA wallet is used, as before. Nonce counters and in-flight
+counts live in one RelayerLane row per signer, so every worker process
+hands out nonces from the same locked counter; only the balance check is
+cached. Outgoing transactions go to the healthy signer with the fewest
+transactions in flight; a stuck transaction only blocks the lane of the
+signer that sent it.
+"""
+
+import os
+import logging
+import threading
+from decimal import Decimal
+from contextlib import contextmanager
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from eth_account import Account
+
+from blockchain.models import RelayerLane
+
+logger = logging.getLogger(__name__)
+
+RELAYER_KEYS = [k.strip() for k in os.getenv("RELAYER_KEYS", "").split(",") if k.strip()]
+RELAYER_MIN_BALANCE_MATIC = Decimal(os.getenv("RELAYER_MIN_BALANCE_MATIC", "0.05"))
+RELAYER_BALANCE_CHECK_SECONDS = int(os.getenv("RELAYER_BALANCE_CHECK_SECONDS", 60))
+
+
+class NoHealthyRelayer(Exception):
+    pass
+
+
+class Signer:
+    """One relayer key and its nonce lane."""
+
+    def __init__(self, private_key):
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+
+    def _key(self, name):
+        return f"relayer:{self.address.lower()}:{name}"
+
+    # --- nonce lane ---
+    def _lane(self):
+        return RelayerLane.objects.filter(address=self.address)
+
+    def next_nonce(self):
+        """Reserve the next nonce of this lane (seeded from the pending transaction count)."""
+        from blockchain.utils import web3
+
+        with transaction.atomic():
+            lane, _ = RelayerLane.objects.select_for_update().get_or_create(address=self.address)
+            nonce = lane.next_nonce
+            if nonce is None:
+                nonce = web3.eth.get_transaction_count(self.address, 'pending')
+            lane.next_nonce = nonce + 1
+            lane.save(update_fields=["next_nonce", "updated_at"])
+        return nonce
+
+    def resync_nonce(self):
+        """Forget the stored counter; the next reservation re-reads the chain."""
+        self._lane().update(next_nonce=None)
+
+    # --- load ---
+    def in_flight(self):
+        return self._lane().values_list("in_flight", flat=True).first() or 0
+
+    def _adjust_in_flight(self, delta):
+        if not self._lane().update(in_flight=F("in_flight") + delta):
+            RelayerLane.objects.get_or_create(address=self.address)
+            self._lane().update(in_flight=F("in_flight") + delta)
+
+    # --- balance monitor ---
+    def balance(self, refresh=False):
+        """Balance in MATIC, cached for RELAYER_BALANCE_CHECK_SECONDS."""
+        from blockchain.utils import web3
+
+        key = self._key("balance")
+        balance = None if refresh else cache.get(key)
+        if balance is None:
+            balance = Decimal(web3.from_wei(web3.eth.get_balance(self.address), "ether"))
+            cache.set(key, balance, timeout=RELAYER_BALANCE_CHECK_SECONDS)
+            if balance < RELAYER_MIN_BALANCE_MATIC:
+                logger.warning(f"Relayer {self.address} balance low: {balance} MATIC")
+        return balance
+
+    def is_healthy(self):
+        try:
+            return self.balance() >= RELAYER_MIN_BALANCE_MATIC
+        except Exception as e:
+            logger.warning(f"Balance check failed for relayer {self.address}: {e}")
+            return False
+
+    def status(self):
+        lane = self._lane().first()
+        return {
+            "address": self.address,
+            "in_flight": lane.in_flight if lane else 0,
+            "next_nonce": lane.next_nonce if lane else None,
+            "balance_matic": str(cache.get(self._key("balance"), "unknown")),
+        }
+
+
+class RelayerPool:
+    def __init__(self, private_keys):
+        if not private_keys:
+            raise ValueError("No relayer keys configured (set RELAYER_KEYS or PK).")
+        self.signers = [Signer(k) for k in private_keys]
+
+    def pick(self):
+        """Healthy signer with the fewest transactions in flight."""
+        healthy = [s for s in self.signers if s.is_healthy()]
+        if not healthy:
+            raise NoHealthyRelayer("No relayer has enough balance to send transactions.")
+        in_flight = dict(
+            RelayerLane.objects.filter(address__in=[s.address for s in healthy]).values_list("address", "in_flight")
+        )
+        return min(healthy, key=lambda s: in_flight.get(s.address, 0))
+
+    def get(self, address):
+        for signer in self.signers:
+            if signer.address.lower() == address.lower():
+                return signer
+        raise KeyError(f"Relayer {address} is not in the pool.")
+
+    @contextmanager
+    def lease(self):
+        """Pick a signer and count the enclosed transaction as in flight on its lane."""
+        signer = self.pick()
+        signer._adjust_in_flight(1)
+        try:
+            yield signer
+        finally:
+            signer._adjust_in_flight(-1)
+
+    def status(self):
+        return [s.status() for s in self.signers]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def relayer_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from blockchain.utils import PRIVATE_KEY, WALLET_ADDRESS
+
+                keys = RELAYER_KEYS
+                if not keys:
+                    if PRIVATE_KEY and WALLET_ADDRESS and \
+                            Account.from_key(PRIVATE_KEY).address.lower() != WALLET_ADDRESS.lower():
+                        raise ValueError("Wallet address mismatch")
+                    keys = [PRIVATE_KEY] if PRIVATE_KEY else []
+                _pool = RelayerPool(keys)
+    return _pool
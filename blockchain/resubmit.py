@@ -0,0 +1,174 @@
+# blockchain/resubmit.py
+"""
+Bulk resubmission of votes that never made it on-chain.
+
+`manage.py resubmit_votes` picks up Pending / Failed votes (and
+reservations orphaned before their chain call finished) whose backoff
+has expired and whose transaction is not still tracked by the
+stuck-transaction watchdog. Receipts already on-chain (found in the
+VoteCast index) are marked Success without sending anything; the rest go
+out as gas-planned voteBatch transactions (dry-run first, see
+cast_vote_batch_chunked) and every touched row is written back with one
+bulk update. A receipt can only be used once by the contract, so a
+resubmission can never count a vote twice.
+
+A "Reserved" row normally belongs to a ballot request still working through
+its chunks, each waiting for a receipt, so it is only treated as orphaned
+after RESUBMIT_RESERVED_MIN_AGE_SECONDS, far beyond any request's
+lifetime. Should a slow request outlive that anyway, reservation.release
+only deletes rows that are still Reserved, so it cannot drop a vote that
+this pass already moved on.
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db import transaction
+from django.db.models import Q, Exists, OuterRef
+from django.utils import timezone
+
+from blockchain.models import RelayedTransaction
+
+logger = logging.getLogger(__name__)
+
+RESUBMIT_MIN_AGE_SECONDS = int(os.getenv("RESUBMIT_MIN_AGE_SECONDS", 300))
+RESUBMIT_RESERVED_MIN_AGE_SECONDS = int(os.getenv("RESUBMIT_RESERVED_MIN_AGE_SECONDS", 1800))
+RESUBMIT_BATCH_LIMIT = int(os.getenv("RESUBMIT_BATCH_LIMIT", 500))
+RESUBMIT_MAX_ATTEMPTS = int(os.getenv("RESUBMIT_MAX_ATTEMPTS", 8))
+RESUBMIT_BACKOFF_SECONDS = int(os.getenv("RESUBMIT_BACKOFF_SECONDS", 30))
+RESUBMIT_BACKOFF_MAX_SECONDS = int(os.getenv("RESUBMIT_BACKOFF_MAX_SECONDS", 3600))
+
+RETRY_STATUSES = ("Pending", "Failed", "Reserved")
+UPDATE_FIELDS = [
+    "tx_hash", "status", "is_synced", "block_number", "block_timestamp",
+    "network_fee_matic", "sync_attempts", "next_sync_at",
+]
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(RESUBMIT_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0), RESUBMIT_BACKOFF_MAX_SECONDS))
+
+
+def due_votes(limit=RESUBMIT_BATCH_LIMIT, min_age=RESUBMIT_MIN_AGE_SECONDS,
+              reserved_min_age=RESUBMIT_RESERVED_MIN_AGE_SECONDS):
+    """Votes due for resubmission (uses the (status, next_sync_at) index)."""
+    from votes.models import Vote
+    from votes.reservation import RESERVED
+
+    now = timezone.now()
+    in_flight = RelayedTransaction.objects.filter(
+        status=RelayedTransaction.Status.PENDING, tx_hash=OuterRef("tx_hash")
+    )
+    return list(
+        Vote.objects.filter(status__in=RETRY_STATUSES, sync_attempts__lt=RESUBMIT_MAX_ATTEMPTS)
+        .filter(Q(next_sync_at__isnull=True) | Q(next_sync_at__lte=now))
+        .filter(created_at__lt=now - timedelta(seconds=min_age))
+        .exclude(status=RESERVED, created_at__gte=now - timedelta(seconds=max(reserved_min_age, min_age)))
+        .exclude(Exists(in_flight))
+        .select_related("position", "candidate")
+        .order_by("next_sync_at", "created_at")[:limit]
+    )
+
+
+def _mark_on_chain(vote, log):
+    vote.tx_hash = log.tx_hash
+    vote.block_number = log.block_number
+    vote.block_timestamp = datetime.fromtimestamp(log.chain_timestamp, tz=dt_timezone.utc)
+    vote.status = "Success"
+    vote.is_synced = True
+    vote.next_sync_at = None
+
+
+def _defer(vote, now):
+    vote.sync_attempts += 1
+    vote.next_sync_at = now + backoff(vote.sync_attempts)
+
+
+def resubmit_votes(limit=RESUBMIT_BATCH_LIMIT, min_age=RESUBMIT_MIN_AGE_SECONDS):
+    """One pass over due votes. Returns counts of already on-chain, sent, mined, pending and deferred votes."""
+    from votes.models import Vote
+    from votes.tally import adjust_synced, synced_deltas
+    from blockchain.helpers import cast_vote_batch_chunked
+    from blockchain.indexer import lookup_receipts, normalize_receipt
+    from blockchain.ledger import fee_shares_matic
+    from blockchain.utils import get_blocks
+    from blockchain.votedstate import voted_state
+
+    counts = {"already_on_chain": 0, "sent": 0, "mined": 0, "pending": 0, "deferred": 0}
+    votes = due_votes(limit, min_age)
+    if not votes:
+        return counts
+
+    now = timezone.now()
+    was_synced = {v.pk: v.is_synced for v in votes}
+
+    # Idempotency: receipts already recorded on-chain are resolved, never re-sent
+    indexed = lookup_receipts([v.receipt for v in votes])
+    to_send = []
+    for vote in votes:
+        log = indexed.get(normalize_receipt(vote.receipt))
+        if log is not None:
+            _mark_on_chain(vote, log)
+            counts["already_on_chain"] += 1
+        else:
+            to_send.append(vote)
+
+    chunks = []
+    if to_send:
+        try:
+            chunks = cast_vote_batch_chunked(
+                [v.position.code for v in to_send],
+                [v.candidate.code for v in to_send],
+                [v.receipt for v in to_send],
+            )
+        except Exception as e:
+            # e.g. provider still down: back off the whole pass
+            logger.warning(f"Resubmission of {len(to_send)} votes failed: {e}")
+            for vote in to_send:
+                _defer(vote, now)
+            counts["deferred"] += len(to_send)
+
+    if chunks:
+        blocks = get_blocks({c["receipt"]["blockNumber"] for c in chunks if c["receipt"] is not None})
+        for chunk in chunks:
+            chunk_votes = [to_send[i] for i in chunk["indices"]]
+            if chunk["tx_hash"] is None or chunk["status"] == "Failed":
+                # Not sent (dry run / estimate revert) or reverted: retry later with backoff.
+                # "Receipt already used" resolves once the indexer has the log.
+                logger.warning(f"Resubmission of {len(chunk_votes)} votes deferred: {chunk['error']}")
+                for vote in chunk_votes:
+                    _defer(vote, now)
+                counts["deferred"] += len(chunk_votes)
+                continue
+
+            counts["sent"] += len(chunk_votes)
+            for vote in chunk_votes:
+                vote.tx_hash = chunk["tx_hash"]
+                _defer(vote, now)
+
+            if chunk["status"] == "Pending":
+                # Tracked by the stuck-transaction watchdog from here on
+                for vote in chunk_votes:
+                    vote.status = "Pending"
+                counts["pending"] += len(chunk_votes)
+                continue
+
+            receipt = chunk["receipt"]
+            block = blocks.get(receipt["blockNumber"])
+            shares = fee_shares_matic(receipt, len(chunk_votes)) or [None] * len(chunk_votes)
+            for vote, share in zip(chunk_votes, shares):
+                vote.status = "Success"
+                vote.is_synced = True
+                vote.next_sync_at = None
+                vote.block_number = receipt["blockNumber"]
+                vote.block_timestamp = (
+                    datetime.fromtimestamp(block["timestamp"], tz=dt_timezone.utc) if block else None
+                )
+                vote.network_fee_matic = share
+            counts["mined"] += len(chunk_votes)
+
+    with transaction.atomic():
+        Vote.objects.bulk_update(votes, UPDATE_FIELDS, batch_size=500)
+        adjust_synced(synced_deltas(votes, was_synced))
+    voted_state.mark_receipts_used(v.receipt for v in votes if v.status == "Success")
+    return counts
@@ -0,0 +1,133 @@
+# blockchain/simulation.py
+"""
+Dry-run simulation of votes before anything is signed.
+
+A queue of votes (or voteBatch calls) is simulated with one JSON-RPC batch
+of eth_calls against the latest state. The batch goes straight to the
+provider, so one reverting call does not fail the whole batch, and every
+revert reason is decoded from its own error payload instead of being
+re-simulated afterwards (extract_revert_reason). Callers drop failing
+entries and only send transactions expected to succeed.
+"""
+
+import os
+import logging
+from eth_abi import decode as abi_decode
+
+from blockchain import metrics
+
+logger = logging.getLogger(__name__)
+
+VOTE_DRY_RUN = os.getenv("VOTE_DRY_RUN", "on").lower() in ("1", "true", "on", "yes")
+
+# Error(string) and Panic(uint256) selectors
+ERROR_SELECTOR = "08c379a0"
+PANIC_SELECTOR = "4e487b71"
+
+RECEIPT_USED = "Receipt already used"
+
+
+def decode_revert(error):
+    """Human-readable revert reason from a JSON-RPC error object."""
+    data = error.get("data")
+    if isinstance(data, dict):
+        data = data.get("data") or data.get("result")
+    if isinstance(data, str) and data.startswith("0x") and len(data) >= 10:
+        selector, payload = data[2:10], bytes.fromhex(data[10:])
+        try:
+            if selector == ERROR_SELECTOR:
+                return abi_decode(["string"], payload)[0]
+            if selector == PANIC_SELECTOR:
+                return f"Panic(0x{abi_decode(['uint256'], payload)[0]:02x})"
+        except Exception:
+            pass
+        return f"Custom error 0x{selector}"
+    message = error.get("message") or "execution reverted"
+    return message.replace("execution reverted: ", "")
+
+
+def simulate_calls(calls, sender=None, block="latest"):
+    """
+    eth_call every `data` in `calls` against the contract in one batch.
+    Returns one {"ok": bool, "reason": str|None} per call, in order.
+    """
+    from blockchain.utils import web3, CONTRACT_ADDRESS, WALLET_ADDRESS, check_connection
+
+    if not calls:
+        return []
+    check_connection()
+    sender = sender or WALLET_ADDRESS
+    base = {"from": sender, "to": CONTRACT_ADDRESS} if sender else {"to": CONTRACT_ADDRESS}
+    requests = [("eth_call", [{**base, "data": data}, block]) for data in calls]
+    try:
+        # straight to the provider (middleware would raise on the first revert), so time it here
+        with metrics.timer(metrics.RPC, "eth_call_simulation_batch", calls=len(requests)):
+            responses = web3.provider.make_batch_request(requests)
+        if not isinstance(responses, list):
+            raise ValueError(responses.get("error") if isinstance(responses, dict) else responses)
+        responses = sorted(responses, key=lambda r: r.get("id", 0))
+    except Exception as e:
+        logger.warning(f"Simulation batch failed ({e}); falling back to sequential eth_calls.")
+        responses = []
+        for method, params in requests:
+            try:
+                responses.append(web3.provider.make_request(method, params))
+            except Exception as call_error:
+                responses.append({"error": {"message": str(call_error)}})
+
+    results = []
+    for response in responses:
+        error = response.get("error")
+        results.append({"ok": error is None, "reason": decode_revert(error) if error else None})
+    return results
+
+
+def simulate_votes(position_codes, candidate_codes, receipt_hashes, sender=None):
+    """
+    Simulate each vote on its own. A receipt repeated within the queue fails
+    from its second occurrence on, as it would once the first one is mined.
+    """
+    from blockchain.utils import contract, to_bytes32
+
+    c = contract()
+    calls, call_index, results = [], [], []
+    seen = set()
+    for i, (pos, cand, receipt) in enumerate(zip(position_codes, candidate_codes, receipt_hashes)):
+        key = to_bytes32(receipt)
+        if key in seen:
+            results.append({"ok": False, "reason": RECEIPT_USED})
+            continue
+        seen.add(key)
+        results.append(None)
+        call_index.append(i)
+        calls.append(c.encode_abi("vote", args=[to_bytes32(pos), to_bytes32(cand), key]))
+
+    for i, result in zip(call_index, simulate_calls(calls, sender=sender)):
+        results[i] = result
+    return results
+
+
+def simulate_batches(batches, sender=None):
+    """Simulate voteBatch calls; `batches` is a list of (position_codes, candidate_codes, receipt_hashes)."""
+    from blockchain.utils import contract, to_bytes32
+
+    c = contract()
+    calls = [
+        c.encode_abi("voteBatch", args=[
+            [to_bytes32(p) for p in positions],
+            [to_bytes32(x) for x in candidates],
+            [to_bytes32(r) for r in receipts],
+        ])
+        for positions, candidates, receipts in batches
+    ]
+    return simulate_calls(calls, sender=sender)
+
+
+def split_passing(position_codes, candidate_codes, receipt_hashes, sender=None):
+    """Return (indices expected to succeed, {index: revert reason} for the rest)."""
+    results = simulate_votes(position_codes, candidate_codes, receipt_hashes, sender=sender)
+    passing = [i for i, r in enumerate(results) if r["ok"]]
+    failing = {i: r["reason"] for i, r in enumerate(results) if not r["ok"]}
+    if failing:
+        logger.info(f"Dry run dropped {len(failing)} of {len(results)} votes before signing.")
+    return passing, failing
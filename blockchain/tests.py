@@ -1,3 +1,366 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 from django.test import TestCase
+from django.utils import timezone
+from eth_abi import encode as abi_encode
+from eth_account import Account
 
-# Create your tests here.
+from accounts.models import User, Department
+from elections.models.elections import Election
+from elections.models.positions import Position
+from elections.models.candidates import Candidate
+from votes import reservation
+from votes.models import Vote
+from blockchain import anchoring, chainhead, finality, ledger, resubmit, simulation, watchdog
+from blockchain.indexer import VOTE_INDEXER
+from blockchain.models import (
+    BlockRecord, ChainVoteLog, FeeRollup, IndexerState, MerkleBatch, RelayedTransaction, RelayerLane,
+)
+from blockchain.relayers import Signer
+from blockchain.votedstate import voted_state
+
+
+class VoteFixtureMixin:
+    """One open election with a single position and two candidates; votes are inserted directly."""
+
+    def setUp(self):
+        voted_state.clear()
+        department = Department.objects.create(name="Computer Science")
+        now = timezone.now()
+        self.election = Election.objects.create(
+            title="SRC", start_date=now - timedelta(days=1), end_date=now + timedelta(days=1)
+        )
+        self.position = Position.objects.create(election=self.election, title="President", eligible_levels=[1])
+        self.candidates = [
+            Candidate.objects.create(
+                position=self.position,
+                student=User.objects.create_user(
+                    index_number=f"cand-{i}", email=f"cand-{i}@example.com", full_name=f"Candidate {i}",
+                    password="pass", department=department,
+                ),
+            )
+            for i in range(2)
+        ]
+
+    def _vote(self, voter, receipt=None, candidate=0, **fields):
+        entry = {"candidate": self.candidates[candidate], "position": self.position, "election": self.election}
+        vote = reservation.reserve(voter, [entry], [receipt or f"receipt-{voter}"])[0]
+        if fields:
+            reservation.finalize([vote], **fields)
+        return vote
+
+
+class RelayerLaneTests(TestCase):
+    """Nonce lanes live in the database, so separate processes never hand out the same nonce."""
+
+    def test_signers_in_different_workers_share_one_lane(self):
+        key = Account.create().key
+        workers = [Signer(key), Signer(key)]
+        with mock.patch("blockchain.utils.web3") as web3:
+            web3.eth.get_transaction_count.return_value = 7
+            nonces = [workers[i % 2].next_nonce() for i in range(4)]
+            self.assertEqual(nonces, [7, 8, 9, 10])
+            self.assertEqual(web3.eth.get_transaction_count.call_count, 1)
+
+            workers[1].resync_nonce()
+            web3.eth.get_transaction_count.return_value = 9
+            self.assertEqual(workers[0].next_nonce(), 9)
+
+        workers[0]._adjust_in_flight(1)
+        workers[1]._adjust_in_flight(1)
+        workers[0]._adjust_in_flight(-1)
+        self.assertEqual(RelayerLane.objects.get(address=workers[0].address).in_flight, 1)
+
+
+class ChainHeadTests(TestCase):
+    """The tracked head is read from the database, so every worker sees what the tracker published."""
+
+    def test_published_head_reaches_other_workers(self):
+        chainhead.publish_head({"number": 120, "hash": b"\x01" * 32, "timestamp": 1700000000})
+        chainhead._local["head"] = None  # as seen from another process
+
+        with mock.patch.object(chainhead, "refresh_head") as refresh:
+            self.assertEqual(chainhead.head_number(), 120)
+            self.assertEqual(chainhead.confirmations(100), 20)
+        refresh.assert_not_called()
+        self.assertTrue(chainhead.health()["fresh"])
+
+
+class ConfirmationTests(VoteFixtureMixin, TestCase):
+    """Confirmation counts come from the shared head, which may lag the newest votes."""
+
+    def test_head_behind_a_vote_does_not_go_negative(self):
+        old = self._vote("v-old", tx_hash="0xold", block_number=90, status="Success", is_synced=True)
+        new = self._vote("v-new", tx_hash="0xnew", block_number=105, status="Success", is_synced=True)
+
+        finality.update_confirmations(100)
+
+        old.refresh_from_db()
+        new.refresh_from_db()
+        self.assertEqual((old.block_confirmations, new.block_confirmations), (10, 0))
+        self.assertEqual(new.status, "Success")
+
+
+class StuckTransactionTests(VoteFixtureMixin, TestCase):
+    """Transactions the watchdog cannot move any more are abandoned and their votes resubmitted."""
+
+    def _stuck(self, tx_hash, nonce=3):
+        vote = self._vote(f"voter-{tx_hash}", tx_hash=tx_hash, status="Pending")
+        relayed = RelayedTransaction.objects.create(
+            tx_hash=tx_hash, sender="0x" + "11" * 20, nonce=nonce, gas=21000, gas_price=10,
+            chain_id=137, function="voteBatch", vote_count=1, sent_at=timezone.now() - timedelta(hours=1),
+        )
+        return vote, relayed
+
+    def _check(self, **bump):
+        with mock.patch("blockchain.utils.get_receipts", return_value={}), \
+                mock.patch("blockchain.utils.get_blocks", return_value={}), \
+                mock.patch.object(watchdog, "bump_fee", **bump):
+            return watchdog.check_stuck_transactions()
+
+    def test_transaction_at_the_gas_cap_is_abandoned(self):
+        vote, relayed = self._stuck("0xcapped")
+        self.assertEqual(resubmit.due_votes(min_age=0), [])
+
+        self.assertEqual(self._check(return_value=None)["abandoned"], 1)
+        relayed.refresh_from_db()
+        self.assertEqual(relayed.status, RelayedTransaction.Status.ABANDONED)
+        self.assertEqual([v.pk for v in resubmit.due_votes(min_age=0)], [vote.pk])
+
+    def test_consumed_nonce_is_abandoned_after_a_final_receipt_check(self):
+        vote, relayed = self._stuck("0xreplaced")
+        result = self._check(side_effect=ValueError("nonce too low"))
+        self.assertEqual((result["abandoned"], result["failed"]), (1, 0))
+        self.assertEqual([v.pk for v in resubmit.due_votes(min_age=0)], [vote.pk])
+
+        # An unrelated send error keeps the transaction tracked
+        _, other = self._stuck("0xflaky", nonce=4)
+        self.assertEqual(self._check(side_effect=ConnectionError("timeout"))["failed"], 1)
+        other.refresh_from_db()
+        self.assertEqual(other.status, RelayedTransaction.Status.PENDING)
+
+    def test_abandoned_anchor_is_sent_again(self):
+        _, relayed = self._stuck("0xanchor")
+        watchdog.abandon(relayed, "test")
+        batch = MerkleBatch.objects.create(root="0x" + "cd" * 32, leaf_count=1, tx_hash="0xanchor")
+        self.assertIsNone(anchoring._sent_receipt(batch))
+        self.assertEqual(batch.status, MerkleBatch.Status.FAILED)
+
+
+class FinalityTests(VoteFixtureMixin, TestCase):
+    """Reorg handling and confirmations against a mocked chain."""
+
+    def setUp(self):
+        super().setUp()
+        self.chain, self.receipts = {}, {}
+        IndexerState.objects.create(name=VOTE_INDEXER, last_block=100, head_block=100)
+
+    def _extend(self, first, last, fork="a"):
+        for n in range(first, last + 1):
+            self.chain[n] = {
+                "number": n,
+                "hash": f"{fork}-{n}".encode().ljust(32, b"\0"),
+                "parentHash": f"{fork}-{n - 1}".encode().ljust(32, b"\0"),
+                "timestamp": 1700000000 + n,
+            }
+
+    def _mined(self, tx_hash, block_number):
+        self.receipts[tx_hash] = {"transactionHash": tx_hash, "blockNumber": block_number, "status": 1}
+
+    def _tick(self, head):
+        blocks = lambda numbers: {n: self.chain.get(n) for n in numbers}  # noqa: E731
+        receipts = lambda hashes: {h: self.receipts.get(h) for h in hashes}  # noqa: E731
+        with mock.patch("blockchain.utils.get_blocks", side_effect=blocks), \
+                mock.patch("blockchain.utils.get_receipts", side_effect=receipts), \
+                mock.patch("blockchain.chainhead.head_number", return_value=head):
+            return finality.track_head()
+
+    def _mined_vote(self, voter, tx_hash, block_number):
+        self._mined(tx_hash, block_number)
+        return self._vote(voter, tx_hash=tx_hash, block_number=block_number, status="Success", is_synced=True)
+
+    def test_single_block_reorg_remines_vote_at_a_new_height(self):
+        self._extend(0, 100)
+        vote = self._mined_vote("v-tip", "0xtip", 100)
+        self.assertIsNone(self._tick(100)["reorg_from"])
+
+        # block 100 is replaced; the vote's transaction lands in the new block 101
+        self._extend(100, 101, fork="b")
+        self._mined("0xtip", 101)
+        result = self._tick(101)
+
+        self.assertEqual((result["reorg_from"], result["votes_refreshed"]), (100, 1))
+        vote.refresh_from_db()
+        self.assertEqual((vote.block_number, vote.status, vote.block_confirmations), (101, "Success", 0))
+        self.assertEqual(BlockRecord.objects.get(number=100).hash, self.chain[100]["hash"].hex())
+        self.assertEqual(IndexerState.objects.get(name=VOTE_INDEXER).last_block, 99)
+
+    def test_deep_reorg_returns_dropped_votes_to_pending(self):
+        self._extend(0, 100)
+        safe = self._mined_vote("v-safe", "0xsafe", 96)
+        dropped = self._mined_vote("v-dropped", "0xdropped", 98)
+        self._tick(100)
+
+        self._extend(97, 102, fork="b")
+        del self.receipts["0xdropped"]
+        result = self._tick(102)
+
+        self.assertEqual(result["reorg_from"], 97)
+        dropped.refresh_from_db()
+        self.assertEqual((dropped.status, dropped.block_number), ("Pending", None))
+        safe.refresh_from_db()
+        self.assertEqual((safe.status, safe.block_number, safe.block_confirmations), ("Success", 96, 6))
+
+    def test_head_behind_a_vote_and_finality_promotion(self):
+        self._extend(0, 100)
+        buried = self._mined_vote("v-buried", "0xburied", 30)
+        ahead = self._mined_vote("v-ahead", "0xahead", 105)
+
+        result = self._tick(100)
+
+        self.assertEqual(result["votes_finalized"], 1)
+        buried.refresh_from_db()
+        ahead.refresh_from_db()
+        self.assertEqual(buried.status, "Final")
+        self.assertEqual((ahead.status, ahead.block_confirmations), ("Success", 0))
+
+
+class ResubmissionTests(VoteFixtureMixin, TestCase):
+    """Resubmission is idempotent, backs off, and leaves in-progress reservations alone."""
+
+    def _aged(self, vote, seconds):
+        Vote.objects.filter(pk=vote.pk).update(created_at=timezone.now() - timedelta(seconds=seconds))
+        return vote
+
+    def test_indexed_receipt_is_resolved_without_sending(self):
+        vote = self._aged(self._vote("v-1", receipt="0x" + "ab" * 32, status="Failed", is_synced=False), 600)
+        ChainVoteLog.objects.create(
+            receipt_hash="ab" * 32, election_code=self.election.code, position_code=self.position.code,
+            candidate_code=self.candidates[0].code, tx_hash="0xfirst", block_number=50, block_hash="0x50",
+            log_index=0, chain_timestamp=1700000000,
+        )
+        with mock.patch("blockchain.helpers.cast_vote_batch_chunked") as send:
+            counts = resubmit.resubmit_votes()
+        send.assert_not_called()
+        self.assertEqual(counts["already_on_chain"], 1)
+        vote.refresh_from_db()
+        self.assertEqual(
+            (vote.status, vote.tx_hash, vote.block_number, vote.is_synced), ("Success", "0xfirst", 50, True)
+        )
+
+    def test_failed_pass_backs_off_exponentially(self):
+        self.assertEqual(
+            [resubmit.backoff(n).total_seconds() for n in (1, 2, 3)],
+            [resubmit.RESUBMIT_BACKOFF_SECONDS * k for k in (1, 2, 4)],
+        )
+        self.assertEqual(resubmit.backoff(50).total_seconds(), resubmit.RESUBMIT_BACKOFF_MAX_SECONDS)
+
+        vote = self._aged(self._vote("v-2", status="Failed", is_synced=False), 600)
+        with mock.patch("blockchain.helpers.cast_vote_batch_chunked", side_effect=ConnectionError("down")):
+            self.assertEqual(resubmit.resubmit_votes()["deferred"], 1)
+        vote.refresh_from_db()
+        self.assertEqual(vote.sync_attempts, 1)
+        self.assertAlmostEqual(
+            (vote.next_sync_at - timezone.now()).total_seconds(), resubmit.RESUBMIT_BACKOFF_SECONDS, delta=5
+        )
+        self.assertEqual(resubmit.due_votes(), [])
+
+    def test_reservation_of_a_live_request_is_left_alone(self):
+        live = self._aged(self._vote("v-live"), resubmit.RESUBMIT_MIN_AGE_SECONDS + 60)
+        orphan = self._aged(self._vote("v-orphan"), resubmit.RESUBMIT_RESERVED_MIN_AGE_SECONDS + 60)
+        self.assertEqual([v.pk for v in resubmit.due_votes()], [orphan.pk])
+
+        # Once resubmission has moved a row on, a late release from its request keeps it
+        Vote.objects.filter(pk=live.pk).update(status="Pending", tx_hash="0xresent")
+        reservation.release([live])
+        self.assertTrue(Vote.objects.filter(pk=live.pk).exists())
+
+
+class SimulationTests(TestCase):
+    """Revert decoding and the dry-run split decide which votes are broadcast."""
+
+    def test_decode_revert(self):
+        error_string = "0x" + simulation.ERROR_SELECTOR + abi_encode(["string"], ["Already voted"]).hex()
+        panic = "0x" + simulation.PANIC_SELECTOR + abi_encode(["uint256"], [0x11]).hex()
+        cases = [
+            ({"data": error_string}, "Already voted"),
+            ({"data": {"data": error_string}}, "Already voted"),
+            ({"data": panic}, "Panic(0x11)"),
+            ({"data": "0xdeadbeef"}, "Custom error 0xdeadbeef"),
+            ({"data": "0x" + simulation.ERROR_SELECTOR + "00"}, f"Custom error 0x{simulation.ERROR_SELECTOR}"),
+            ({"data": "0x", "message": "execution reverted"}, "execution reverted"),
+            ({"message": "execution reverted: Election closed"}, "Election closed"),
+            ({}, "execution reverted"),
+        ]
+        for error, reason in cases:
+            with self.subTest(error=error):
+                self.assertEqual(simulation.decode_revert(error), reason)
+
+    def _split(self, responses, receipts, batch_error=None):
+        contract = mock.Mock()
+        contract.encode_abi.side_effect = lambda fn, args: "0x" + args[2].hex()
+        with mock.patch("blockchain.utils.contract", return_value=contract), \
+                mock.patch("blockchain.utils.check_connection"), \
+                mock.patch("blockchain.utils.web3") as web3:
+            web3.provider.make_batch_request.side_effect = batch_error
+            web3.provider.make_batch_request.return_value = responses
+            web3.provider.make_request.side_effect = list(sorted(responses, key=lambda r: r["id"]))
+            return simulation.split_passing(["P1"] * len(receipts), ["C1"] * len(receipts), receipts)
+
+    def test_split_passing_drops_reverting_and_repeated_receipts(self):
+        used = "0x" + simulation.ERROR_SELECTOR + abi_encode(["string"], ["Receipt already used"]).hex()
+        # the provider may answer out of order; ids restore the call order
+        responses = [
+            {"id": 2, "error": {"message": "execution reverted", "data": used}},
+            {"id": 1, "result": "0x"},
+            {"id": 3, "result": "0x"},
+        ]
+        receipts = ["0x01", "0x02", "0x01", "0x03"]
+        passing, failing = self._split(responses, receipts)
+        self.assertEqual(passing, [0, 3])
+        self.assertEqual(failing, {1: "Receipt already used", 2: simulation.RECEIPT_USED})
+
+        # a provider without batch support is asked call by call
+        passing, failing = self._split(responses, receipts, batch_error=ValueError("batch unsupported"))
+        self.assertEqual((passing, list(failing)), ([0, 3], [1, 2]))
+
+
+class LedgerTests(VoteFixtureMixin, TestCase):
+    """Each mined transaction is counted once in the rollups, and its fee is split across its votes."""
+
+    receipt = {
+        "transactionHash": mock.Mock(**{"hex.return_value": "0xfee"}),
+        "blockNumber": 50, "status": 1, "gasUsed": 100, "effectiveGasPrice": 1,
+    }
+
+    def _rollups(self):
+        return sorted(FeeRollup.objects.values_list("dimension", "tx_count", "vote_count", "gas_used", "fee_wei"))
+
+    def test_receipt_is_recorded_once(self):
+        RelayedTransaction.objects.create(
+            tx_hash="0xfee", sender="0x" + "11" * 20, nonce=1, gas=21000, gas_price=1, chain_id=137,
+            function="voteBatch", election_code="SRC", vote_count=3, sent_at=timezone.now(),
+        )
+        self.assertTrue(ledger.record_receipt("0xfee", self.receipt))
+        self.assertFalse(ledger.record_receipt("0xfee", self.receipt))
+
+        rollups = self._rollups()
+        self.assertEqual(rollups, [(dimension, 1, 3, 100, 100) for dimension in ("day", "election", "function")])
+        ledger.rebuild_rollups()
+        self.assertEqual(self._rollups(), rollups)
+
+    def test_vote_fee_shares_add_up_to_the_transaction_fee(self):
+        votes = [self._vote(f"voter-{i}", tx_hash="0xfee", status="Pending") for i in range(3)]
+        relayed = RelayedTransaction.objects.create(
+            tx_hash="0xfee", sender="0x" + "11" * 20, nonce=1, gas=21000, gas_price=1, chain_id=137,
+            function="voteBatch", vote_count=3, sent_at=timezone.now(),
+        )
+
+        watchdog._mark_mined(relayed, self.receipt, None)
+
+        shares = list(
+            Vote.objects.filter(pk__in=[v.pk for v in votes]).values_list("network_fee_matic", flat=True)
+        )
+        self.assertEqual(sorted(shares), [Decimal("33e-18"), Decimal("33e-18"), Decimal("34e-18")])
+        self.assertEqual(sum(shares) * ledger.WEI_PER_MATIC, RelayedTransaction.objects.get().fee_wei)
@@ -1,6 +1,7 @@
 from django.urls import path
+from blockchain.views import RPCMetricsView, FeeReportView
 
 urlpatterns = [
-    # Add at least one dummy or real path
-    path('test/', lambda request: HttpResponse("Test successful")),
+    path("metrics/", RPCMetricsView.as_view(), name="rpc-metrics"),
+    path("fees/", FeeReportView.as_view(), name="fee-report"),
 ]
@@ -2,19 +2,27 @@
 
 import os
 import json
+import logging
 import binascii
 from web3 import Web3
-from web3.exceptions import TimeExhausted, ContractLogicError
+from web3.exceptions import TimeExhausted, ContractLogicError, BlockNotFound, TransactionNotFound
 from dotenv import load_dotenv
+from django.utils import timezone
 from web3.middleware.proof_of_authority import ExtraDataToPOAMiddleware
 
 from blockchain.web3_config import web3, check_connection
+from blockchain import metrics
+from blockchain.relayers import relayer_pool
+from blockchain.models import RelayedTransaction
+from blockchain import readmodel, ledger
 from elections.models.positions import Position
 from elections.models.candidates import Candidate
 from elections.models.elections import Election
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 PRIVATE_KEY = os.getenv("PK")
 WALLET_ADDRESS = os.getenv("WA")
 CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS")
@@ -30,11 +38,17 @@ else:
     idx = existing_mws.index(MW_NAME)
     web3.middleware_onion.replace(idx, ExtraDataToPOAMiddleware(), name=MW_NAME)
 
+# ---------------------- Inject RPC Metrics Middleware ----------------------
+METRICS_MW_NAME = "RPCMetricsMiddleware"
+if METRICS_MW_NAME not in web3.middleware_onion:
+    web3.middleware_onion.add(metrics.RPCMetricsMiddleware, name=METRICS_MW_NAME)
+
 # ---------------------- Load ABI ----------------------
 ABI_PATH = os.path.join(os.path.dirname(__file__), "abi.json")
 if os.path.exists(ABI_PATH):
     with open(ABI_PATH) as f:
         abi = json.load(f)
+    metrics.register_abi(abi)
 else:
     abi = None
     print("⚠️ ABI file not found — contract calls will fail until provided.")
@@ -94,6 +108,48 @@ def generate_receipt_hash(did: str, as_hex: bool = False):
     return hash_bytes.hex() if as_hex else hash_bytes
 
 
+# ---------------------- Batched Reads ----------------------
+def _as_hex(value):
+    value = value.hex() if isinstance(value, (bytes, bytearray)) else str(value)
+    return value if value.startswith("0x") else "0x" + value
+
+
+def _batched(method, args):
+    """Run `method(arg)` for every arg in one JSON-RPC batch; sequential fallback on failure."""
+    args = list(dict.fromkeys(args))
+    if not args:
+        return {}
+    try:
+        with web3.batch_requests() as batch:
+            for arg in args:
+                batch.add(method(arg))
+            return dict(zip(args, batch.execute()))
+    except Exception as e:
+        logger.warning(f"Batch request failed ({e}); falling back to sequential calls.")
+
+    results = {}
+    for arg in args:
+        try:
+            results[arg] = method(arg)
+        except (BlockNotFound, TransactionNotFound):
+            results[arg] = None
+    return results
+
+
+def get_blocks(block_numbers):
+    """Map block number -> block (None if missing) using a single batch request."""
+    check_connection()
+    return _batched(web3.eth.get_block, block_numbers)
+
+
+def get_receipts(tx_hashes):
+    """Map tx hash (as given) -> receipt (None if not mined) using a single batch request."""
+    check_connection()
+    by_hex = {_as_hex(h): h for h in tx_hashes}
+    fetched = _batched(web3.eth.get_transaction_receipt, by_hex.keys())
+    return {original: fetched.get(h) for h, original in by_hex.items()}
+
+
 # ---------------------- Revert Reason Extractor ----------------------
 def extract_revert_reason(tx_dict):
     """
@@ -116,57 +172,184 @@ def extract_revert_reason(tx_dict):
 
 
 # ---------------------- Transaction Builder ----------------------
+class TransactionPending(Exception):
+    """Sent but not mined within the wait timeout; the watchdog keeps tracking `tx_hash`."""
+
+    def __init__(self, message, tx_hash):
+        super().__init__(message)
+        self.tx_hash = tx_hash
+
+
+def _fn_name(fn):
+    return getattr(fn, "fn_name", getattr(fn, "__name__", "unknown"))
+
+
 def build_and_send_tx(fn, *args):
     check_connection()
-    acct = web3.eth.account.from_key(PRIVATE_KEY)
-    if acct.address.lower() != WALLET_ADDRESS.lower():
-        raise ValueError("Wallet address mismatch")
+    fn_name = _fn_name(fn)
+    with metrics.timer(metrics.TX, fn_name):
+        with relayer_pool().lease() as signer:
+            tx, tx_hash = submit_tx(signer, fn, *args)
+            return wait_for_receipt(tx, tx_hash, fn_name)
+
 
-    nonce = web3.eth.get_transaction_count(acct.address, 'pending')
+def submit_tx(signer, fn, *args):
+    """Estimate, build, sign and broadcast `fn(*args)` from `signer` without waiting. Returns (tx, tx_hash)."""
+    fn_name = _fn_name(fn)
 
     # --- Estimate gas with clean revert reason ---
     try:
-        gas_estimate = fn(*args).estimate_gas({'from': acct.address})
-        print(f"🧪 Gas estimate: {gas_estimate}")
+        with metrics.timer(metrics.TX_PHASE, "estimate", function=fn_name):
+            gas_estimate = fn(*args).estimate_gas({'from': signer.address})
+        logger.debug(f"🧪 Gas estimate for {fn_name}: {gas_estimate}")
     except ContractLogicError as e:
         raise Exception(f"⛔ Contract revert: {str(e)}")
     except Exception as e:
         raise Exception(f"⚠️ Gas estimation failed: {e}")
 
-    tx = fn(*args).build_transaction({
-        'from': acct.address,
-        'nonce': nonce,
-        'gas': int(gas_estimate * 1.2),
-        'gasPrice': int(web3.eth.gas_price * 1.4),
-        'chainId': CHAIN_ID
-    })
+    with metrics.timer(metrics.TX_PHASE, "nonce"):
+        nonce = signer.next_nonce()
+    try:
+        with metrics.timer(metrics.TX_PHASE, "build", function=fn_name):
+            tx = fn(*args).build_transaction({
+                'from': signer.address,
+                'nonce': nonce,
+                'gas': int(gas_estimate * 1.2),
+                'gasPrice': int(web3.eth.gas_price * 1.4),
+                'chainId': CHAIN_ID
+            })
+        tx_hash = _sign_and_send(
+            signer, tx, fn_name,
+            election_code=ledger.election_code_for(fn_name, args),
+            vote_count=ledger.vote_count_for(fn_name, args),
+        )
+    except Exception:
+        signer.resync_nonce()
+        raise
+
+    return tx, tx_hash
+
+
+def _sign_and_send(signer, tx, fn_name, **ledger_fields):
+    with metrics.timer(metrics.TX_PHASE, "sign", function=fn_name):
+        signed_tx = signer.account.sign_transaction(tx)
+    with metrics.timer(metrics.TX_PHASE, "send", function=fn_name):
+        tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    logger.info(f"📦 TX Hash ({fn_name} via {signer.address}): {tx_hash.hex()}")
+    _track_sent(signer, tx, tx_hash, fn_name, **ledger_fields)
+    return tx_hash
+
+
+def _track_sent(signer, tx, tx_hash, fn_name, **ledger_fields):
+    """Record the broadcast so the stuck-transaction watchdog can fee-bump it (and its fee be ledgered)."""
+    data = tx.get('data') or b''
+    try:
+        RelayedTransaction.objects.create(
+            tx_hash=tx_hash.hex(),
+            sender=signer.address,
+            nonce=tx['nonce'],
+            to_address=tx.get('to'),
+            data=data if isinstance(data, str) else _as_hex(data),
+            value=tx.get('value', 0),
+            gas=tx['gas'],
+            gas_price=tx['gasPrice'],
+            chain_id=tx['chainId'],
+            function=fn_name,
+            sent_at=timezone.now(),
+            **ledger_fields,
+        )
+    except Exception as e:
+        logger.warning(f"Could not record relayed transaction {tx_hash.hex()}: {e}")
 
-    signed_tx = acct.sign_transaction(tx)
-    tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
-    print(f"📦 TX Hash: {tx_hash.hex()}")
+def wait_for_receipt(tx, tx_hash, fn_name):
     try:
-        receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=60, poll_latency=5)
-        print(f"✅ TX mined: {receipt.transactionHash.hex()}")
+        with metrics.timer(metrics.TX_PHASE, "receipt", function=fn_name, tx_hash=tx_hash.hex()):
+            receipt = web3.eth.wait_for_transaction_receipt(tx_hash, timeout=60, poll_latency=5)
+        logger.info(f"✅ TX mined: {receipt.transactionHash.hex()}")
+        RelayedTransaction.objects.filter(tx_hash=tx_hash.hex()).update(
+            status=RelayedTransaction.Status.MINED, mined_at=timezone.now()
+        )
+        ledger.record_receipt(tx_hash.hex(), receipt)
         return receipt
     except TimeExhausted:
         reason = extract_revert_reason(tx)
-        raise Exception(f"⏳ TX not mined in time: {tx_hash.hex()} | Reason: {reason or 'Unknown'}")
+        raise TransactionPending(
+            f"⏳ TX not mined in time: {tx_hash.hex()} | Reason: {reason or 'Unknown'}",
+            tx_hash.hex(),
+        )
+
+
+def anchor_data(data):
+    """
+    Anchor raw bytes (e.g. a Merkle root) on-chain with a zero-value
+    transaction from a relayer to itself carrying `data` as calldata.
+    """
+    check_connection()
+    with metrics.timer(metrics.TX, "anchorData"):
+        with relayer_pool().lease() as signer:
+            tx = {
+                'from': signer.address,
+                'to': signer.address,
+                'value': 0,
+                'data': data,
+                'gasPrice': int(web3.eth.gas_price * 1.4),
+                'chainId': CHAIN_ID
+            }
+            with metrics.timer(metrics.TX_PHASE, "estimate", function="anchorData"):
+                tx['gas'] = int(web3.eth.estimate_gas(tx) * 1.2)
+
+            with metrics.timer(metrics.TX_PHASE, "nonce"):
+                tx['nonce'] = signer.next_nonce()
+            try:
+                tx_hash = _sign_and_send(signer, tx, "anchorData")
+            except Exception:
+                signer.resync_nonce()
+                raise
+
+            try:
+                return wait_for_receipt(tx, tx_hash, "anchorData")
+            except TransactionPending:
+                raise
+            except Exception as e:
+                # Already broadcast: the caller must track tx_hash, not send again
+                raise TransactionPending(f"⏳ Receipt lookup failed for {tx_hash.hex()}: {e}", tx_hash.hex()) from e
 
 
 # ---------------------- Election/Position/Candidate Actions ----------------------
 # ---------------------- Queries (local helpers) ----------------------
+# Read model first (blockchain/readmodel.py); eth_call only on a miss, positives are recorded.
 def _position_exists_onchain(position_code: str) -> bool:
-    return contract().functions.positionExists(to_bytes32(position_code)).call()
+    if readmodel.position_known(position_code):
+        return True
+    exists = contract().functions.positionExists(to_bytes32(position_code)).call()
+    if exists:
+        readmodel.record_position(position_code)
+    return exists
 
 def _election_exists_onchain(election_code: str) -> bool:
-    return contract().functions.electionExists(to_bytes32(election_code)).call()
+    if readmodel.election_known(election_code):
+        return True
+    exists = contract().functions.electionExists(to_bytes32(election_code)).call()
+    if exists:
+        readmodel.record_election(election_code)
+    return exists
 
 def _candidate_exists_onchain(position_code: str, candidate_code: str) -> bool:
+    if readmodel.candidate_known(position_code, candidate_code):
+        return True
     # uses the contract helper for O(1) lookup instead of scanning results
-    return contract().functions.candidateExists(
+    exists = contract().functions.candidateExists(
         to_bytes32(position_code), to_bytes32(candidate_code)
     ).call()
+    if exists:
+        readmodel.record_candidate(position_code, candidate_code)
+    return exists
+
+def _receipt_used_onchain(receipt_hash: str) -> bool:
+    if readmodel.receipt_known(receipt_hash):
+        return True
+    return contract().functions.hasVoted(to_bytes32(receipt_hash)).call()
 
 # ---------------------- Election/Position/Candidate Actions ----------------------
 def add_position(position_code, title, election_code, mark_synced=True):
@@ -182,6 +365,8 @@ def add_position(position_code, title, election_code, mark_synced=True):
         contract().functions.addPosition,
         to_bytes32(position_code), title, to_bytes32(election_code)
     )
+    if receipt.get("status") == 1:
+        readmodel.record_position(position_code, election_code)
     if mark_synced:
         Position.objects.filter(code=position_code).update(is_synced=True)
     return receipt
@@ -199,6 +384,8 @@ def add_candidate(position_code, candidate_code, name, mark_synced=True):
         contract().functions.addCandidate,
         to_bytes32(position_code), to_bytes32(candidate_code), name
     )
+    if receipt.get("status") == 1:
+        readmodel.record_candidate(position_code, candidate_code)
     if mark_synced:
         Candidate.objects.filter(code=candidate_code).update(is_synced=True)
     return receipt
@@ -220,7 +407,9 @@ def sync_election(election):
 
     # ensure election on-chain (no-op if already there)
     if not _election_exists_onchain(election_code):
-        build_and_send_tx(contract().functions.addElection, to_bytes32(election_code))
+        receipt = build_and_send_tx(contract().functions.addElection, to_bytes32(election_code))
+        if receipt.get("status") == 1:
+            readmodel.record_election(election_code)
         Election.objects.filter(code=election_code).update(is_synced=True)
 
     # light runaway guard (prevent accidental unbounded loops in callers)
@@ -1,3 +1,63 @@
-from django.shortcuts import render
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions
+from rest_framework.views import APIView
+from rest_framework.response import Response
 
-# Create your views here.
+from blockchain import metrics, chainhead
+from blockchain.relayers import relayer_pool
+from blockchain.ledger import fee_report
+
+
+class RPCMetricsView(APIView):
+    """
+    Per-process blockchain call metrics (Admin-only).
+    Counts, error counts and latency histograms per JSON-RPC method,
+    per contract function, and per build_and_send_tx phase, plus the
+    nonce lane / balance state of each relayer.
+    """
+    permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Blockchain RPC metrics",
+        manual_parameters=[
+            openapi.Parameter("reset", openapi.IN_QUERY, type=openapi.TYPE_BOOLEAN, required=False,
+                              description="Clear the counters after reading them"),
+        ]
+    )
+    def get(self, request):
+        data = {
+            "slow_call_threshold_ms": metrics.SLOW_CALL_MS,
+            "metrics": metrics.registry.snapshot(),
+            "relayers": self._relayer_status(),
+            "chain_head": chainhead.health(),
+        }
+        if request.query_params.get("reset") in ("1", "true", "True"):
+            metrics.registry.reset()
+        return Response(data)
+
+    @staticmethod
+    def _relayer_status():
+        try:
+            return relayer_pool().status()
+        except Exception as e:
+            return {"error": str(e)}
+
+
+class FeeReportView(APIView):
+    """
+    Network fee rollups (Admin-only): transactions, votes, gas and MATIC spent
+    per election, per day and per contract function, with the cost per vote.
+    """
+    permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Network fee report",
+        manual_parameters=[
+            openapi.Parameter("dimension", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              enum=["election", "day", "function"],
+                              description="Only return rollups for this dimension"),
+        ]
+    )
+    def get(self, request):
+        return Response({"rollups": fee_report(request.query_params.get("dimension"))})
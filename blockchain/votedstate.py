@@ -0,0 +1,142 @@
+# blockchain/votedstate.py
+"""
+In-memory voted state.
+
+Answers "has this voter already voted for this position?" and "has this
+receipt been used on-chain?" from per-process sets. Positives come from
+confirmed writes, the VoteCast indexer and Vote rows past the "Reserved"
+stage; a reservation can still be released, so it is reported but never
+remembered, and `forget` drops slots whose reservation this process
+released. Negatives are cached for VOTED_STATE_NEGATIVE_TTL seconds so a
+burst of checks for the same voter costs one lookup. Misses fall back to
+one Vote query (voter slots) or to the read model / hasVoted (receipts).
+
+Negatives can be stale for up to the TTL when another worker records the
+vote; the (voter_did_hash, position) unique constraint still rejects the
+duplicate at insert time.
+"""
+
+import os
+import time
+import threading
+
+VOTED_STATE_NEGATIVE_TTL = float(os.getenv("VOTED_STATE_NEGATIVE_TTL", 5))
+VOTED_STATE_MAX_NEGATIVES = int(os.getenv("VOTED_STATE_MAX_NEGATIVES", 100000))
+
+
+class VotedState:
+    def __init__(self, negative_ttl=VOTED_STATE_NEGATIVE_TTL, max_negatives=VOTED_STATE_MAX_NEGATIVES):
+        self.negative_ttl = negative_ttl
+        self.max_negatives = max_negatives
+        self._lock = threading.Lock()
+        self._slots = set()         # (voter_did_hash, position_code)
+        self._receipts = set()      # normalized receipt hashes
+        self._negatives = {}        # key -> expiry (monotonic seconds)
+
+    # --- writes ---
+    def mark_voted(self, voter_did_hash, position_codes):
+        with self._lock:
+            for code in position_codes:
+                key = (voter_did_hash, code)
+                self._slots.add(key)
+                self._negatives.pop(key, None)
+
+    def mark_receipts_used(self, receipts):
+        from blockchain.indexer import normalize_receipt
+
+        with self._lock:
+            for receipt in receipts:
+                key = normalize_receipt(receipt)
+                self._receipts.add(key)
+                self._negatives.pop(key, None)
+
+    def forget(self, voter_did_hash, position_codes):
+        """Drop slots freed by a released reservation."""
+        with self._lock:
+            for code in position_codes:
+                key = (voter_did_hash, code)
+                self._slots.discard(key)
+                self._negatives.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._slots.clear()
+            self._receipts.clear()
+            self._negatives.clear()
+
+    # --- negative cache ---
+    def _negative(self, key, now):
+        expiry = self._negatives.get(key)
+        if expiry is None:
+            return False
+        if expiry < now:
+            del self._negatives[key]
+            return False
+        return True
+
+    def _remember_negatives(self, keys, now):
+        if len(self._negatives) + len(keys) > self.max_negatives:
+            self._negatives = {k: e for k, e in self._negatives.items() if e >= now}
+            if len(self._negatives) + len(keys) > self.max_negatives:
+                self._negatives.clear()
+        expiry = now + self.negative_ttl
+        for key in keys:
+            self._negatives[key] = expiry
+
+    # --- reads ---
+    def known_voted(self, voter_did_hash, position_codes):
+        """Subset of `position_codes` already known to be voted in this process (never queries)."""
+        with self._lock:
+            return {c for c in position_codes if (voter_did_hash, c) in self._slots}
+
+    def voted_positions(self, voter_did_hash, position_codes):
+        """Subset of `position_codes` this voter has already voted for (one Vote query on a cache miss)."""
+        from votes.models import Vote
+
+        codes = set(position_codes)
+        now = time.monotonic()
+        with self._lock:
+            voted = {c for c in codes if (voter_did_hash, c) in self._slots}
+            unknown = {
+                c for c in codes - voted if not self._negative((voter_did_hash, c), now)
+            }
+        if not unknown:
+            return voted
+
+        from votes.reservation import RESERVED
+
+        rows = list(Vote.objects.filter(voter_did_hash=voter_did_hash, position__code__in=unknown).values_list(
+            "position__code", "status"
+        ))
+        found = {code for code, _ in rows}
+        self.mark_voted(voter_did_hash, {code for code, status in rows if status != RESERVED})
+        with self._lock:
+            self._remember_negatives([(voter_did_hash, c) for c in unknown - found], now)
+        return voted | found
+
+    def has_voted(self, voter_did_hash, position_code):
+        return bool(self.voted_positions(voter_did_hash, [position_code]))
+
+    def receipt_used(self, receipt):
+        """Receipt already used on-chain? Memory first, then the read model and hasVoted."""
+        from blockchain.indexer import normalize_receipt
+        from blockchain.utils import _receipt_used_onchain
+
+        key = normalize_receipt(receipt)
+        now = time.monotonic()
+        with self._lock:
+            if key in self._receipts:
+                return True
+            if self._negative(key, now):
+                return False
+
+        used = _receipt_used_onchain(receipt)
+        if used:
+            self.mark_receipts_used([receipt])
+        else:
+            with self._lock:
+                self._remember_negatives([key], now)
+        return used
+
+
+voted_state = VotedState()
@@ -0,0 +1,172 @@
+# blockchain/watchdog.py
+"""
+Stuck-transaction watchdog.
+
+Relayed transactions still pending after STUCK_TX_SECONDS are rebroadcast
+with the same nonce and a gas price bumped by FEE_BUMP_PERCENT (capped at
+MAX_GAS_PRICE_GWEI), so a fee spike cannot hold a relayer's nonce lane
+hostage. Vote rows and Merkle batches follow the replacement hash; once any
+broadcast of the nonce is mined votes get its block data.
+
+A transaction that can no longer be bumped (gas price at the cap) or whose
+nonce was consumed by something else is marked Abandoned and its votes are
+made due for `manage.py resubmit_votes`. Receipts are single-use in the
+contract, so should the abandoned broadcast still be mined, the resent
+votes revert instead of counting twice.
+"""
+
+import os
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.db import transaction
+from django.utils import timezone
+
+from blockchain.models import RelayedTransaction, MerkleBatch
+from blockchain.ledger import record_receipt, fee_shares_matic, store_fee_shares
+
+logger = logging.getLogger(__name__)
+
+STUCK_TX_SECONDS = int(os.getenv("STUCK_TX_SECONDS", 120))
+FEE_BUMP_PERCENT = int(os.getenv("FEE_BUMP_PERCENT", 20))
+MAX_GAS_PRICE_GWEI = int(os.getenv("MAX_GAS_PRICE_GWEI", 2000))
+
+
+def _mark_mined(relayed, receipt, block):
+    """Resolve a relayed transaction and every Vote linked to any of its hashes."""
+    from votes.models import Vote
+    from votes.tally import update_votes
+
+    mined_hash = receipt["transactionHash"].hex()
+    status = "Success" if receipt.get("status") == 1 else "Failed"
+    with transaction.atomic():
+        votes = Vote.objects.filter(tx_hash__in=relayed.all_hashes)
+        vote_ids = list(votes.order_by("pk").values_list("pk", flat=True))
+        update_votes(
+            votes,
+            tx_hash=mined_hash,
+            block_number=receipt["blockNumber"],
+            block_timestamp=(
+                datetime.fromtimestamp(block["timestamp"], tz=dt_timezone.utc) if block else None
+            ),
+            status=status,
+            is_synced=status == "Success",
+        )
+        store_fee_shares(vote_ids, fee_shares_matic(receipt, relayed.vote_count))
+        MerkleBatch.objects.filter(tx_hash__in=relayed.all_hashes).update(tx_hash=mined_hash)
+        if mined_hash != relayed.tx_hash:
+            relayed.previous_hashes = [h for h in relayed.all_hashes if h != mined_hash]
+            relayed.tx_hash = mined_hash
+        relayed.status = RelayedTransaction.Status.MINED
+        relayed.mined_at = timezone.now()
+        relayed.save(update_fields=["tx_hash", "previous_hashes", "status", "mined_at"])
+        record_receipt(mined_hash, receipt)
+
+
+def abandon(relayed, reason):
+    """Stop tracking a transaction and hand its unresolved votes to resubmission."""
+    from votes.models import Vote
+
+    with transaction.atomic():
+        relayed.status = RelayedTransaction.Status.ABANDONED
+        relayed.save(update_fields=["status"])
+        handed_over = Vote.objects.filter(tx_hash__in=relayed.all_hashes, status="Pending").update(
+            next_sync_at=timezone.now()
+        )
+    logger.error(
+        f"Abandoned {relayed.tx_hash} (nonce {relayed.nonce}): {reason}; "
+        f"{handed_over} votes handed to resubmission."
+    )
+    return handed_over
+
+
+def bump_fee(relayed):
+    """Rebroadcast with the same nonce and a higher gas price. Returns the new hash or None."""
+    from votes.models import Vote
+    from blockchain.relayers import relayer_pool
+    from blockchain.utils import web3
+
+    cap = web3.to_wei(MAX_GAS_PRICE_GWEI, "gwei")
+    bumped = relayed.gas_price * (100 + FEE_BUMP_PERCENT) // 100
+    new_price = min(max(bumped, int(web3.eth.gas_price * 1.4)), cap)
+    if new_price <= relayed.gas_price:
+        logger.error(
+            f"Cannot bump {relayed.tx_hash} (nonce {relayed.nonce}): "
+            f"gas price already at cap of {MAX_GAS_PRICE_GWEI} gwei."
+        )
+        return None
+
+    signer = relayer_pool().get(relayed.sender)
+    tx = {
+        'from': relayed.sender,
+        'to': relayed.to_address,
+        'value': int(relayed.value),
+        'data': relayed.data,
+        'nonce': relayed.nonce,
+        'gas': relayed.gas,
+        'gasPrice': new_price,
+        'chainId': relayed.chain_id,
+    }
+    signed_tx = signer.account.sign_transaction(tx)
+    new_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction).hex()
+
+    old_hashes = relayed.all_hashes
+    with transaction.atomic():
+        relayed.previous_hashes = old_hashes
+        relayed.tx_hash = new_hash
+        relayed.gas_price = new_price
+        relayed.bump_count += 1
+        relayed.sent_at = timezone.now()
+        relayed.save(update_fields=["tx_hash", "previous_hashes", "gas_price", "bump_count", "sent_at"])
+        Vote.objects.filter(tx_hash__in=old_hashes).update(tx_hash=new_hash)
+        MerkleBatch.objects.filter(tx_hash__in=old_hashes).update(tx_hash=new_hash)
+
+    logger.warning(
+        f"Replaced stuck tx {old_hashes[0]} (nonce {relayed.nonce}) with {new_hash} "
+        f"at {web3.from_wei(new_price, 'gwei')} gwei."
+    )
+    return new_hash
+
+
+def check_stuck_transactions(max_age=STUCK_TX_SECONDS):
+    """Resolve mined transactions and fee-bump the ones pending longer than `max_age` seconds."""
+    from blockchain.utils import get_blocks, get_receipts
+
+    stuck = list(RelayedTransaction.objects.filter(
+        status=RelayedTransaction.Status.PENDING,
+        sent_at__lt=timezone.now() - timedelta(seconds=max_age),
+    ).order_by("sender", "nonce"))
+    if not stuck:
+        return {"mined": 0, "bumped": 0, "failed": 0, "abandoned": 0}
+
+    # Any broadcast of a nonce may be the one that got mined
+    receipts = get_receipts([h for r in stuck for h in r.all_hashes])
+    blocks = get_blocks({r["blockNumber"] for r in receipts.values() if r is not None})
+
+    mined = bumped = failed = abandoned = 0
+    for relayed in stuck:
+        receipt = next((receipts[h] for h in relayed.all_hashes if receipts.get(h)), None)
+        if receipt is not None:
+            _mark_mined(relayed, receipt, blocks.get(receipt["blockNumber"]))
+            mined += 1
+            continue
+        try:
+            if bump_fee(relayed):
+                bumped += 1
+            else:
+                abandon(relayed, f"gas price already at the {MAX_GAS_PRICE_GWEI} gwei cap")
+                abandoned += 1
+        except Exception as e:
+            if "nonce too low" not in str(e).lower():
+                logger.warning(f"Fee bump failed for {relayed.tx_hash}: {e}")
+                failed += 1
+                continue
+            # The nonce is used: either one of our broadcasts got mined meanwhile, or something else
+            final = get_receipts(relayed.all_hashes)
+            receipt = next((final[h] for h in relayed.all_hashes if final.get(h)), None)
+            if receipt is not None:
+                _mark_mined(relayed, receipt, get_blocks({receipt["blockNumber"]}).get(receipt["blockNumber"]))
+                mined += 1
+            else:
+                abandon(relayed, "nonce consumed by another transaction")
+                abandoned += 1
+    return {"mined": mined, "bumped": bumped, "failed": failed, "abandoned": abandoned}
@@ -13,6 +13,11 @@ web3 = Web3(Web3.HTTPProvider(ALCHEMY_URL))
 
 def check_connection():
     """Ensure web3 is connected to the blockchain."""
+    from blockchain.chainhead import is_fresh
+
+    # A head published within the staleness bound proves the provider is reachable
+    if is_fresh():
+        return True
     if not web3.is_connected():
         raise ConnectionError("❌ Not connected to Polygon Mainnet — check your RPC URL and network status")
     return True
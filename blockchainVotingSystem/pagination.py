@@ -1,7 +1,7 @@
 # accounts/pagination.py or core/pagination.py (depending on structure)
 
 from collections import OrderedDict
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.response import Response
 
 class PageNumberPaginationNoCount(PageNumberPagination):
@@ -18,3 +18,12 @@ class PageNumberPaginationNoCount(PageNumberPagination):
                 ]
             )
         )
+
+
+class VoteReceiptCursorPagination(CursorPagination):
+    """Keyset pagination over vote receipts (by primary key), constant cost at any depth"""
+
+    ordering = "id"
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
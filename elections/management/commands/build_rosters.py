@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from elections import roster
+from elections.models.elections import Election
+
+
+class Command(BaseCommand):
+    help = "Rebuild eligible-voter rosters (all elections that have not ended, or one)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--election", help="Election code to rebuild")
+
+    def handle(self, *args, **options):
+        if options["election"]:
+            elections = Election.objects.filter(code=options["election"])
+            if not elections.exists():
+                raise CommandError(f"Election {options['election']} not found")
+        else:
+            elections = Election.objects.filter(end_date__gte=timezone.now())
+
+        for election in elections:
+            sizes = roster.build(election)
+            self.stdout.write(self.style.SUCCESS(
+                f"{election.code}: {len(sizes)} rosters, {sum(sizes.values())} eligible slots"
+            ))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PositionRoster',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_ids', models.JSONField(default=list)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+                ('election', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rosters', to='elections.election')),
+                ('position', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='roster', to='elections.position')),
+            ],
+            options={
+                'verbose_name': 'Position Roster',
+                'verbose_name_plural': 'Position Rosters',
+                'ordering': ['election', 'position'],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Least, NullIf
+from django.utils import timezone
+
+
+def build_rosters(apps, schema_editor):
+    """Build rosters for published elections that have not ended (mirrors elections/roster.py)."""
+    Election = apps.get_model("elections", "Election")
+    Position = apps.get_model("elections", "Position")
+    PositionRoster = apps.get_model("elections", "PositionRoster")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    current_level = Coalesce(
+        NullIf(F("level"), Value(0)),
+        Least(Value(datetime.now().year) - F("year_enrolled") + 1, Value(4)),
+    )
+    users = User.objects.annotate(roster_level=current_level)
+    elections = Election.objects.filter(end_date__gte=timezone.now()).exclude(status__in=["draft", "cancelled"])
+
+    rosters, by_rule = [], {}
+    for position in Position.objects.filter(election__in=elections).exclude(roster__isnull=False):
+        department_ids = frozenset(position.eligible_departments.values_list("id", flat=True))
+        rule = (tuple(sorted(position.eligible_levels or [])), department_ids, position.gender or "A")
+        if rule not in by_rule:
+            levels, department_ids, gender = rule
+            eligible = users.filter(roster_level__in=levels)
+            if department_ids:
+                eligible = eligible.filter(department_id__in=department_ids)
+            if gender != "A":
+                eligible = eligible.filter(gender=gender)
+            by_rule[rule] = list(eligible.order_by("id").values_list("id", flat=True)) if levels else []
+        user_ids = by_rule[rule]
+        rosters.append(PositionRoster(
+            position_id=position.pk, election_id=position.election_id, user_ids=user_ids, size=len(user_ids),
+        ))
+    PositionRoster.objects.bulk_create(rosters, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0002_position_roster'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(build_rosters, migrations.RunPython.noop),
+    ]
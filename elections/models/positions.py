@@ -76,10 +76,9 @@ class Position(models.Model):
         Check if a user meets level, department, and gender eligibility for this position.
         """
         level_ok = user.current_level in self.eligible_levels
-        department_ok = (
-            self.eligible_departments.count() == 0 or
-            user.department in self.eligible_departments.all()
-        )
+        # .all() is served from prefetch_related("eligible_departments") when present
+        department_ids = {d.pk for d in self.eligible_departments.all()}
+        department_ok = not department_ids or user.department_id in department_ids
         gender_ok = (
             self.gender == 'A' or
             user.gender == self.gender
@@ -0,0 +1,20 @@
+from django.db import models
+from .elections import Election
+from .positions import Position
+
+
+class PositionRoster(models.Model):
+    """Materialized set of users eligible to vote for a position, stored as sorted user ids."""
+    position = models.OneToOneField(Position, on_delete=models.CASCADE, related_name="roster")
+    election = models.ForeignKey(Election, on_delete=models.CASCADE, related_name="rosters")
+    user_ids = models.JSONField(default=list)
+    size = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['election', 'position']
+        verbose_name = "Position Roster"
+        verbose_name_plural = "Position Rosters"
+
+    def __str__(self):
+        return f"{self.position.title} roster ({self.size} eligible)"
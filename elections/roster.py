@@ -0,0 +1,181 @@
+# elections/roster.py
+"""
+Materialized eligible-voter rosters.
+
+For each position the set of users that Position.is_user_eligible would
+accept (level, department, gender) is computed with set-based User
+queries, one per distinct eligibility rule in the election, and stored
+as a sorted id array in PositionRoster. Vote-time checks then become a
+frozenset membership test per process; one indexed query for the rosters'
+built_at tells a process which copies are stale, so a change made by any
+worker is seen by the next check everywhere. Roster sizes are the turnout
+denominators shown with results.
+
+Rosters are kept current by elections/signals.py (user, position and
+election saves) and can be rebuilt with `manage.py build_rosters`.
+"""
+
+import bisect
+import logging
+from datetime import datetime
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Least, NullIf
+from django.utils import timezone
+
+from accounts.models import User
+from elections.models.positions import Position
+from elections.models.rosters import PositionRoster
+
+logger = logging.getLogger(__name__)
+
+_local = {}     # position_id -> (version, frozenset of user ids)
+
+
+def _version(built_at):
+    return int(built_at.timestamp() * 1_000_000)
+
+
+def _criteria(position, department_ids):
+    return (tuple(sorted(position.eligible_levels)), frozenset(department_ids), position.gender or "A")
+
+
+def _eligible_user_ids(levels, department_ids, gender):
+    """Sorted ids of users matching one eligibility rule (mirrors User.current_level in SQL)."""
+    current_level = Coalesce(
+        NullIf(F("level"), Value(0)),
+        Least(Value(datetime.now().year) - F("year_enrolled") + 1, Value(4)),
+    )
+    users = User.objects.annotate(roster_level=current_level).filter(roster_level__in=levels)
+    if department_ids:
+        users = users.filter(department_id__in=department_ids)
+    if gender != "A":
+        users = users.filter(gender=gender)
+    return list(users.order_by("id").values_list("id", flat=True))
+
+
+def build(election, positions=None):
+    """(Re)build rosters for an election's positions (all by default). Returns {position_id: size}."""
+    if positions is None:
+        positions = list(Position.objects.filter(election=election))
+    if not positions:
+        return {}
+
+    departments = {}
+    for position_id, department_id in Position.eligible_departments.through.objects.filter(
+        position__in=positions
+    ).values_list("position_id", "department_id"):
+        departments.setdefault(position_id, []).append(department_id)
+
+    # one User query per distinct rule, shared by positions with the same criteria
+    by_rule = {}
+    for position in positions:
+        by_rule.setdefault(_criteria(position, departments.get(position.pk, [])), []).append(position)
+    ids_by_position = {}
+    for (levels, department_ids, gender), rule_positions in by_rule.items():
+        user_ids = _eligible_user_ids(levels, department_ids, gender) if levels else []
+        for position in rule_positions:
+            ids_by_position[position.pk] = user_ids
+
+    with transaction.atomic():
+        PositionRoster.objects.filter(position__in=positions).delete()
+        rosters = PositionRoster.objects.bulk_create([
+            PositionRoster(
+                position_id=position_id, election_id=election.pk,
+                user_ids=user_ids, size=len(user_ids), built_at=timezone.now(),
+            )
+            for position_id, user_ids in ids_by_position.items()
+        ])
+        _publish(election.pk)
+    logger.info(f"Built {len(rosters)} rosters for election {election.code}")
+    return {r.position_id: r.size for r in rosters}
+
+
+def _publish(election_id):
+    from votes import resultscache
+
+    # eligible-voter counts are part of the results
+    resultscache.bump([election_id])
+
+
+def _membership_change(roster, user):
+    """Index to insert at (True), to delete at (False), or None when the roster is already right."""
+    eligible = roster.position.is_user_eligible(user)
+    index = bisect.bisect_left(roster.user_ids, user.pk)
+    present = index < len(roster.user_ids) and roster.user_ids[index] == user.pk
+    if eligible != present:
+        return index, eligible
+    return None
+
+
+def refresh_user(user):
+    """
+    Add or remove one user in the rosters of elections that have not ended.
+    Only rosters whose membership actually changes are locked and rewritten.
+    """
+    rosters = PositionRoster.objects.filter(election__end_date__gte=timezone.now()).select_related(
+        "position"
+    ).prefetch_related("position__eligible_departments")
+    to_change = [r.pk for r in rosters if _membership_change(r, user)]
+    if not to_change:
+        return 0
+
+    changed = []
+    with transaction.atomic():
+        for roster in rosters.filter(pk__in=to_change).select_for_update():
+            change = _membership_change(roster, user)
+            if change is None:
+                continue
+            index, add = change
+            if add:
+                roster.user_ids.insert(index, user.pk)
+            else:
+                del roster.user_ids[index]
+            roster.size = len(roster.user_ids)
+            roster.built_at = timezone.now()
+            roster.save(update_fields=["user_ids", "size", "built_at"])
+            changed.append(roster)
+        for election_id in {r.election_id for r in changed}:
+            _publish(election_id)
+    return len(changed)
+
+
+def _load(position_ids):
+    """
+    Rosters for `position_ids` as {position_id: frozenset}: one query for their
+    versions, plus one for the user ids of copies this process does not hold yet.
+    """
+    rosters, stale = {}, []
+    for pid, built_at in PositionRoster.objects.filter(position_id__in=position_ids).values_list(
+        "position_id", "built_at"
+    ):
+        local = _local.get(pid)
+        if local is not None and local[0] == _version(built_at):
+            rosters[pid] = local[1]
+        else:
+            stale.append(pid)
+
+    if stale:
+        for pid, user_ids, built_at in PositionRoster.objects.filter(position_id__in=stale).values_list(
+            "position_id", "user_ids", "built_at"
+        ):
+            _local[pid] = (_version(built_at), frozenset(user_ids))
+            rosters[pid] = _local[pid][1]
+    return rosters
+
+
+def eligible_positions(user, positions):
+    """
+    Ids of `positions` the user may vote for: roster membership where a roster
+    exists (one query, two when a roster changed), the live
+    Position.is_user_eligible otherwise.
+    """
+    rosters = _load([p.pk for p in positions])
+    return {
+        p.pk for p in positions
+        if (user.pk in rosters[p.pk] if p.pk in rosters else p.is_user_eligible(user))
+    }
+
+
+def is_eligible(user, position):
+    return position.pk in eligible_positions(user, [position])
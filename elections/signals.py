@@ -0,0 +1,75 @@
+# elections/signals.py
+"""Keep eligible-voter rosters (elections/roster.py) in step with users, positions and elections."""
+
+import logging
+from django.db.models.signals import post_init, post_save, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import User
+from elections.models.elections import Election
+from elections.models.positions import Position
+from elections.models.rosters import PositionRoster
+from elections import roster
+
+logger = logging.getLogger(__name__)
+
+# Elections that are not (yet) published get no roster
+UNPUBLISHED = (Election.Status.DRAFT, Election.Status.CANCELLED)
+
+# User fields that Position.is_user_eligible looks at
+ROSTER_FIELDS = ("level", "year_enrolled", "gender", "department")
+
+
+def _maintained(election):
+    return election.status not in UNPUBLISHED and election.end_date >= timezone.now()
+
+
+def _roster_state(user):
+    return user.level, user.year_enrolled, user.gender, user.department_id
+
+
+@receiver(post_init, sender=User)
+def remember_roster_state(sender, instance, **kwargs):
+    instance._roster_state = _roster_state(instance)
+
+
+@receiver(post_save, sender=User)
+def refresh_user_rosters(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Refresh rosters only when a field that decides eligibility was saved with a new value."""
+    if raw:
+        return
+    if update_fields is not None and not {f.removesuffix("_id") for f in update_fields} & set(ROSTER_FIELDS):
+        return
+    state = _roster_state(instance)
+    if created or state != getattr(instance, "_roster_state", None):
+        roster.refresh_user(instance)
+    instance._roster_state = state
+
+
+@receiver(post_save, sender=Position)
+def rebuild_position_roster(sender, instance, raw=False, **kwargs):
+    if raw or not _maintained(instance.election):
+        return
+    roster.build(instance.election, [instance])
+
+
+@receiver(m2m_changed, sender=Position.eligible_departments.through)
+def rebuild_roster_on_departments(sender, instance, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and isinstance(instance, Position):
+        if _maintained(instance.election):
+            roster.build(instance.election, [instance])
+
+
+@receiver(post_save, sender=Election)
+def build_election_rosters(sender, instance, raw=False, **kwargs):
+    """On publish (or any later save), build rosters for positions that have none yet."""
+    if raw or not _maintained(instance):
+        return
+    missing = list(
+        Position.objects.filter(election=instance).exclude(
+            pk__in=PositionRoster.objects.filter(election=instance).values("position_id")
+        )
+    )
+    if missing:
+        roster.build(instance, missing)
@@ -1,3 +1,87 @@
+from datetime import timedelta
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
 
-# Create your tests here.
+from accounts.models import User, Department
+from elections import roster
+from elections.models.elections import Election
+from elections.models.positions import Position
+from elections.models.rosters import PositionRoster
+
+
+class PositionRosterTests(TestCase):
+    """Materialized rosters agree with Position.is_user_eligible and follow user changes."""
+
+    def setUp(self):
+        cache.clear()
+        self.cs = Department.objects.create(name="Computer Science")
+        self.math = Department.objects.create(name="Mathematics")
+        now = timezone.now()
+        self.election = Election.objects.create(
+            title="SRC", start_date=now - timedelta(days=1), end_date=now + timedelta(days=1)
+        )
+        self.users = [
+            self._user("cs-1-m", self.cs, level=1, gender="M"),
+            self._user("cs-3-f", self.cs, level=3, gender="F"),
+            self._user("math-2-f", self.math, level=2, gender="F"),
+            self._user("math-4-m", self.math, level=4, gender="M"),
+        ]
+        self.open_position = Position.objects.create(
+            election=self.election, title="President", eligible_levels=[1, 2, 3]
+        )
+        self.cs_women = Position.objects.create(
+            election=self.election, title="CS Women's Rep", eligible_levels=[1, 2, 3, 4], gender="F"
+        )
+        self.cs_women.eligible_departments.add(self.cs)
+
+    def _user(self, index_number, department, level, gender):
+        return User.objects.create_user(
+            index_number=index_number, email=f"{index_number}@example.com", full_name=index_number,
+            password="pass", department=department, level=level, gender=gender,
+        )
+
+    def test_roster_matches_live_eligibility(self):
+        for position in (self.open_position, self.cs_women):
+            stored = PositionRoster.objects.get(position=position)
+            expected = [u.pk for u in self.users if position.is_user_eligible(u)]
+            self.assertEqual(stored.user_ids, expected)
+            self.assertEqual(stored.size, len(expected))
+
+    def test_eligibility_check_is_a_membership_test(self):
+        positions = [self.open_position, self.cs_women]
+        roster.eligible_positions(self.users[0], positions)
+        # roster versions only: the ids are already held by this process
+        with self.assertNumQueries(1):
+            self.assertEqual(roster.eligible_positions(self.users[1], positions), {p.pk for p in positions})
+        with self.assertNumQueries(1):
+            self.assertFalse(roster.is_eligible(self.users[3], self.open_position))
+
+    def test_user_changes_refresh_rosters(self):
+        mover = self.users[2]
+        mover.department = self.cs
+        mover.save()
+        self.assertIn(mover.pk, PositionRoster.objects.get(position=self.cs_women).user_ids)
+
+        mover.level = 4
+        mover.save()
+        self.assertNotIn(mover.pk, PositionRoster.objects.get(position=self.open_position).user_ids)
+
+    def test_other_workers_see_roster_changes(self):
+        positions = [self.open_position, self.cs_women]
+        mover = self.users[2]
+        self.assertEqual(roster.eligible_positions(mover, positions), {self.open_position.pk})
+
+        # another worker moves the user; this process still holds the old frozensets
+        PositionRoster.objects.filter(position=self.cs_women).update(
+            user_ids=[self.users[1].pk, mover.pk], size=2, built_at=timezone.now()
+        )
+        self.assertEqual(roster.eligible_positions(mover, positions), {p.pk for p in positions})
+
+    def test_unrelated_saves_leave_rosters_alone(self):
+        user = self.users[0]
+        user.full_name = "Renamed"
+        with self.assertNumQueries(1):
+            user.save()
+        with self.assertNumQueries(1):
+            user.save(update_fields=["full_name"])
@@ -0,0 +1,125 @@
+# votes/live.py
+"""
+Live results fan-out for the Server-Sent Events endpoint.
+
+One producer task per election (per process) reads the results version
+(ElectionTally.version, see votes/resultscache.py) every
+LIVE_RESULTS_INTERVAL seconds, so it sees votes taken by any worker. Only
+when the version has changed does it read a tally snapshot. The producer
+diffs the snapshot against the previous one and pushes the delta to every
+subscriber queue, so at most one event per interval goes out and database
+load does not depend on how many viewers are connected. The producer exits
+when its last subscriber leaves.
+"""
+
+import os
+import asyncio
+import logging
+from asgiref.sync import sync_to_async
+
+from votes import resultscache
+from votes.models import VoteTally, ElectionTally
+
+logger = logging.getLogger(__name__)
+
+LIVE_RESULTS_INTERVAL = float(os.getenv("LIVE_RESULTS_INTERVAL", 2))
+LIVE_RESULTS_QUEUE_SIZE = int(os.getenv("LIVE_RESULTS_QUEUE_SIZE", 16))
+
+
+def snapshot(election_id, version):
+    """Turnout and per-candidate counts of an election, labelled with results `version`."""
+    totals = ElectionTally.objects.filter(election_id=election_id).values("votes_cast", "votes_synced").first()
+    counts = {}
+    for position_code, candidate_code, votes in VoteTally.objects.filter(election_id=election_id).values_list(
+        "position__code", "candidate__code", "votes"
+    ):
+        counts.setdefault(position_code, {})[candidate_code] = votes
+    return {
+        "version": version,
+        "total_votes_cast": totals["votes_cast"] if totals else 0,
+        "total_votes_synced": totals["votes_synced"] if totals else 0,
+        "positions": counts,
+    }
+
+
+def diff(before, after):
+    """Delta event between two snapshots: totals plus only the candidate counts that moved."""
+    changed = {}
+    for position_code, candidates in after["positions"].items():
+        previous = before["positions"].get(position_code, {})
+        moved = {code: votes for code, votes in candidates.items() if previous.get(code) != votes}
+        if moved:
+            changed[position_code] = moved
+    return {
+        "version": after["version"],
+        "total_votes_cast": after["total_votes_cast"],
+        "total_votes_synced": after["total_votes_synced"],
+        "positions": changed,
+    }
+
+
+class _Producer:
+    def __init__(self, election_id):
+        self.election_id = election_id
+        self.subscribers = set()
+        self.snapshot = None
+        self.task = None
+
+    def publish(self, event):
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow reader: drop its backlog and resync it with the full state
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(("snapshot", self.snapshot))
+
+    async def run(self):
+        try:
+            while self.subscribers:
+                version = await sync_to_async(resultscache.version)(self.election_id)
+                if self.snapshot is None or version != self.snapshot["version"]:
+                    current = await sync_to_async(snapshot)(self.election_id, version)
+                    previous, self.snapshot = self.snapshot, current
+                    if previous is None:
+                        self.publish(("snapshot", current))
+                    else:
+                        self.publish(("update", diff(previous, current)))
+                await asyncio.sleep(LIVE_RESULTS_INTERVAL)
+        except Exception as e:
+            logger.exception(f"Live results producer for election {self.election_id} failed: {e}")
+            self.publish(("error", {"error": "Live results unavailable."}))
+        finally:
+            if hub.producers.get(self.election_id) is self:
+                del hub.producers[self.election_id]
+
+
+class LiveResultsHub:
+    """Per-process registry of election producers."""
+
+    def __init__(self):
+        self.producers = {}
+
+    def subscribe(self, election_id):
+        queue = asyncio.Queue(maxsize=LIVE_RESULTS_QUEUE_SIZE)
+        producer = self.producers.get(election_id)
+        if producer is None:
+            producer = self.producers[election_id] = _Producer(election_id)
+        producer.subscribers.add(queue)
+        if producer.snapshot is not None:
+            queue.put_nowait(("snapshot", producer.snapshot))
+        if producer.task is None or producer.task.done():
+            producer.task = asyncio.create_task(producer.run())
+        return queue
+
+    def unsubscribe(self, election_id, queue):
+        producer = self.producers.get(election_id)
+        if producer is not None:
+            producer.subscribers.discard(queue)
+
+    def viewers(self):
+        return {election_id: len(p.subscribers) for election_id, p in self.producers.items()}
+
+
+hub = LiveResultsHub()
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from elections.models.elections import Election
+from votes import turnout
+from votes.tally import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute VoteTally, ElectionTally and turnout buckets from the Vote table"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--election", dest="election_code", help="Only rebuild this election")
+
+    def handle(self, *args, **options):
+        election = None
+        if options["election_code"]:
+            try:
+                election = Election.objects.get(code=options["election_code"])
+            except Election.DoesNotExist:
+                raise CommandError(f"Election {options['election_code']} not found.")
+        rows = rebuild(election)
+        buckets = turnout.rebuild(election)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} vote tally rows and {buckets} turnout buckets"))
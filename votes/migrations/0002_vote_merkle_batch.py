@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2026-10-19 07:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blockchain', '0001_initial'),
+        ('elections', '0001_initial'),
+        ('votes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='merkle_batch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='votes', to='blockchain.merklebatch'),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='merkle_index',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='network_fee_matic',
+            field=models.DecimalField(blank=True, decimal_places=18, max_digits=30, null=True),
+        ),
+        migrations.AlterField(
+            model_name='vote',
+            name='election',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='elections.election'),
+        ),
+    ]
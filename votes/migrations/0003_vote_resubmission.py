@@ -0,0 +1,27 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votes', '0002_vote_merkle_batch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='next_sync_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='vote',
+            name='sync_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['status', 'next_sync_at'], name='votes_vote_status_17d285_idx'),
+        ),
+    ]
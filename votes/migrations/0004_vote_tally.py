@@ -0,0 +1,71 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_tallies(apps, schema_editor):
+    Vote = apps.get_model('votes', 'Vote')
+    VoteTally = apps.get_model('votes', 'VoteTally')
+    ElectionTally = apps.get_model('votes', 'ElectionTally')
+    per_candidate = (
+        Vote.objects.values('election_id', 'position_id', 'candidate_id')
+        .annotate(n=models.Count('id')).order_by()
+    )
+    VoteTally.objects.bulk_create([
+        VoteTally(election_id=r['election_id'], position_id=r['position_id'],
+                  candidate_id=r['candidate_id'], votes=r['n'])
+        for r in per_candidate
+    ])
+    per_election = (
+        Vote.objects.values('election_id')
+        .annotate(cast=models.Count('id'), synced=models.Count('id', filter=models.Q(is_synced=True)))
+        .order_by()
+    )
+    ElectionTally.objects.bulk_create([
+        ElectionTally(election_id=r['election_id'], votes_cast=r['cast'], votes_synced=r['synced'])
+        for r in per_election
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0001_initial'),
+        ('votes', '0003_vote_resubmission'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ElectionTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('votes_cast', models.PositiveIntegerField(default=0)),
+                ('votes_synced', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('election', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='tally', to='elections.election')),
+            ],
+            options={
+                'verbose_name': 'Election Tally',
+                'verbose_name_plural': 'Election Tallies',
+            },
+        ),
+        migrations.CreateModel(
+            name='VoteTally',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to='elections.candidate')),
+                ('election', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to='elections.election')),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to='elections.position')),
+            ],
+            options={
+                'verbose_name': 'Vote Tally',
+                'verbose_name_plural': 'Vote Tallies',
+                'ordering': ['position', '-votes'],
+                'unique_together': {('position', 'candidate')},
+            },
+        ),
+        migrations.RunPython(fill_tallies, migrations.RunPython.noop),
+    ]
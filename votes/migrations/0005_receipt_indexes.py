@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votes', '0004_vote_tally'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['election', 'id'], name='votes_vote_electio_5a67df_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['candidate', 'id'], name='votes_vote_candida_639873_idx'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:22
+
+import django.db.models.deletion
+from datetime import timezone as dt_timezone
+from django.db import migrations, models
+from django.db.models.functions import TruncHour, TruncMinute
+
+
+def fill_buckets(apps, schema_editor):
+    Vote = apps.get_model('votes', 'Vote')
+    TurnoutBucket = apps.get_model('votes', 'TurnoutBucket')
+    for interval, trunc in (('minute', TruncMinute), ('hour', TruncHour)):
+        rows = (
+            Vote.objects.annotate(start=trunc('timestamp', tzinfo=dt_timezone.utc))
+            .values('election_id', 'position_id', 'start').annotate(n=models.Count('id')).order_by()
+        )
+        TurnoutBucket.objects.bulk_create([
+            TurnoutBucket(election_id=r['election_id'], position_id=r['position_id'], interval=interval,
+                          bucket_start=r['start'], votes=r['n'])
+            for r in rows
+        ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('elections', '0001_initial'),
+        ('votes', '0005_receipt_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TurnoutBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interval', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour')], max_length=6)),
+                ('bucket_start', models.DateTimeField()),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('election', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='turnout_buckets', to='elections.election')),
+                ('position', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='turnout_buckets', to='elections.position')),
+            ],
+            options={
+                'verbose_name': 'Turnout Bucket',
+                'verbose_name_plural': 'Turnout Buckets',
+                'ordering': ['bucket_start'],
+                'indexes': [models.Index(fields=['election', 'interval', 'bucket_start'], name='votes_turno_electio_221556_idx')],
+                'unique_together': {('position', 'interval', 'bucket_start')},
+            },
+        ),
+        migrations.RunPython(fill_buckets, migrations.RunPython.noop),
+    ]
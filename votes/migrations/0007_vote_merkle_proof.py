@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votes', '0006_turnout_bucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vote',
+            name='merkle_proof',
+            field=models.JSONField(blank=True, help_text='Sibling hashes up to the batch root', null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-19 08:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('votes', '0007_vote_merkle_proof'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='electiontally',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, help_text='Results version, bumped on every change'),
+        ),
+    ]
@@ -23,8 +23,25 @@ class Vote(models.Model):
     block_timestamp = models.DateTimeField(blank=True, null=True)
     status = models.CharField(max_length=20, blank=True, null=True)
 
+    # Merkle anchoring (VOTE_ANCHOR_MODE=merkle)
+    merkle_batch = models.ForeignKey(
+        "blockchain.MerkleBatch", on_delete=models.SET_NULL, null=True, blank=True,
+        related_name="votes"
+    )
+    merkle_index = models.PositiveIntegerField(blank=True, null=True)
+    merkle_proof = models.JSONField(blank=True, null=True, help_text="Sibling hashes up to the batch root")
+
+    # Resubmission of Pending / Failed votes (manage.py resubmit_votes)
+    sync_attempts = models.PositiveIntegerField(default=0)
+    next_sync_at = models.DateTimeField(blank=True, null=True)
+
     class Meta:
         unique_together = ('voter_did_hash', 'position')
+        indexes = [
+            models.Index(fields=['status', 'next_sync_at']),
+            models.Index(fields=['election', 'id']),
+            models.Index(fields=['candidate', 'id']),
+        ]
         ordering = ['-timestamp']
         verbose_name = "Vote"
         verbose_name_plural = "Votes"
@@ -36,3 +53,60 @@ class Vote(models.Model):
         if not self.receipt:
             self.receipt = uuid.uuid4().hex 
         super().save(*args, **kwargs)
+
+
+class VoteTally(models.Model):
+    """Running vote count per (election, position, candidate), maintained in the Vote insert transaction."""
+    election = models.ForeignKey(Election, on_delete=models.CASCADE, related_name="tallies")
+    position = models.ForeignKey(Position, on_delete=models.CASCADE, related_name="tallies")
+    candidate = models.ForeignKey(Candidate, on_delete=models.CASCADE, related_name="tallies")
+    votes = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('position', 'candidate')
+        ordering = ['position', '-votes']
+        verbose_name = "Vote Tally"
+        verbose_name_plural = "Vote Tallies"
+
+    def __str__(self):
+        return f"{self.candidate} ({self.position}): {self.votes}"
+
+
+class ElectionTally(models.Model):
+    """Election-level totals of cast and synced votes."""
+    election = models.OneToOneField(Election, on_delete=models.CASCADE, related_name="tally")
+    votes_cast = models.PositiveIntegerField(default=0)
+    votes_synced = models.PositiveIntegerField(default=0)
+    version = models.PositiveBigIntegerField(default=0, help_text="Results version, bumped on every change")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Election Tally"
+        verbose_name_plural = "Election Tallies"
+
+    def __str__(self):
+        return f"{self.election}: {self.votes_cast} cast, {self.votes_synced} synced"
+
+
+class TurnoutBucket(models.Model):
+    """Votes cast per (election, position) in one minute or hour, maintained alongside the tallies."""
+    class Interval(models.TextChoices):
+        MINUTE = "minute", "Minute"
+        HOUR = "hour", "Hour"
+
+    election = models.ForeignKey(Election, on_delete=models.CASCADE, related_name="turnout_buckets")
+    position = models.ForeignKey(Position, on_delete=models.CASCADE, related_name="turnout_buckets")
+    interval = models.CharField(max_length=6, choices=Interval.choices)
+    bucket_start = models.DateTimeField()
+    votes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('position', 'interval', 'bucket_start')
+        indexes = [models.Index(fields=['election', 'interval', 'bucket_start'])]
+        ordering = ['bucket_start']
+        verbose_name = "Turnout Bucket"
+        verbose_name_plural = "Turnout Buckets"
+
+    def __str__(self):
+        return f"{self.position} {self.interval} {self.bucket_start:%Y-%m-%d %H:%M}: {self.votes}"
@@ -0,0 +1,73 @@
+# votes/reservation.py
+"""
+Insert-first vote reservation.
+
+Vote rows are inserted (status "Reserved") before any chain work, so the
+(voter_did_hash, position) unique constraint decides duplicates: of two
+concurrent requests for the same slot only one gets its row, the other
+gets an IntegrityError and never spends gas. After the chain call the
+rows are finalized with the transaction's fields, or released (deleted and
+taken out of the tallies) when nothing reached the chain. Reservations
+orphaned by a crash are picked up by `manage.py resubmit_votes`, which
+checks the VoteCast index before resending their receipts.
+"""
+
+from django.db import transaction
+
+from votes.models import Vote
+from votes.tally import record_votes, remove_votes, update_votes
+from blockchain.votedstate import voted_state
+
+RESERVED = "Reserved"
+
+
+def reserve(voter_did_hash, entries, receipts, status=RESERVED, is_synced=False):
+    """
+    Insert one Vote per entry ({"candidate", "position", "election"}) with one bulk
+    INSERT and count them in the tallies. Raises IntegrityError when the voter
+    already holds any of the positions.
+    """
+    with transaction.atomic():
+        votes = Vote.objects.bulk_create([
+            Vote(
+                candidate=entry["candidate"],
+                position=entry["position"],
+                election=entry["election"],
+                voter_did_hash=voter_did_hash,
+                receipt=receipts[idx],
+                status=status,
+                is_synced=is_synced,
+            )
+            for idx, entry in enumerate(entries)
+        ])
+        record_votes(votes)
+    return votes
+
+
+def finalize(votes, **fields):
+    """Write the chain outcome onto reserved votes with one UPDATE (tallies follow is_synced)."""
+    update_votes(Vote.objects.filter(pk__in=[vote.pk for vote in votes]), **fields)
+    for vote in votes:
+        for name, value in fields.items():
+            setattr(vote, name, value)
+    return votes
+
+
+def release(votes):
+    """
+    Drop reservations whose votes never reached the chain, freeing the voter's
+    slots. Rows no longer "Reserved" (e.g. taken over by resubmission) are kept.
+    """
+    if not votes:
+        return
+    with transaction.atomic():
+        still_reserved = set(
+            Vote.objects.select_for_update()
+            .filter(pk__in=[vote.pk for vote in votes], status=RESERVED)
+            .values_list("pk", flat=True)
+        )
+        votes = [vote for vote in votes if vote.pk in still_reserved]
+        Vote.objects.filter(pk__in=still_reserved).delete()
+        remove_votes(votes)
+    for vote in votes:
+        voted_state.forget(vote.voter_did_hash, [vote.position.code])
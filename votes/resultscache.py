@@ -0,0 +1,65 @@
+# votes/resultscache.py
+"""
+Versioned cache for VoteResultsView.
+
+Every election has a results version in ElectionTally.version, bumped in
+the same transaction as any change to its tallies, synced totals or
+rosters, so every worker process sees a new version as soon as the change
+commits. Results are cached under (election, version, position) and served
+with an ETag built from the same version, so a poll either gets a 304 or a
+cached body and only the first request after a new vote recomputes
+anything. Old versions are never read again and simply expire.
+"""
+
+import os
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+RESULTS_CACHE_TTL = int(os.getenv("RESULTS_CACHE_TTL", 300))
+# Results of an ended election no longer change, so they may stay cached longer
+RESULTS_CACHE_ENDED_TTL = int(os.getenv("RESULTS_CACHE_ENDED_TTL", 86400))
+
+
+def version(election_id):
+    """Current results version of an election (one indexed lookup)."""
+    from votes.models import ElectionTally
+
+    return ElectionTally.objects.filter(election_id=election_id).values_list("version", flat=True).first() or 0
+
+
+def loaded_version(election):
+    """Results version of an election fetched with select_related("tally"), without a query."""
+    tally = getattr(election, "tally", None)
+    return tally.version if tally else 0
+
+
+def bump(election_ids):
+    """Invalidate cached results for `election_ids`. Call inside the transaction making the change."""
+    from votes.models import ElectionTally
+
+    election_ids = set(election_ids)
+    if not election_ids:
+        return
+    ElectionTally.objects.bulk_create(
+        [ElectionTally(election_id=election_id) for election_id in election_ids], ignore_conflicts=True
+    )
+    ElectionTally.objects.filter(election_id__in=election_ids).update(version=F("version") + 1)
+
+
+def etag(election_id, current_version, position_code=None):
+    return f'"results-{election_id}-{current_version}-{position_code or "all"}"'
+
+
+def cache_key(election_id, current_version, position_code, host):
+    # host is part of the key because candidate image URLs are absolute
+    return f"results:{election_id}:{current_version}:{position_code or '*'}:{host}"
+
+
+def get(key):
+    return cache.get(key)
+
+
+def put(key, data, election):
+    timeout = RESULTS_CACHE_ENDED_TTL if election.end_date < timezone.now() else RESULTS_CACHE_TTL
+    cache.set(key, data, timeout=timeout)
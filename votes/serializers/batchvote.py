@@ -3,10 +3,13 @@ import logging
 from hashlib import sha256
 from binascii import hexlify
 from datetime import datetime
-from django.db import transaction
+from django.db import IntegrityError
 from rest_framework import serializers
+from votes import reservation
 from votes.models import Vote
+from blockchain.votedstate import voted_state
 from accounts.models import GENDER_CHOICES
+from elections import roster
 from elections.models.candidates import Candidate
 from django.utils import timezone
 
@@ -33,13 +36,24 @@ class BallotVoteSerializer(serializers.Serializer):
         election_code = data['election_code']
         validated_votes = []
 
-        for vote_data in data['votes']:
-            try:
-                candidate = Candidate.objects.select_related('position__election', 'student').get(
-                    code=vote_data['candidate_code']
-                )
-            except Candidate.DoesNotExist:
-                raise serializers.ValidationError(f"Invalid candidate: {vote_data['candidate_code']}")
+        # Whole ballot in a fixed number of queries: candidates (with positions,
+        # elections and eligible departments, so positions without a roster fall
+        # back to Position.is_user_eligible without further queries) and the roster load.
+        candidate_codes = [vote_data['candidate_code'] for vote_data in data['votes']]
+        candidates = {
+            c.code: c for c in Candidate.objects.select_related('position__election')
+            .prefetch_related('position__eligible_departments')
+            .filter(code__in=candidate_codes)
+        }
+        eligible = roster.eligible_positions(user, {c.position for c in candidates.values()})
+        # Memory-only early rejection; the reservation insert in create() is authoritative
+        voted = voted_state.known_voted(did_hash, {c.position.code for c in candidates.values()})
+        seen_positions = set()
+
+        for code in candidate_codes:
+            candidate = candidates.get(code)
+            if candidate is None:
+                raise serializers.ValidationError(f"Invalid candidate: {code}")
 
             position = candidate.position
             election = position.election
@@ -48,14 +62,17 @@ class BallotVoteSerializer(serializers.Serializer):
                 raise serializers.ValidationError("All votes must belong to the same election.")
             # if user.current_level == 4:
             #     raise serializers.ValidationError("Level 400 students are not allowed to vote.")
-            if not position.is_user_eligible(user):
+            if position.pk not in eligible:
                 raise serializers.ValidationError(f"Not eligible for {position.title}")
             if not election.has_started():
                 raise serializers.ValidationError("Election has not started yet.")
             if election.has_ended():
                 raise serializers.ValidationError("Election has already ended.")
-            if Vote.objects.filter(voter_did_hash=did_hash, position=position).exists():
+            if position.code in voted:
                 raise serializers.ValidationError(f"Already voted for {position.title}")
+            if position.code in seen_positions:
+                raise serializers.ValidationError(f"Only one vote allowed for {position.title}")
+            seen_positions.add(position.code)
 
             if position.gender and position.gender != 'A':
                 if not user.gender or user.gender.lower() != position.gender.lower():
@@ -74,8 +91,8 @@ class BallotVoteSerializer(serializers.Serializer):
         return data
 
     def create(self, validated_data):
-        from blockchain.helpers import cast_vote_batch
-        from blockchain.utils import web3
+        from blockchain.anchoring import merkle_mode_enabled, QUEUED
+        from blockchain.helpers import cast_vote_batch_chunked
 
         voter_did_hash = validated_data['voter_did_hash']
         validated_votes = validated_data['validated_votes']
@@ -88,61 +105,109 @@ class BallotVoteSerializer(serializers.Serializer):
             candidate_codes.append(v["candidate"].code)
             receipt_hashes.append(receipt_hash_hex)
 
+        # Merkle mode: store locally; receipts are anchored by the next root commit
+        if merkle_mode_enabled():
+            return self._reserve(voter_did_hash, validated_votes, receipt_hashes, status=QUEUED)
+
+        # Claim every slot before spending gas: the unique constraint rejects a concurrent duplicate here
+        reserved = self._reserve(voter_did_hash, validated_votes, receipt_hashes)
+
         try:
-            # Call blockchain first
-            tx_receipt = cast_vote_batch(position_codes, candidate_codes, receipt_hashes)
-            tx_hash = tx_receipt['transactionHash'].hex()
-
-            # Persist votes immediately with minimal data
-            created_votes = []
-            with transaction.atomic():
-                for idx, v in enumerate(validated_votes):
-                    vote = Vote.objects.create(
-                        candidate=v["candidate"],
-                        position=v["position"],
-                        election=v["election"],
-                        voter_did_hash=voter_did_hash,
-                        receipt=receipt_hashes[idx],
-                        tx_hash=tx_hash,
-                        status="Pending",
-                        is_synced=True,
-                    )
-                    created_votes.append(vote)
-            try:
-                block_number = tx_receipt.get("blockNumber")
-                confirmations, block_timestamp, fee_matic = None, None, None
-                status = "Success" if tx_receipt.get("status") == 1 else "Failed"
-
-                if block_number:
-                    block = web3.eth.get_block(block_number)
-                    latest_block = web3.eth.block_number
-                    confirmations = latest_block - block_number
-                    if isinstance(block.timestamp, (int, float)):
-                        block_timestamp = timezone.make_aware(datetime.fromtimestamp(block.timestamp))
-
-                # compute transaction fee directly from receipt
-                gas_used = tx_receipt.get("gasUsed")
-                gas_price = tx_receipt.get("effectiveGasPrice") or tx_receipt.get("gasPrice")
-                if gas_used and gas_price:
-                    fee_matic = web3.from_wei(gas_used * gas_price, "ether")
-
-                for vote in created_votes:
-                    vote.block_number = block_number
-                    vote.block_confirmations = confirmations
-                    vote.block_timestamp = block_timestamp
-                    vote.status = status
-                    if fee_matic is not None:
-                        vote.network_fee_matic = str(fee_matic)  # store as string or Decimal
-                    vote.save(update_fields=[
-                        "block_number", "block_confirmations", "block_timestamp",
-                        "status", "network_fee_matic"
-                    ])
-
-            except Exception as e:
-                logger.warning(f"Block info update failed after ballot vote: {e}")
-
-            return created_votes
+            # One voteBatch per gas-planned chunk
+            chunks = cast_vote_batch_chunked(position_codes, candidate_codes, receipt_hashes)
+        except Exception as e:
+            logger.exception(f"Ballot voting failed unexpectedly: {e}")
+            reservation.release(reserved)
+            raise serializers.ValidationError("Ballot voting failed due to an unexpected error.")
+
+        created_votes, self.failed_votes = [], []
+        for chunk in chunks:
+            entries = [validated_votes[i] for i in chunk["indices"]]
+            votes = [reserved[i] for i in chunk["indices"]]
+
+            # Never broadcast, or mined but reverted: nothing recorded on-chain, so the
+            # slots are freed and the voter can retry these positions
+            reverted = chunk["receipt"] is not None and chunk["receipt"].get("status") != 1
+            if chunk["tx_hash"] is None or reverted:
+                stage = "reverted on-chain" if reverted else "failed before broadcast"
+                logger.warning(f"Ballot chunk {stage}: {chunk['error']}")
+                reservation.release(votes)
+                self.failed_votes.extend(
+                    {"position": v["position"].code, "candidate": v["candidate"].code, "error": chunk["error"]}
+                    for v in entries
+                )
+                continue
+
+            # Still in the mempool: keep as Pending; the stuck-transaction watchdog finalizes it
+            if chunk["status"] == "Pending":
+                created_votes += reservation.finalize(
+                    votes, tx_hash=chunk["tx_hash"], status="Pending", is_synced=False
+                )
+                continue
+
+            reservation.finalize(votes, tx_hash=chunk["tx_hash"], status="Pending", is_synced=True)
+            self._apply_receipt(votes, chunk["receipt"])
+            created_votes += votes
+
+        if not created_votes:
+            raise serializers.ValidationError("Ballot voting failed: no vote could be recorded on-chain.")
+        return created_votes
+
+    @staticmethod
+    def _reserve(voter_did_hash, validated_votes, receipt_hashes, **fields):
+        """Insert the ballot's rows up front; a slot already taken means the voter has voted."""
+        try:
+            return reservation.reserve(voter_did_hash, validated_votes, receipt_hashes, **fields)
+        except IntegrityError:
+            # Read the rows directly: the conflict may be another request's reservation, which
+            # can still be released, so it must not become a remembered positive
+            taken = set(
+                Vote.objects.filter(
+                    voter_did_hash=voter_did_hash, position__in=[v["position"] for v in validated_votes]
+                ).values_list("position__code", flat=True)
+            )
+            titles = [v["position"].title for v in validated_votes if v["position"].code in taken]
+            if titles:
+                raise serializers.ValidationError(f"Already voted for {', '.join(titles)}")
+            raise serializers.ValidationError("Already voted for one or more positions on this ballot.")
+
+    @staticmethod
+    def _apply_receipt(votes, tx_receipt):
+        """Best-effort update of votes with block info from their transaction receipt."""
+        from blockchain.utils import web3
+        from blockchain.chainhead import confirmations as chain_confirmations
+        from blockchain.ledger import fee_shares_matic, store_fee_shares
+
+        try:
+            block_number = tx_receipt.get("blockNumber")
+            confirmations, block_timestamp = None, None
+            status = "Success" if tx_receipt.get("status") == 1 else "Failed"
+
+            if block_number:
+                block = web3.eth.get_block(block_number)
+                confirmations = chain_confirmations(block_number)
+                if isinstance(block.timestamp, (int, float)):
+                    block_timestamp = timezone.make_aware(datetime.fromtimestamp(block.timestamp))
+
+            fields = {
+                "block_number": block_number,
+                "block_confirmations": confirmations,
+                "block_timestamp": block_timestamp,
+                "status": status,
+            }
+
+            # one UPDATE for the whole chunk: every vote shares the same transaction
+            Vote.objects.filter(pk__in=[vote.pk for vote in votes]).update(**fields)
+            for vote in votes:
+                for name, value in fields.items():
+                    setattr(vote, name, value)
+
+            # each vote carries its share of the batch fee; the ledger holds the full fee
+            shares = fee_shares_matic(tx_receipt, len(votes))
+            if shares is not None:
+                store_fee_shares([vote.pk for vote in votes], shares)
+                for vote, share in zip(votes, shares):
+                    vote.network_fee_matic = share
 
         except Exception as e:
-                logger.exception(f"Ballot voting failed unexpectedly: {e}")
-                raise serializers.ValidationError("Ballot voting failed due to an unexpected error.")
+            logger.warning(f"Block info update failed after ballot vote: {e}")
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+from votes.models import Vote
+
+
+RECEIPT_FIELDS = [
+    "id",
+    "receipt",
+    "tx_hash",
+    "status",
+    "block_number",
+    "network_fee_matic",
+    "block_confirmations",
+    "block_timestamp",
+    "created_at",
+]
+
+
+class VoteReceiptSerializer(serializers.ModelSerializer):
+    position_code = serializers.CharField(source="position.code", read_only=True)
+    candidate_code = serializers.CharField(source="candidate.code", read_only=True)
+
+    class Meta:
+        model = Vote
+        fields = RECEIPT_FIELDS + ["position_code", "candidate_code"]
@@ -4,11 +4,14 @@ from binascii import hexlify
 from hashlib import sha256
 from datetime import datetime
 from django.utils import timezone
-from django.db import transaction
+from django.db import IntegrityError
 from rest_framework import serializers
 from web3.exceptions import ContractLogicError
 from accounts.models import GENDER_CHOICES
+from votes import reservation
 from votes.models import Vote
+from blockchain.votedstate import voted_state
+from elections import roster
 from elections.models.candidates import Candidate
 
 logger = logging.getLogger(__name__)
@@ -57,13 +60,14 @@ class AnonymousVoteSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Election code mismatch.")
         # if user.current_level == 4:
         #     raise serializers.ValidationError("Level 400 students are not allowed to vote.")
-        if not position.is_user_eligible(user):
+        if not roster.is_eligible(user, position):
             raise serializers.ValidationError("You are not eligible to vote for this position.")
         if not election.has_started():
             raise serializers.ValidationError("Election has not started yet.")
         if election.has_ended():
             raise serializers.ValidationError("Election has already ended.")
-        if Vote.objects.filter(voter_did_hash=did_hash, position=position).exists():
+        # Memory-only early rejection; the reservation insert in create() is authoritative
+        if voted_state.known_voted(did_hash, [position.code]):
             raise serializers.ValidationError("You have already voted for this position.")
 
         if position.gender and position.gender != "A":
@@ -80,8 +84,10 @@ class AnonymousVoteSerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
+        from blockchain.anchoring import merkle_mode_enabled, QUEUED
         from blockchain.helpers import cast_vote
-        from blockchain.utils import web3
+        from blockchain.utils import web3, TransactionPending
+        from blockchain.chainhead import confirmations as chain_confirmations
 
         voter_did_hash = validated_data["voter_did_hash"]
         candidate = validated_data["candidate"]
@@ -91,22 +97,19 @@ class AnonymousVoteSerializer(serializers.ModelSerializer):
         # Generate ONE receipt tied to THIS candidate only
         receipt_hash_hex = hexlify(os.urandom(32)).decode()
 
+        entry = {"candidate": candidate, "position": position, "election": election}
+
+        # Merkle mode: store locally; the receipt is anchored by the next root commit
+        if merkle_mode_enabled():
+            return self._reserve(voter_did_hash, entry, receipt_hash_hex, status=QUEUED)
+
+        # Claim the slot before spending gas: the unique constraint rejects a concurrent duplicate here
+        vote = self._reserve(voter_did_hash, entry, receipt_hash_hex)
+
         try:
             tx_receipt = cast_vote(position.code, candidate.code, receipt_hash_hex)
             tx_hash = tx_receipt["transactionHash"].hex()
-
-            # Persist vote immediately
-            with transaction.atomic():
-                vote = Vote.objects.create(
-                    candidate=candidate,
-                    position=position,
-                    election=election,
-                    voter_did_hash=voter_did_hash,
-                    receipt=receipt_hash_hex,
-                    tx_hash=tx_hash,
-                    status="Pending",
-                    is_synced=True,
-                )
+            reservation.finalize([vote], tx_hash=tx_hash, status="Pending", is_synced=True)
 
             # Best-effort update with blockchain info
             try:
@@ -116,8 +119,7 @@ class AnonymousVoteSerializer(serializers.ModelSerializer):
 
                 if block_number:
                     block = web3.eth.get_block(block_number)
-                    latest_block = web3.eth.block_number
-                    confirmations = latest_block - block_number
+                    confirmations = chain_confirmations(block_number)
                     if isinstance(block.timestamp, (int, float)):
                         block_timestamp = timezone.make_aware(datetime.fromtimestamp(block.timestamp))
 
@@ -142,10 +144,25 @@ class AnonymousVoteSerializer(serializers.ModelSerializer):
 
             return vote
 
+        except TransactionPending as e:
+            # Still in the mempool: keep the vote as Pending under this hash;
+            # the stuck-transaction watchdog fee-bumps and finalizes it.
+            logger.warning(f"Vote transaction pending after timeout: {e.tx_hash}")
+            return reservation.finalize([vote], tx_hash=e.tx_hash, status="Pending", is_synced=False)[0]
         except ContractLogicError as e:
+                reservation.release([vote])
                 if "Receipt already used" in str(e):
                     raise serializers.ValidationError("Blockchain reports duplicate receipt.")
                 raise
         except Exception as e:
                 logger.exception(f"Unexpected error while casting single vote: {e}")
+                reservation.release([vote])
                 raise serializers.ValidationError("Voting failed unexpectedly.")
+
+    @staticmethod
+    def _reserve(voter_did_hash, entry, receipt, **fields):
+        """Insert the vote row up front; a slot already taken means the voter has voted."""
+        try:
+            return reservation.reserve(voter_did_hash, [entry], [receipt], **fields)[0]
+        except IntegrityError:
+            raise serializers.ValidationError("You have already voted for this position.")
@@ -0,0 +1,148 @@
+# votes/tally.py
+"""
+Incrementally maintained vote tallies.
+
+VoteTally (per election/position/candidate) and ElectionTally (votes cast
+and synced per election) are adjusted with F() expressions inside the same
+transaction that inserts or re-syncs Vote rows, so results read a handful
+of counter rows instead of scanning the vote table. `manage.py
+rebuild_vote_tally` recomputes them from the Vote table on demand. Every
+change also updates the turnout buckets (votes/turnout.py) and bumps the
+election's results version (ElectionTally.version, see votes/resultscache.py)
+in the same statement as its totals.
+"""
+
+from collections import Counter
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Value, When
+
+from votes import turnout
+from votes.models import Vote, VoteTally, ElectionTally
+
+
+def _bump_election(election_id, cast=0, synced=0):
+    ElectionTally.objects.get_or_create(election_id=election_id)
+    ElectionTally.objects.filter(election_id=election_id).update(
+        votes_cast=F("votes_cast") + cast,
+        votes_synced=F("votes_synced") + synced,
+        version=F("version") + 1,
+    )
+
+
+def _count(votes, sign):
+    per_candidate = Counter((v.election_id, v.position_id, v.candidate_id) for v in votes)
+    if per_candidate:
+        VoteTally.objects.bulk_create(
+            [
+                VoteTally(election_id=election_id, position_id=position_id, candidate_id=candidate_id)
+                for election_id, position_id, candidate_id in per_candidate
+            ],
+            ignore_conflicts=True,
+        )
+        increments = {candidate_id: sign * n for (_, _, candidate_id), n in per_candidate.items()}
+        VoteTally.objects.filter(candidate_id__in=increments).update(
+            votes=F("votes") + Case(
+                *(When(candidate_id=candidate_id, then=Value(n)) for candidate_id, n in increments.items()),
+                default=Value(0),
+            )
+        )
+
+    cast = Counter(v.election_id for v in votes)
+    synced = Counter(v.election_id for v in votes if v.is_synced)
+    for election_id, n in cast.items():
+        _bump_election(election_id, cast=sign * n, synced=sign * synced.get(election_id, 0))
+    turnout.record(votes, sign)
+
+
+def record_votes(votes):
+    """
+    Add newly inserted votes to the tallies. Call inside the inserting transaction.
+    Costs two statements for the candidate rows however many candidates are involved.
+    """
+    _count(votes, 1)
+
+
+def remove_votes(votes):
+    """Subtract deleted votes from the tallies. Call inside the deleting transaction."""
+    _count(votes, -1)
+
+
+def adjust_synced(deltas):
+    """Apply {election_id: change in synced votes}."""
+    changed = [election_id for election_id, delta in deltas.items() if delta]
+    for election_id in changed:
+        _bump_election(election_id, synced=deltas[election_id])
+
+
+def update_votes(queryset, **fields):
+    """
+    queryset.update(**fields), keeping ElectionTally.votes_synced in step when
+    is_synced changes. Returns the number of updated rows.
+    """
+    if "is_synced" not in fields:
+        return queryset.update(**fields)
+
+    is_synced = fields["is_synced"]
+    with transaction.atomic():
+        flipping = Counter(
+            queryset.select_for_update().exclude(is_synced=is_synced).values_list("election_id", flat=True)
+        )
+        deltas = {election_id: n if is_synced else -n for election_id, n in flipping.items()}
+        updated = queryset.update(**fields)
+        adjust_synced(deltas)
+    return updated
+
+
+def synced_deltas(votes, was_synced):
+    """Synced-count changes for in-memory `votes` given their previous {pk: is_synced}."""
+    deltas = Counter()
+    for vote in votes:
+        before = was_synced.get(vote.pk)
+        if before is not None and before != vote.is_synced:
+            deltas[vote.election_id] += 1 if vote.is_synced else -1
+    return deltas
+
+
+def rebuild(election=None):
+    """Recompute tallies from the Vote table (all elections, or one). Returns the number of tally rows."""
+    votes = Vote.objects.all()
+    tallies = VoteTally.objects.all()
+    totals = ElectionTally.objects.all()
+    if election is not None:
+        votes, tallies, totals = (
+            votes.filter(election=election), tallies.filter(election=election), totals.filter(election=election)
+        )
+
+    per_candidate = (
+        votes.values("election_id", "position_id", "candidate_id")
+        .annotate(n=Count("id")).order_by()
+    )
+    per_election = (
+        votes.values("election_id")
+        .annotate(cast=Count("id"), synced=Count("id", filter=Q(is_synced=True))).order_by()
+    )
+    with transaction.atomic():
+        # versions carry over so no cached result is served under a reused version
+        versions = dict(totals.values_list("election_id", "version"))
+        if election is not None:
+            versions.setdefault(election.pk, 0)
+        per_election = {r["election_id"]: r for r in per_election}
+        tallies.delete()
+        totals.delete()
+        rows = VoteTally.objects.bulk_create([
+            VoteTally(
+                election_id=r["election_id"], position_id=r["position_id"],
+                candidate_id=r["candidate_id"], votes=r["n"],
+            )
+            for r in per_candidate
+        ])
+        ElectionTally.objects.bulk_create([
+            ElectionTally(
+                election_id=election_id,
+                votes_cast=per_election.get(election_id, {}).get("cast", 0),
+                votes_synced=per_election.get(election_id, {}).get("synced", 0),
+                version=versions.get(election_id, 0) + 1,
+            )
+            for election_id in versions.keys() | per_election.keys()
+        ])
+    return len(rows)
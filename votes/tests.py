@@ -1,3 +1,408 @@
+import json
+import asyncio
+from hashlib import sha256
+from datetime import timedelta
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from accounts.models import User, Department
+from elections.models.elections import Election
+from elections.models.positions import Position
+from elections.models.candidates import Candidate
+from votes.models import Vote, VoteTally
+from votes import live, reservation, turnout
+from votes.serializers.batchvote import BallotVoteSerializer
+from votes.views.verifyvote import MAX_BULK_RECEIPTS, BulkVerificationThrottle
+from blockchain import anchoring, merkle
+from blockchain.models import MerkleBatch
+from blockchain.utils import TransactionPending
+from blockchain.votedstate import voted_state
+
+
+class ElectionFixtureMixin:
+    """Builds elections with candidates and Success votes (tallies included)."""
+
+    def setUp(self):
+        cache.clear()
+        voted_state.clear()
+        self.department = Department.objects.create(name="Computer Science")
+        self.viewer = self._user("viewer")
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def _user(self, index_number):
+        return User.objects.create_user(
+            index_number=index_number,
+            email=f"{index_number}@example.com",
+            full_name=f"Student {index_number}",
+            password="pass",
+            department=self.department,
+        )
+
+    def _election(self, positions, candidates_per_position, voters):
+        now = timezone.now()
+        election = Election.objects.create(
+            title=f"Election {positions}x{candidates_per_position}",
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1),
+        )
+        for p in range(positions):
+            position = Position.objects.create(election=election, title=f"Position {p}", eligible_levels=[1, 2, 3, 4])
+            position.eligible_departments.add(self.department)
+            candidates = [
+                Candidate.objects.create(position=position, student=self._user(f"{election.pk}-{p}-{c}"))
+                for c in range(candidates_per_position)
+            ]
+            for v in range(voters):
+                candidate = candidates[v % candidates_per_position]
+                self._vote(candidate, f"voter-{v}", f"{election.pk}-{p}-{v}", status="Success", is_synced=True)
+        return election
+
+    def _vote(self, candidate, voter_did_hash, receipt, **fields):
+        entry = {"candidate": candidate, "position": candidate.position, "election": candidate.position.election}
+        return reservation.reserve(voter_did_hash, [entry], [receipt], **fields)[0]
+
+
+class VoteResultsQueryCountTests(ElectionFixtureMixin, TestCase):
+    """VoteResultsView must cost a fixed number of queries, whatever the election size."""
+
+    def _get_results(self, election, queries, **params):
+        with self.assertNumQueries(queries):
+            response = self.client.get("/api/v1/votes/results/", {"election_code": election.code, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_election_results_query_count_is_constant(self):
+        small = self._election(positions=2, candidates_per_position=2, voters=3)
+        large = self._election(positions=6, candidates_per_position=5, voters=10)
+
+        # election + totals, positions, tallies with candidates
+        small_data = self._get_results(small, 3)
+        large_data = self._get_results(large, 3)
+
+        self.assertEqual(small_data["total_votes_cast"], 6)
+        self.assertEqual(large_data["total_votes_cast"], 60)
+        self.assertEqual(len(large_data["positions"]), 6)
+        self.assertNotIn("receipts", large_data["positions"][0]["results"][0])
+
+    def test_unchanged_results_are_served_from_cache_with_etag(self):
+        election = self._election(positions=2, candidates_per_position=2, voters=3)
+        first = self.client.get("/api/v1/votes/results/", {"election_code": election.code})
+        etag = first["ETag"]
+
+        # election lookup only
+        with self.assertNumQueries(1):
+            cached = self.client.get("/api/v1/votes/results/", {"election_code": election.code})
+        self.assertEqual(cached.data, first.data)
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                "/api/v1/votes/results/", {"election_code": election.code}, HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+
+        position = election.positions.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self._vote(position.candidates.first(), "late-voter", "late", status="Success", is_synced=True)
+        response = self.client.get(
+            "/api/v1/votes/results/", {"election_code": election.code}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["total_votes_cast"], 7)
+
+
+class VoteReceiptsTests(ElectionFixtureMixin, TestCase):
+    """Receipts are paged by keyset or streamed, never embedded in results."""
+
+    def test_receipts_are_cursor_paginated(self):
+        election = self._election(positions=2, candidates_per_position=2, voters=5)
+        seen, url = [], "/api/v1/votes/results/receipts/"
+        params = {"election_code": election.code, "page_size": 4}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data["results"]), 4)
+            seen += [r["receipt"] for r in response.data["results"]]
+            url, params = response.data["next"], None
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len(set(seen)), 10)
+
+    def test_receipts_stream_as_ndjson_and_csv(self):
+        election = self._election(positions=1, candidates_per_position=2, voters=3)
+        params = {"election_code": election.code}
+
+        response = self.client.get("/api/v1/votes/results/receipts/", {**params, "stream": "ndjson"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn("candidate_code", json.loads(lines[0]))
+
+        response = self.client.get("/api/v1/votes/results/receipts/", {**params, "stream": "csv"})
+        rows = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(rows[0].startswith("id,receipt,"))
+
+
+class BallotValidationQueryCountTests(ElectionFixtureMixin, TestCase):
+    """A ballot validates in a fixed number of queries, however many positions it covers."""
+
+    def _serializer(self, election, ballot):
+        request = APIRequestFactory().post("/api/v1/votes/cast/")
+        request.user = self.viewer
+        return BallotVoteSerializer(
+            data={"election_code": election.code, "votes": ballot}, context={"request": request}
+        )
+
+    def _validate(self, election, queries=4):
+        serializer = self._serializer(election, [
+            {"candidate_code": position.candidates.first().code}
+            for position in election.positions.all()
+        ])
+        # candidates with positions, their departments, roster versions and
+        # roster ids (not once this process holds the current rosters)
+        with self.assertNumQueries(queries):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer.validated_data["validated_votes"]
+
+    def test_ballot_validation_query_count_is_constant(self):
+        self.assertEqual(len(self._validate(self._election(positions=2, candidates_per_position=2, voters=0))), 2)
+        self.assertEqual(len(self._validate(self._election(positions=8, candidates_per_position=3, voters=0))), 8)
+
+    def test_already_voted_position_is_rejected_at_reservation(self):
+        election = self._election(positions=2, candidates_per_position=2, voters=0)
+        position = election.positions.first()
+        candidate = position.candidates.first()
+        self._vote(candidate, sha256(self.viewer.did.encode()).hexdigest(), "cast-before")
+
+        # validation no longer queries for duplicates; the unique constraint rejects the insert
+        serializer = self._serializer(election, [{"candidate_code": candidate.code}])
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaisesMessage(ValidationError, f"Already voted for {position.title}"):
+            serializer.save()
+        self.assertEqual(Vote.objects.filter(election=election).count(), 1)
+
+    def test_released_reservation_frees_the_slot(self):
+        election = self._election(positions=2, candidates_per_position=2, voters=0)
+        votes = reservation.reserve("ballot-voter", self._validate(election), ["r-0", "r-1"])
+        reservation.release(votes)
+        self.assertFalse(Vote.objects.filter(election=election).exists())
+        self.assertEqual(set(VoteTally.objects.filter(election=election).values_list("votes", flat=True)), {0})
+        reservation.reserve("ballot-voter", self._validate(election, queries=3), ["r-2", "r-3"])
+
+    def test_reverted_chunk_frees_its_slots(self):
+        election = self._election(positions=2, candidates_per_position=2, voters=0)
+        positions = list(election.positions.all())
+        serializer = self._serializer(election, [{"candidate_code": p.candidates.first().code} for p in positions])
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        fees = {"gasUsed": 21000, "effectiveGasPrice": 10}
+        chunks = [
+            {"indices": [0], "tx_hash": "0xok", "receipt": {"status": 1, **fees},
+             "status": "Success", "error": None},
+            {"indices": [1], "tx_hash": "0xreverted", "receipt": {"status": 0, **fees},
+             "status": "Failed", "error": "Transaction reverted on-chain."},
+        ]
+        with mock.patch("blockchain.helpers.cast_vote_batch_chunked", return_value=chunks):
+            votes = serializer.save()
+
+        self.assertEqual([v.position_id for v in votes], [positions[0].pk])
+        self.assertEqual(serializer.failed_votes, [{
+            "position": positions[1].code, "candidate": positions[1].candidates.first().code,
+            "error": "Transaction reverted on-chain.",
+        }])
+        self.assertFalse(Vote.objects.filter(position=positions[1]).exists())
+        self.assertEqual(VoteTally.objects.get(position=positions[1]).votes, 0)
+        self.assertEqual(turnout.series(election, "hour", position=positions[1])[-1]["cumulative"], 0)
+
+    def test_conflicting_reservation_does_not_lock_the_voter_out(self):
+        election = self._election(positions=1, candidates_per_position=2, voters=0)
+        position = election.positions.first()
+        candidate = position.candidates.first()
+        did_hash = sha256(self.viewer.did.encode()).hexdigest()
+        in_flight = self._vote(candidate, did_hash, "other-request")
+
+        serializer = self._serializer(election, [{"candidate_code": candidate.code}])
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with self.assertRaisesMessage(ValidationError, f"Already voted for {position.title}"):
+            serializer.save()
+        self.assertEqual(voted_state.voted_positions(did_hash, [position.code]), {position.code})
+        self.assertFalse(voted_state.known_voted(did_hash, [position.code]))
+
+        # the other request never reached the chain
+        reservation.release([in_flight])
+        self.assertEqual(voted_state.voted_positions(did_hash, [position.code]), set())
+
+
+class BallotPersistenceTests(ElectionFixtureMixin, TestCase):
+    """Persisting a ballot costs the same statements however many positions it covers."""
+
+    def test_ballot_persistence_statement_count_is_constant(self):
+        counts = []
+        for positions in (2, 8):
+            election = self._election(positions=positions, candidates_per_position=2, voters=0)
+            validated_votes = [
+                {"candidate": position.candidates.first(), "position": position, "election": election}
+                for position in election.positions.all()
+            ]
+            receipts = [f"{positions}-{i}" for i in range(positions)]
+            with CaptureQueriesContext(connection) as ctx:
+                votes = reservation.reserve("ballot-voter", validated_votes, receipts)
+                reservation.finalize(votes, tx_hash=f"0x{positions}", status="Pending", is_synced=True)
+                BallotVoteSerializer._apply_receipt(votes, {"status": 1, "gasUsed": 21000, "effectiveGasPrice": 10})
+            counts.append(len(ctx.captured_queries))
+            self.assertTrue(all(v.status == "Success" for v in votes))
+            self.assertEqual(
+                sorted(VoteTally.objects.filter(election=votes[0].election).values_list("votes", flat=True)),
+                [1] * positions,
+            )
+            self.assertEqual(votes[0].election.tally.votes_synced, positions)
+        self.assertEqual(counts[0], counts[1])
+
+
+class TurnoutSeriesTests(ElectionFixtureMixin, TestCase):
+    """Turnout curves come from the bucket rollup, kept in step with inserts and releases."""
+
+    def test_series_matches_votes_and_skips_the_vote_table(self):
+        election = self._election(positions=2, candidates_per_position=2, voters=3)
+        self.viewer.is_staff = True
+        self.viewer.save()
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(
+                "/api/v1/votes/results/turnout/", {"election_code": election.code, "interval": "minute"}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('"votes_vote"' in q["sql"] for q in ctx.captured_queries))
+        self.assertEqual(response.data["series"][-1]["cumulative"], 6)
+
+        position = election.positions.first()
+        votes = reservation.reserve(
+            "late-voter", [{"candidate": position.candidates.first(), "position": position, "election": election}],
+            ["late"],
+        )
+        self.assertEqual(turnout.series(election, "hour", position=position)[-1]["cumulative"], 4)
+        reservation.release(votes)
+        self.assertEqual(turnout.series(election, "hour")[-1]["cumulative"], 6)
+
+        url, params = "/api/v1/votes/results/turnout/", {"election_code": election.code}
+        self.assertEqual(self.client.get(url, {**params, "since": "2026-13-01T00:00"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {**params, "since": "yesterday"}).status_code, 400)
+        naive_since = (timezone.now() - timedelta(days=2)).replace(tzinfo=None).isoformat()
+        response = self.client.get(url, {**params, "since": naive_since})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["series"][-1]["cumulative"], 6)
+
+        rebuilt_before = turnout.series(election, "minute")
+        turnout.rebuild(election)
+        self.assertEqual(turnout.series(election, "minute"), rebuilt_before)
+
+
+class MerkleAnchoringTests(ElectionFixtureMixin, TestCase):
+    """Proofs are stored with the batch; a broadcast root is never anchored twice."""
+
+    def test_proofs_are_stored_when_the_batch_is_created(self):
+        election = self._election(positions=1, candidates_per_position=2, voters=0)
+        candidate = election.positions.first().candidates.first()
+        for v in range(5):
+            self._vote(candidate, f"queued-{v}", f"0x{v:064x}", status=anchoring.QUEUED)
+        batch = anchoring.create_batch()
+
+        for vote in Vote.objects.filter(merkle_batch=batch).select_related("merkle_batch"):
+            with self.assertNumQueries(0):
+                proof = anchoring.inclusion_proof(vote)
+            self.assertTrue(merkle.verify_proof(vote.receipt, proof["proof"], batch.root))
+
+    def test_broadcast_batch_waits_for_its_receipt(self):
+        batch = MerkleBatch.objects.create(root="0x" + "ab" * 32, leaf_count=1)
+        pending = TransactionPending("not mined", "0xsent")
+        with mock.patch("blockchain.utils.anchor_data", side_effect=pending) as anchor:
+            anchoring.commit_batch(batch)
+            self.assertEqual(batch.status, MerkleBatch.Status.PENDING)
+            self.assertEqual(batch.tx_hash, "0xsent")
+
+            with mock.patch.object(anchoring, "_sent_receipt", return_value=None) as sent:
+                anchoring.commit_pending_roots()
+            sent.assert_called_once()
+        self.assertEqual(anchor.call_count, 1)
+
+
+class BulkVerificationTests(ElectionFixtureMixin, TestCase):
+    """Bulk receipt verification is for authenticated users, in bounded requests."""
+
+    def test_bulk_verification_requires_authentication_and_a_small_list(self):
+        url = "/api/v1/votes/verify/"
+        response = APIClient().post(url, {"receipts": ["0x01"]}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post(url, {"receipts": ["0x01"]}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["missing"], 1)
+
+        too_many = [f"0x{i:x}" for i in range(MAX_BULK_RECEIPTS + 1)]
+        response = self.client.post(url, {"receipts": too_many}, format="json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_staff_are_not_throttled(self):
+        url, body = "/api/v1/votes/verify/", {"receipts": ["0x01"]}
+        with mock.patch.object(BulkVerificationThrottle, "rate", "1/hour"):
+            self.assertEqual(self.client.post(url, body, format="json").status_code, 200)
+            self.assertEqual(self.client.post(url, body, format="json").status_code, 429)
+
+            self.viewer.is_staff = True
+            self.viewer.save()
+            self.assertEqual(self.client.post(url, body, format="json").status_code, 200)
+
+
+class LiveResultsTests(ElectionFixtureMixin, TestCase):
+    """Live results: deltas, slow-reader resync, producer lifetime and the WSGI fallback."""
+
+    def _snapshot(self, version, counts):
+        return {"version": version, "total_votes_cast": sum(counts.values()), "total_votes_synced": 0,
+                "positions": {"P1": counts}}
+
+    def test_diff_carries_only_moved_counts(self):
+        before = self._snapshot(1, {"C1": 2, "C2": 3})
+        after = self._snapshot(2, {"C1": 2, "C2": 4, "C3": 1})
+        delta = live.diff(before, after)
+        self.assertEqual(delta["positions"], {"P1": {"C2": 4, "C3": 1}})
+        self.assertEqual((delta["version"], delta["total_votes_cast"]), (2, 7))
+        self.assertEqual(live.diff(after, after)["positions"], {})
+
+    def test_slow_reader_is_resynced_with_a_snapshot(self):
+        producer = live._Producer(election_id=0)
+        producer.snapshot = self._snapshot(3, {"C1": 1})
+        queue = asyncio.Queue(maxsize=2)
+        producer.subscribers.add(queue)
+        for version in (1, 2, 3):
+            producer.publish(("update", {"version": version}))
+        self.assertEqual(queue.qsize(), 1)
+        self.assertEqual(queue.get_nowait(), ("snapshot", producer.snapshot))
+
+    async def test_producer_stops_when_the_last_viewer_leaves(self):
+        current = self._snapshot(5, {"C1": 1})
+        with mock.patch.object(live.resultscache, "version", return_value=5), \
+                mock.patch.object(live, "snapshot", return_value=current), \
+                mock.patch.object(live, "LIVE_RESULTS_INTERVAL", 0.01):
+            queue = live.hub.subscribe(-1)
+            self.assertEqual(await asyncio.wait_for(queue.get(), 1), ("snapshot", current))
+            producer = live.hub.producers[-1]
+            live.hub.unsubscribe(-1, queue)
+            await asyncio.wait_for(producer.task, 1)
+        self.assertNotIn(-1, live.hub.producers)
+
+    def test_wsgi_request_gets_one_snapshot_and_a_retry_hint(self):
+        election = self._election(positions=1, candidates_per_position=2, voters=3)
+        token = RefreshToken.for_user(self.viewer).access_token
+        response = APIClient().get(
+            "/api/v1/votes/results/live/", {"election_code": election.code}, HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertTrue(body.startswith("retry: "))
+        self.assertIn("event: snapshot", body)
+        self.assertIn('"total_votes_cast": 3', body)
@@ -0,0 +1,99 @@
+# votes/turnout.py
+"""
+Time-bucketed turnout rollups.
+
+TurnoutBucket rows count votes per election, position and minute / hour.
+They are adjusted in the same transaction that inserts (or releases) Vote
+rows, via votes/tally.py, with one bulk insert and one CASE update however
+many positions a ballot covers. Turnout curves are range reads on the
+(election, interval, bucket_start) index and never touch the vote table;
+`manage.py rebuild_vote_tally` recomputes the buckets from the votes.
+"""
+
+from collections import Counter
+from datetime import timezone as dt_timezone
+from functools import reduce
+from operator import or_
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import TruncHour, TruncMinute
+
+from votes.models import Vote, TurnoutBucket
+
+# Buckets are aligned in UTC, both here and in rebuild()
+INTERVALS = {
+    TurnoutBucket.Interval.MINUTE: (TruncMinute, lambda ts: ts.replace(second=0, microsecond=0)),
+    TurnoutBucket.Interval.HOUR: (TruncHour, lambda ts: ts.replace(minute=0, second=0, microsecond=0)),
+}
+
+
+def record(votes, sign=1):
+    """Add (sign=1) or remove (sign=-1) `votes` in their buckets. Call inside the writing transaction."""
+    counts = Counter(
+        (v.election_id, v.position_id, interval, truncate(v.timestamp))
+        for v in votes
+        for interval, (_, truncate) in INTERVALS.items()
+    )
+    if not counts:
+        return
+
+    TurnoutBucket.objects.bulk_create(
+        [
+            TurnoutBucket(election_id=election_id, position_id=position_id, interval=interval, bucket_start=start)
+            for election_id, position_id, interval, start in counts
+        ],
+        ignore_conflicts=True,
+    )
+    conditions = {
+        (position_id, interval, start): Q(position_id=position_id, interval=interval, bucket_start=start)
+        for _, position_id, interval, start in counts
+    }
+    TurnoutBucket.objects.filter(reduce(or_, conditions.values())).update(
+        votes=F("votes") + Case(
+            *(
+                When(conditions[(position_id, interval, start)], then=Value(sign * n))
+                for (_, position_id, interval, start), n in counts.items()
+            ),
+            default=Value(0),
+        )
+    )
+
+
+def series(election, interval, since=None, until=None, position=None):
+    """[{"bucket", "votes", "cumulative"}] for an election (or one position), oldest first."""
+    buckets = TurnoutBucket.objects.filter(election=election, interval=interval)
+    if position is not None:
+        buckets = buckets.filter(position=position)
+    if since is not None:
+        buckets = buckets.filter(bucket_start__gte=since)
+    if until is not None:
+        buckets = buckets.filter(bucket_start__lt=until)
+
+    points, cumulative = [], 0
+    for row in buckets.values("bucket_start").annotate(total=Sum("votes")).order_by("bucket_start"):
+        cumulative += row["total"]
+        points.append({"bucket": row["bucket_start"], "votes": row["total"], "cumulative": cumulative})
+    return points
+
+
+def rebuild(election=None):
+    """Recompute buckets from the Vote table (all elections, or one). Returns the number of bucket rows."""
+    votes = Vote.objects.all()
+    buckets = TurnoutBucket.objects.all()
+    if election is not None:
+        votes, buckets = votes.filter(election=election), buckets.filter(election=election)
+
+    rows = []
+    for interval, (trunc, _) in INTERVALS.items():
+        rows += [
+            TurnoutBucket(
+                election_id=r["election_id"], position_id=r["position_id"], interval=interval,
+                bucket_start=r["start"], votes=r["n"],
+            )
+            for r in votes.annotate(start=trunc("timestamp", tzinfo=dt_timezone.utc))
+            .values("election_id", "position_id", "start").annotate(n=Count("id")).order_by()
+        ]
+    with transaction.atomic():
+        buckets.delete()
+        TurnoutBucket.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
@@ -3,11 +3,18 @@ from votes.views.castvote import CastVoteView
 from votes.views.verifyvote import VoteVerificationView
 from votes.views.voteresults import VoteResultsView,BlockchainResultsView
 from votes.views.votehistory import VoteHistoryView
+from votes.views.votereceipts import VoteReceiptsView
+from votes.views.liveresults import live_results
+from votes.views.turnout import TurnoutSeriesView
 
 urlpatterns = [
     path("cast/", CastVoteView.as_view(), name="cast-vote"),
     path("verify/", VoteVerificationView.as_view(), name="verify-vote"),
     path("results/", VoteResultsView.as_view(), name="vote-results"),
+    path("results/live/", live_results, name="live-results"),
+    path("results/receipts/", VoteReceiptsView.as_view(), name="vote-receipts"),
+    path("results/turnout/", TurnoutSeriesView.as_view(), name="turnout-series"),
+    path("results/chain/", BlockchainResultsView.as_view(), name="blockchain-election-results"),
     path("results/<str:position_code>/", BlockchainResultsView.as_view(),name="blockchain-results"),
     path("history/",VoteHistoryView.as_view(), name='history')
 ]
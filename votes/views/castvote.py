@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework import generics, permissions, status
 from web3.exceptions import ContractLogicError
 from votes.serializers.votes import AnonymousVoteSerializer
+from blockchain.votedstate import voted_state
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +32,14 @@ class CastVoteView(generics.CreateAPIView):
         voter_did_hash = getattr(self.request.user, "did", None)
         if not voter_did_hash:
             raise ValueError("Authenticated user has no DID set.")
-        return serializer.save(voter_did=voter_did_hash)
+        result = serializer.save(voter_did=voter_did_hash)
+
+        # Confirmed writes feed the in-memory voted state
+        votes = result if isinstance(result, list) else [result]
+        if votes:
+            voted_state.mark_voted(votes[0].voter_did_hash, [v.position.code for v in votes])
+            voted_state.mark_receipts_used(v.receipt for v in votes if v.status == "Success")
+        return result
 
     @swagger_auto_schema(
         operation_summary="Cast a vote or ballot",
@@ -81,6 +89,8 @@ class CastVoteView(generics.CreateAPIView):
                     return Response({
                         "message": "Ballot cast successfully.",
                         "tx_hash": getattr(result[0], "tx_hash", None) if result else None,
+                        "tx_hashes": list(dict.fromkeys(v.tx_hash for v in result if v.tx_hash)),
+                        "failed": getattr(serializer, "failed_votes", []),
                         "votes": [
                             {
                                 "receipt": v.receipt,
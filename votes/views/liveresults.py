@@ -0,0 +1,83 @@
+import json
+import asyncio
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from votes import resultscache
+from votes.live import hub, snapshot, LIVE_RESULTS_INTERVAL
+from elections.models.elections import Election
+
+# Comment line sent when nothing changed, so proxies keep the stream open
+KEEPALIVE_SECONDS = max(15, LIVE_RESULTS_INTERVAL)
+
+
+def _authenticate(request):
+    try:
+        return JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+
+def _current_snapshot(election_id):
+    return snapshot(election_id, resultscache.version(election_id))
+
+
+async def _single_snapshot(election_id):
+    """
+    WSGI fallback: a WSGI worker cannot hold an endless stream, so send one
+    snapshot and ask the EventSource to reconnect after LIVE_RESULTS_INTERVAL,
+    which turns the stream into polling.
+    """
+    data = await sync_to_async(_current_snapshot)(election_id)
+    body = f"retry: {int(LIVE_RESULTS_INTERVAL * 1000)}\n" + _event("snapshot", data)
+    response = HttpResponse(body, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+async def live_results(request):
+    """
+    Server-Sent Events stream of turnout and tallies for ?election_code=...
+    Sends a "snapshot" event on connect, then at most one "update" per
+    LIVE_RESULTS_INTERVAL carrying the totals and only the candidate counts
+    that changed. Authenticate with the usual `Authorization: Bearer <jwt>`
+    header. Streaming needs an ASGI server; under WSGI each request gets a
+    single snapshot and the client's reconnects do the polling.
+    """
+    if await sync_to_async(_authenticate)(request) is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    election_code = request.GET.get("election_code")
+    if not election_code:
+        return JsonResponse({"error": "election_code is required."}, status=400)
+    election_id = await Election.objects.filter(code=election_code).values_list("id", flat=True).afirst()
+    if election_id is None:
+        return JsonResponse({"error": "Election not found."}, status=404)
+    if not isinstance(request, ASGIRequest):
+        return await _single_snapshot(election_id)
+
+    async def stream():
+        queue = hub.subscribe(election_id)
+        try:
+            while True:
+                try:
+                    name, data = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _event(name, data)
+                if name == "error":
+                    return
+        finally:
+            hub.unsubscribe(election_id, queue)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
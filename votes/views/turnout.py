@@ -0,0 +1,75 @@
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, status
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from votes import turnout
+from votes.models import TurnoutBucket
+from elections.models.elections import Election
+from elections.models.positions import Position
+
+
+class TurnoutSeriesView(APIView):
+    """
+    Turnout curve for an election (Admin-only): votes cast per minute or hour,
+    with a running total, optionally for one position and a time range.
+    Served from the TurnoutBucket rollup; the vote table is never scanned.
+    """
+    permission_classes = [permissions.IsAuthenticated, permissions.IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_summary="Turnout time series for an election",
+        manual_parameters=[
+            openapi.Parameter("election_code", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter("position_code", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter("interval", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              enum=TurnoutBucket.Interval.values, description="Bucket size (default hour)"),
+            openapi.Parameter("since", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              description="ISO datetime, inclusive"),
+            openapi.Parameter("until", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              description="ISO datetime, exclusive"),
+        ]
+    )
+    def get(self, request):
+        params = request.query_params
+        election_code = params.get("election_code")
+        interval = params.get("interval", TurnoutBucket.Interval.HOUR)
+
+        if not election_code:
+            return Response({"error": "election_code is required."}, status=status.HTTP_400_BAD_REQUEST)
+        if interval not in TurnoutBucket.Interval.values:
+            return Response({"error": f"interval must be one of {', '.join(TurnoutBucket.Interval.values)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        bounds = {}
+        for name in ("since", "until"):
+            if params.get(name):
+                try:
+                    value = parse_datetime(params[name])
+                except ValueError:
+                    # well formed but out of range, e.g. month 13
+                    value = None
+                if value is None:
+                    return Response({"error": f"{name} must be an ISO datetime."}, status=status.HTTP_400_BAD_REQUEST)
+                bounds[name] = timezone.make_aware(value) if timezone.is_naive(value) else value
+
+        try:
+            election = Election.objects.get(code=election_code)
+        except Election.DoesNotExist:
+            return Response({"error": "Election not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        position = None
+        if params.get("position_code"):
+            try:
+                position = Position.objects.get(code=params["position_code"], election=election)
+            except Position.DoesNotExist:
+                return Response({"error": "Position not found in this election."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({
+            "election": election.title,
+            "position": position.title if position else None,
+            "interval": interval,
+            "series": turnout.series(election, interval, position=position, **bounds),
+        })
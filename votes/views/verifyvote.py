@@ -1,32 +1,85 @@
+import os
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import  status
+from rest_framework.exceptions import NotAuthenticated
+from rest_framework.throttling import UserRateThrottle
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from votes.models import Vote
-from votes.models import Vote
+from blockchain.anchoring import inclusion_proof
+from blockchain.indexer import indexed_head, lookup_receipts, normalize_receipt, onchain_record
+
+# Upper bound on receipts accepted by one bulk verification request
+MAX_BULK_RECEIPTS = int(os.getenv("MAX_BULK_RECEIPTS", 20000))
+# Bulk requests per user; staff (officials, auditors) are not throttled
+BULK_VERIFY_RATE = os.getenv("BULK_VERIFY_RATE", "60/hour")
+
+
+class BulkVerificationThrottle(UserRateThrottle):
+    scope = "bulk_verify"
+    rate = BULK_VERIFY_RATE
+
+    def allow_request(self, request, view):
+        if request.user and request.user.is_staff:
+            return True
+        return super().allow_request(request, view)
+
 
 class VoteVerificationView(APIView):
+    """
+    Single-receipt verification stays open to anyone holding a receipt; the
+    bulk form needs an authenticated user and is rate limited per user,
+    except for staff spot-checking whole elections against the local index.
+    """
+
+    def _is_bulk(self):
+        return isinstance(self.request.data, dict) and 'receipts' in self.request.data
+
+    def get_throttles(self):
+        return [BulkVerificationThrottle()] if self._is_bulk() else []
+
+    def check_permissions(self, request):
+        super().check_permissions(request)
+        if self._is_bulk() and not (request.user and request.user.is_authenticated):
+            raise NotAuthenticated("Bulk verification requires authentication.")
+
     @swagger_auto_schema(
-        operation_summary="Verify a vote",
+        operation_summary="Verify a vote (or a list of receipts)",
+        operation_description=(
+            "Receipts are checked against the local index of on-chain VoteCast logs; "
+            "no RPC call is made. Send `receipts` (list) for bulk verification; "
+            "the bulk form requires authentication and is rate limited for non-staff users."
+        ),
         request_body=openapi.Schema(
             type=openapi.TYPE_OBJECT,
             properties={
                 "receipt": openapi.Schema(type=openapi.TYPE_STRING, description="Unique receipt issued after vote"),
+                "receipts": openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_STRING),
+                    description="Bulk form: list of receipts to verify"
+                ),
             },
-            required=["receipt"]
         )
     )
     def post(self, request):
+        receipts = request.data.get('receipts')
+        if receipts is not None:
+            return self._verify_bulk(receipts)
+
         receipt = request.data.get('receipt')
         if not receipt:
             return Response({"error": "Receipt is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            vote = Vote.objects.select_related('candidate', 'position', 'election').get(receipt=receipt)
+            vote = Vote.objects.select_related(
+                'candidate__student', 'position', 'election', 'merkle_batch'
+            ).get(receipt=receipt)
         except Vote.DoesNotExist:
             return Response({"valid": False, "message": "No vote found for this receipt."}, status=status.HTTP_404_NOT_FOUND)
 
+        chain_log = lookup_receipts([vote.receipt]).get(normalize_receipt(vote.receipt))
         return Response({
             "valid": True,
             "election": vote.election.title,
@@ -37,5 +90,37 @@ class VoteVerificationView(APIView):
             "receipt_hash": vote.receipt,
             "block_number": vote.block_number,
             "confirmations": vote.block_confirmations,
+            "status": vote.status,
+            "onchain_verified": chain_log is not None,
+            "onchain": onchain_record(chain_log, indexed_head()),
+            "merkle_proof": inclusion_proof(vote),
         })
 
+    def _verify_bulk(self, receipts):
+        if not isinstance(receipts, list) or not all(isinstance(r, str) and r for r in receipts):
+            return Response({"error": "receipts must be a list of non-empty strings."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(receipts) > MAX_BULK_RECEIPTS:
+            return Response(
+                {"error": f"At most {MAX_BULK_RECEIPTS} receipts per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        found = lookup_receipts(receipts)
+        head = indexed_head()
+        results = []
+        for receipt in receipts:
+            chain_log = found.get(normalize_receipt(receipt))
+            results.append({
+                "receipt": receipt,
+                "onchain_verified": chain_log is not None,
+                "onchain": onchain_record(chain_log, head),
+            })
+
+        verified = sum(1 for r in results if r["onchain_verified"])
+        return Response({
+            "total": len(results),
+            "verified": verified,
+            "missing": len(results) - verified,
+            "indexed_head": head or None,
+            "results": results,
+        })
@@ -0,0 +1,100 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from blockchainVotingSystem.pagination import VoteReceiptCursorPagination
+from votes.models import Vote
+from votes.serializers.receipts import RECEIPT_FIELDS, VoteReceiptSerializer
+from elections.models.elections import Election
+
+STREAM_FORMATS = ("ndjson", "csv")
+STREAM_CHUNK_SIZE = 2000
+STREAM_COLUMNS = RECEIPT_FIELDS + ["position__code", "candidate__code"]
+
+
+class _Echo:
+    """File-like object for csv.writer that hands each row back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+class VoteReceiptsView(generics.ListAPIView):
+    """
+    Vote receipts for an election, optionally narrowed to a position or candidate.
+    Cursor (keyset) paginated on the primary key, or streamed in full as NDJSON / CSV
+    with ?stream=ndjson|csv. Either way the server holds one page / chunk at a time.
+    """
+    serializer_class = VoteReceiptSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = VoteReceiptCursorPagination
+    filter_backends = []
+
+    @swagger_auto_schema(
+        operation_summary="List vote receipts for an election, position or candidate",
+        manual_parameters=[
+            openapi.Parameter("election_code", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter("position_code", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter("candidate_code", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter("stream", openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              enum=list(STREAM_FORMATS), description="Stream every receipt instead of paginating"),
+        ]
+    )
+    def get(self, request, *args, **kwargs):
+        stream = request.query_params.get("stream")
+        if stream is None:
+            return super().get(request, *args, **kwargs)
+        if stream not in STREAM_FORMATS:
+            return Response({"error": f"stream must be one of {', '.join(STREAM_FORMATS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        rows = self.get_queryset().values(*STREAM_COLUMNS).iterator(chunk_size=STREAM_CHUNK_SIZE)
+        if stream == "csv":
+            body, content_type = self._csv(rows), "text/csv"
+        else:
+            body, content_type = self._ndjson(rows), "application/x-ndjson"
+
+        response = StreamingHttpResponse(body, content_type=content_type)
+        filename = f"receipts-{request.query_params.get('election_code')}.{stream}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def get_queryset(self):
+        params = self.request.query_params
+        election_code = params.get("election_code")
+        if not election_code:
+            raise ValidationError({"error": "election_code is required."})
+        try:
+            election = Election.objects.only("id").get(code=election_code)
+        except Election.DoesNotExist:
+            raise NotFound({"error": "Election not found."})
+
+        # (election, id) index keeps every page / chunk an index range scan
+        queryset = Vote.objects.filter(election=election).select_related("position", "candidate")
+        if params.get("position_code"):
+            queryset = queryset.filter(position__code=params["position_code"])
+        if params.get("candidate_code"):
+            queryset = queryset.filter(candidate__code=params["candidate_code"])
+        return queryset.order_by("id")
+
+    @staticmethod
+    def _rename(row):
+        row["position_code"] = row.pop("position__code")
+        row["candidate_code"] = row.pop("candidate__code")
+        return row
+
+    def _ndjson(self, rows):
+        for row in rows:
+            yield json.dumps(self._rename(row), cls=DjangoJSONEncoder) + "\n"
+
+    def _csv(self, rows):
+        columns = RECEIPT_FIELDS + ["position_code", "candidate_code"]
+        writer = csv.DictWriter(_Echo(), fieldnames=columns)
+        yield writer.writerow(dict(zip(columns, columns)))
+        for row in rows:
+            yield writer.writerow(self._rename(row))
@@ -1,18 +1,27 @@
-from django.db.models import Count
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from django.db.models import F
 from rest_framework import permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from blockchain.helpers import get_ballot_results
-from votes.models import Vote
+from blockchain.helpers import get_ballot_results, group_ballot_results
+from votes import resultscache
+from votes.models import VoteTally
 from elections.models.elections import Election
 from elections.models.positions import Position
-from elections.models.candidates import Candidate
 from elections.serializers.candidates import ImageSerializerMixin
 
 
 class VoteResultsView(APIView):
+    """
+    Election results from the local vote tallies.
+    The whole response costs a fixed number of queries however many positions
+    and candidates the election has: election + totals, positions and one tally
+    fetch (with candidates). Counts only; individual receipts are listed by
+    VoteReceiptsView. Responses are cached per results version and carry an
+    ETag, so unchanged results cost one query and a cache read (see
+    votes/resultscache.py).
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     @swagger_auto_schema(
@@ -30,99 +39,124 @@ class VoteResultsView(APIView):
             return Response({"error": "election_code is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            election = Election.objects.get(code=election_code)
+            election = Election.objects.select_related("tally").get(code=election_code)
         except Election.DoesNotExist:
             return Response({"error": "Election not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        total_votes_cast = Vote.objects.filter(election=election).count()
-        total_votes_synced = Vote.objects.filter(election=election, is_synced=True).count()
+        # Versioned cache: a poll between two votes is a 304 or a cache hit
+        current_version = resultscache.loaded_version(election)
+        etag = resultscache.etag(election.pk, current_version, position_code)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        key = resultscache.cache_key(election.pk, current_version, position_code, request.get_host())
+        data = resultscache.get(key)
+        if data is None:
+            data = self._build_results(election, position_code)
+            if isinstance(data, Response):
+                return data
+            resultscache.put(key, data, election)
+        return Response(data, headers=headers)
+
+    def _build_results(self, election, position_code):
+        """Results payload for the election (or one position), or an error Response."""
+        totals = getattr(election, "tally", None)
+        total_votes_cast = totals.votes_cast if totals else 0
+        total_votes_synced = totals.votes_synced if totals else 0
         percent_synced = (total_votes_synced / total_votes_cast * 100) if total_votes_cast else 0
 
         # If a single position_code is provided → return results for that position only
         if position_code:
             try:
-                position = Position.objects.get(code=position_code, election=election)
+                position = self._positions(election).get(code=position_code)
             except Position.DoesNotExist:
                 return Response({"error": "Position not found in this election."}, status=status.HTTP_404_NOT_FOUND)
 
-            position_results = self._calculate_position_results(election, position)
-            return Response({
+            tallies = self._load_tallies([position])
+            position_results = self._calculate_position_results(position, tallies)
+            return {
                 "election": election.title,
                 "position": position.title,
                 "total_votes_cast": total_votes_cast,
                 "total_votes_synced": total_votes_synced,
                 "percent_synced": round(percent_synced, 2),
                 **position_results
-            })
+            }
 
         # Otherwise → return results for ALL positions in this election
-        all_positions = Position.objects.filter(election=election)
+        all_positions = list(self._positions(election))
+        tallies = self._load_tallies(all_positions)
         election_results = []
         for pos in all_positions:
-            pos_result = self._calculate_position_results(election, pos)
+            pos_result = self._calculate_position_results(pos, tallies)
             election_results.append({
                 "position": pos.title,
                 **pos_result
             })
 
-        return Response({
+        return {
             "election": election.title,
             "total_votes_cast": total_votes_cast,
             "total_votes_synced": total_votes_synced,
             "percent_synced": round(percent_synced, 2),
             "positions": election_results,
-        })
-
-    def _calculate_position_results(self, election, position):
-        """Helper to compute results for a single position with receipts per candidate."""
-        total_votes_position = Vote.objects.filter(position=position).count()
-
-        # Aggregated vote counts per candidate
-        votes_qs = (
-            Vote.objects.filter(election=election, position=position)
-            .values("candidate__student__full_name", "candidate__image", "candidate__code")
-            .annotate(total_votes=Count("id"))
-            .order_by("-total_votes")
-        )
+        }
+
+    @staticmethod
+    def _positions(election):
+        # roster size (eligible voters) is the turnout denominator; user_ids are not loaded
+        return Position.objects.filter(election=election).annotate(eligible_voters=F("roster__size"))
+
+    def _load_tallies(self, positions):
+        """Fetch tallies (with candidates) for `positions` in one query: {position_id: [VoteTally]}."""
+        position_ids = [p.pk for p in positions]
+        tallies = {}
+        for tally in (
+            VoteTally.objects.filter(position_id__in=position_ids, votes__gt=0)
+            .select_related("candidate__student")
+            .order_by("-votes")
+        ):
+            tallies.setdefault(tally.position_id, []).append(tally)
+        return tallies
+
+    def _calculate_position_results(self, position, tallies):
+        """Build one position's results from prefetched tallies (no queries)."""
+        position_tallies = tallies.get(position.pk, [])
+        total_votes_position = sum(t.votes for t in position_tallies)
 
         results = []
         max_votes = 0
         winners = []
 
         image_mixin = ImageSerializerMixin(context={"request": self.request})
-                                           
-        for v in votes_qs:
-            vote_count = v["total_votes"]
-            percent = (vote_count / total_votes_position * 100) if total_votes_position else 0
-
-            candidate = Candidate.objects.get(code=v["candidate__code"])
-            candidate_image = image_mixin.get_image(candidate)
 
-            # Fetch all receipts for this candidate in this position
-            candidate_votes = Vote.objects.filter(
-                election=election, position=position, candidate__code=v["candidate__code"]
-            ).values(
-                "receipt", "tx_hash", "status",
-                "block_number","network_fee_matic", "block_confirmations", "block_timestamp"
-            )
+        for tally in position_tallies:
+            candidate = tally.candidate
+            vote_count = tally.votes
+            percent = (vote_count / total_votes_position * 100) if total_votes_position else 0
 
             results.append({
-                "candidate_full_name": v["candidate__student__full_name"],
-                "candidate_code": v["candidate__code"],
-                "candidate_image": candidate_image,
+                "candidate_full_name": candidate.student.full_name,
+                "candidate_code": candidate.code,
+                "candidate_image": image_mixin.get_image(candidate),
                 "total_votes": vote_count,
                 "percentage": round(percent, 2),
-                "receipts": list(candidate_votes),
             })
 
             if vote_count > max_votes:
                 max_votes = vote_count
-                winners = [v["candidate__code"]]
+                winners = [candidate.code]
             elif vote_count == max_votes:
-                winners.append(v["candidate__code"])
+                winners.append(candidate.code)
 
+        eligible_voters = position.eligible_voters
         return {
             "total_votes_position": total_votes_position,
+            "eligible_voters": eligible_voters,
+            "turnout_percent": (
+                round(total_votes_position / eligible_voters * 100, 2) if eligible_voters else None
+            ),
             "is_winner": bool(winners),
             "results": results
         }
@@ -134,46 +168,50 @@ class BlockchainResultsView(APIView):
     Supports:
       - position_code: single position results
       - election_code: all positions under election
+    Both cases cost a single getBallotResults(electionCode) call (cached per election).
     """
 
     def get(self, request, *args, **kwargs):
-        position_code = request.query_params.get("position_code")
+        position_code = request.query_params.get("position_code") or kwargs.get("position_code")
         election_code = request.query_params.get("election_code")
 
         # Case 1: Single position results
         if position_code:
             try:
-                position = Position.objects.get(code=position_code)
-                results = get_ballot_results(position.code)
-                return Response({
-                    "election": position.election.name,
-                    "position": position.name,
-                    "results": results
-                }, status=status.HTTP_200_OK)
+                position = Position.objects.select_related("election").get(code=position_code)
             except Position.DoesNotExist:
                 return Response({"error": "Position not found"}, status=status.HTTP_404_NOT_FOUND)
 
+            grouped = group_ballot_results(get_ballot_results(position.election.code))
+            return Response({
+                "election": position.election.title,
+                "position": position.title,
+                "results": grouped.get(position.code, [])
+            }, status=status.HTTP_200_OK)
+
         # Case 2: Whole election results
         elif election_code:
             try:
                 election = Election.objects.get(code=election_code)
-                election_results = []
-
-                for position in election.positions.all():
-                    results = get_ballot_results(position.code)
-                    election_results.append({
-                        "position": position.name,
-                        "results": results
-                    })
-
-                return Response({
-                    "election": election.name,
-                    "positions": election_results
-                }, status=status.HTTP_200_OK)
             except Election.DoesNotExist:
                 return Response({"error": "Election not found"}, status=status.HTTP_404_NOT_FOUND)
 
+            grouped = group_ballot_results(get_ballot_results(election.code))
+            election_results = [
+                {
+                    "position": position.title,
+                    "position_code": position.code,
+                    "results": grouped.get(position.code, [])
+                }
+                for position in election.positions.all()
+            ]
+
+            return Response({
+                "election": election.title,
+                "positions": election_results
+            }, status=status.HTTP_200_OK)
+
         return Response(
             {"error": "Provide either position_code or election_code"},
             status=status.HTTP_400_BAD_REQUEST
-        )
\ No newline at end of file
+        )